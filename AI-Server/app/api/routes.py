@@ -1,15 +1,37 @@
+import asyncio
 import json
 import logging
+import os
 from typing import List
 from datetime import datetime
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, WebSocket
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
+from services.chat_socket import ChatConnection
 from services.chatbot import Chatbot
-from services.models import ChatInput, ChatResponse, CompanyInfo, CompanyInput, CompanySearchResult, SupportProgramInfoSearchRequest, WebSearchResult
-from utils.database import get_collection
-from utils.embedding_utils import get_company_embedding, get_support_program_embedding
+from config.settings import settings
+from services.models import (
+    ChatInput,
+    ChatResponse,
+    CompanyBatchSearchRequest,
+    CompanyInfo,
+    CompanyInput,
+    CompanySearchResult,
+    GraphJobAccepted,
+    GraphJobRequest,
+    GraphJobStatus,
+    SupportProgramInfoSearchRequest,
+)
+from services.graph_jobs import GraphJobManager, JobQueueFull, create_job_store
+from utils.database import get_collection, has_collection
+from utils.embedding_utils import aget_company_embedding, aget_company_embeddings, aget_support_program_embedding, company_info_to_text, support_program_info_to_text
+from utils.logging_utils import truncate
+from utils.metrics import render_prometheus, track_stage
+from utils.responses import FastJSONResponse
+from utils.single_flight import get_single_flight, make_key
 
 logger = logging.getLogger(__name__)
 
@@ -17,12 +39,78 @@ router = APIRouter()
 chatbot = Chatbot()
 
 
+async def _search_collection(key_text: str, query_embedding: List[float], limit: int):
+    """
+    컬렉션 검색을 스레드에서 실행합니다. 동시에 들어온 동일 요청은 한 번만 검색합니다.
+    :param key_text: 요청을 식별하는 정규화 대상 텍스트
+    :param query_embedding: 검색할 임베딩 벡터
+    :param limit: 반환할 결과 수
+    """
+
+    def search():
+        collection = get_collection()
+        search_params = settings.VECTOR_SEARCH_PARAMS
+        with track_stage("milvus_search"):
+            return collection.search(
+                data=[query_embedding],
+                anns_field="embedding",
+                param=search_params,
+                limit=limit,
+                output_fields=["content"],
+            )
+
+    return await get_single_flight("vector_search").do(make_key("routes", key_text, limit), lambda: asyncio.to_thread(search))
+
+
+async def _search_collection_batch(query_embeddings: List[List[float]], limit: int):
+    """
+    여러 임베딩을 한 번의 컬렉션 검색 요청으로 검색합니다. (Milvus의 다중 쿼리 검색 사용)
+    :param query_embeddings: 검색할 임베딩 벡터 리스트
+    :param limit: 쿼리별 반환할 결과 수
+    :return: 입력 순서대로의 검색 결과 리스트
+    """
+
+    def search():
+        collection = get_collection()
+        search_params = settings.VECTOR_SEARCH_PARAMS
+        with track_stage("milvus_search"):
+            return collection.search(
+                data=query_embeddings,
+                anns_field="embedding",
+                param=search_params,
+                limit=limit,
+                output_fields=["content"],
+            )
+
+    return await asyncio.to_thread(search)
+
+
+def _to_company_results(hits) -> List[CompanySearchResult]:
+    """
+    한 쿼리의 검색 결과를 CompanySearchResult 리스트로 변환합니다.
+    """
+    search_results = []
+    for hit in hits:
+        try:
+            content = json.loads(hit.entity.get("content"))
+            search_results.append(
+                CompanySearchResult(
+                    businessName=content.get("businessName"),
+                    info=CompanyInfo(**content.get("info")),
+                    similarityScore=1 - hit.distance,
+                )
+            )
+        except json.JSONDecodeError as e:
+            logger.error(f"JSON 디코드 오류: {e}")
+    return search_results
+
+
 @router.post("/insert_company", response_model=dict)
 async def insert_company(input: CompanyInput):
     """회사 정보를 데이터베이스에 저장하는 엔드포인트"""
     try:
         collection = get_collection()
-        embedding = get_company_embedding(input.info)
+        embedding = await aget_company_embedding(input.info)
         company_info = json.dumps({"businessName": input.businessName, "info": input.info.dict()})
         url = str(input.url) if input.url else ""
         created_at = int(datetime.now().timestamp())
@@ -42,31 +130,12 @@ async def insert_company(input: CompanyInput):
 async def search_similar_companies(input: CompanyInfo):
     """입력된 회사 정보와 유사한 회사들을 검색하는 엔드포인트"""
     try:
-        collection = get_collection()
-        query_embedding = get_company_embedding(input)
-        search_params = {"metric_type": "L2", "params": {"nprobe": 10}}
-        results = collection.search(
-            data=[query_embedding],
-            anns_field="embedding",
-            param=search_params,
-            limit=5,
-            output_fields=["content"],
-        )
+        query_embedding = await aget_company_embedding(input)
+        results = await _search_collection(company_info_to_text(input), query_embedding, limit=5)
 
         search_results = []
         for hits in results:
-            for hit in hits:
-                try:
-                    content = json.loads(hit.entity.get("content"))
-                    search_results.append(
-                        CompanySearchResult(
-                            businessName=content.get("businessName"),
-                            info=CompanyInfo(**content.get("info")),
-                            similarityScore=1 - hit.distance,
-                        )
-                    )
-                except json.JSONDecodeError as e:
-                    logger.error(f"JSON 디코드 오류: {e}")
+            search_results.extend(_to_company_results(hits))
         logger.info(f"{len(search_results)}개의 유사한 회사를 찾았습니다")
         return search_results
     except Exception as e:
@@ -74,64 +143,193 @@ async def search_similar_companies(input: CompanyInfo):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatInput):
+@router.post("/search_similar_companies/batch", response_model=List[List[CompanySearchResult]])
+async def search_similar_companies_batch(input: CompanyBatchSearchRequest):
+    """여러 회사의 유사 회사를 한 번에 검색하는 엔드포인트 (배치 임베딩 + 단일 검색 요청)"""
+    if len(input.companies) > settings.SIMILAR_COMPANY_MAX_BATCH:
+        raise HTTPException(
+            status_code=413, detail=f"한 번에 최대 {settings.SIMILAR_COMPANY_MAX_BATCH}개까지 검색할 수 있습니다. 더 많은 회사는 /search_similar_companies/stream을 사용하세요."
+        )
+    if not input.companies:
+        return []
     try:
-        response = await chatbot.get_response(request.message)
-
-        logger.info(f"Raw chatbot response: {response}")
-
-        # WebSearchResult 객체 리스트로 변환
-        web_results = []
-        for result in response.get("relevant_info", []):
-            try:
-                web_result = WebSearchResult(
-                    title=result.get("title") or "제목 없음",
-                    snippet=result.get("snippet") or "",
-                    url=result.get("url") or "https://example.com",
-                    image_url=result.get("image_url") or None,
-                )
-                web_results.append(web_result)
-            except ValueError as ve:
-                logger.error(f"WebSearchResult 생성 중 오류: {ve}")
+        query_embeddings = await aget_company_embeddings(input.companies)
+        results = await _search_collection_batch(query_embeddings, input.limit)
+        search_results = [_to_company_results(hits) for hits in results]
+        logger.info(f"{len(input.companies)}개 회사의 유사 회사 일괄 검색 완료")
+        return search_results
+    except Exception as e:
+        logger.error(f"유사 회사 일괄 검색 중 오류 발생: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # graph_data 타입 확인 및 처리
-        graph_data = response.get("graph_data")
-        if not isinstance(graph_data, dict):
-            logger.warning(f"Unexpected graph_data type: {type(graph_data)}. Setting to None.")
-            graph_data = None
 
-        chat_response = ChatResponse(
-            text_response=response.get("text_response", "응답을 생성하는 데 문제가 발생했습니다."),
-            web_results=web_results,
-            graph_data=graph_data,
-            image_url=response.get("image_url"),
+@router.post("/search_similar_companies/stream")
+async def search_similar_companies_stream(input: CompanyBatchSearchRequest):
+    """
+    대량의 회사를 일정 크기로 나누어 검색하고, 회사별 결과를 NDJSON 한 줄씩 스트리밍하는 엔드포인트
+    각 줄: {"index": 입력 순서, "results": [CompanySearchResult, ...]}
+    """
+    chunk_size = settings.SIMILAR_COMPANY_STREAM_CHUNK
+
+    async def embed_and_search(companies: List[CompanyInfo]):
+        return await _search_collection_batch(await aget_company_embeddings(companies), input.limit)
+
+    async def generate():
+        chunks = [input.companies[start : start + chunk_size] for start in range(0, len(input.companies), chunk_size)]
+        next_task = asyncio.ensure_future(embed_and_search(chunks[0])) if chunks else None
+        try:
+            for chunk_index in range(len(chunks)):
+                results = await next_task
+                # 현재 청크를 내보내는 동안 다음 청크의 임베딩/검색을 미리 시작
+                next_task = asyncio.ensure_future(embed_and_search(chunks[chunk_index + 1])) if chunk_index + 1 < len(chunks) else None
+                for offset, hits in enumerate(results):
+                    line = {"index": chunk_index * chunk_size + offset, "results": jsonable_encoder(_to_company_results(hits))}
+                    yield json.dumps(line, ensure_ascii=False) + "\n"
+        except Exception as e:
+            logger.error(f"유사 회사 스트리밍 검색 중 오류 발생: {str(e)}")
+            yield json.dumps({"error": str(e)}, ensure_ascii=False) + "\n"
+        finally:
+            if next_task is not None and not next_task.done():
+                next_task.cancel()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+def _format_web_results(relevant_info: list) -> list:
+    """
+    검색 결과를 응답의 web_results 형식으로 변환합니다. (URL이 없거나 잘못된 결과는 제외)
+    """
+    web_results = []
+    for result in relevant_info:
+        url = result.get("url") or "https://example.com"
+        if not str(url).startswith(("http://", "https://")):
+            logger.error(f"WebSearchResult 생성 중 오류: 잘못된 URL {url}")
+            continue
+        image_url = result.get("image_url") or None
+        web_results.append(
+            {
+                "title": result.get("title") or "제목 없음",
+                "snippet": result.get("snippet") or "",
+                "url": url,
+                "image_url": image_url if image_url and str(image_url).startswith(("http://", "https://")) else None,
+            }
         )
+    return web_results
+
 
-        logger.info(f"챗봇 응답이 성공적으로 생성되었습니다. 응답: {chat_response}")
-        return chat_response
+async def _build_chat_payload(response: dict, graph_format: str) -> dict:
+    """
+    챗봇 응답을 ChatResponse 형식의 딕셔너리로 변환합니다.
+    :param response: Chatbot이 반환한 응답
+    :param graph_format: 그래프 데이터 형식 (compact 또는 plotly)
+    """
+    web_results = _format_web_results(response.get("relevant_info", []))
+
+    # graph_data 타입 확인 및 처리
+    graph_data = response.get("graph_data")
+    if not isinstance(graph_data, dict):
+        if graph_data is not None:
+            logger.warning(f"Unexpected graph_data type: {type(graph_data)}. Setting to None.")
+        graph_data = None
+    elif graph_format == "plotly":
+        # 요청한 경우에만 Plotly 그림으로 변환 (CPU 작업이므로 스레드에서 실행)
+        graph_data = await asyncio.to_thread(chatbot.graph_generator.render_plotly, graph_data)
+
+    text_response = response.get("text_response", "응답을 생성하는 데 문제가 발생했습니다.")
+    logger.info(f"챗봇 응답이 성공적으로 생성되었습니다. (응답 {len(text_response)}자, 웹 결과 {len(web_results)}개, 그래프 {'있음' if graph_data else '없음'})")
+    return {
+        "text_response": text_response,
+        "web_results": web_results,
+        "graph_data": graph_data,
+        "image_url": response.get("image_url"),
+        "skipped_stages": response.get("skipped_stages", []),
+    }
+
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat(request: ChatInput):
+    # 응답은 서버가 직접 만든 데이터이므로 ChatResponse 모델 검증을 거치지 않고 바로 직렬화
+    try:
+        response = await chatbot.get_response(request.message, budget=request.timeout)
+        return FastJSONResponse(await _build_chat_payload(response, request.graph_format))
 
     except Exception as e:
         logger.error(f"챗봇 응답 생성 중 오류 발생: {str(e)}", exc_info=True)
-        return ChatResponse(text_response="내부 서버 오류가 발생했습니다. 나중에 다시 시도해 주세요.", web_results=[], graph_data=None, image_url=None)
+        return FastJSONResponse(
+            {"text_response": "내부 서버 오류가 발생했습니다. 나중에 다시 시도해 주세요.", "web_results": [], "graph_data": None, "image_url": None, "skipped_stages": []}
+        )
+
+
+@router.websocket("/ws/chat")
+async def chat_socket(websocket: WebSocket):
+    """연결이 유지되는 동안 대화를 이어 가는 WebSocket 채팅. 응답 생성 중 검색 결과, 토큰, 그래프 데이터를 순서대로 전송합니다."""
+    await ChatConnection(websocket, chatbot, _build_chat_payload, _format_web_results).serve()
+
+
+async def _run_graph_job(query: str, options: dict) -> dict:
+    response = await chatbot.get_graph_response(query, budget=options.get("timeout") or settings.GRAPH_JOB_DEADLINE)
+    if response.get("error"):
+        # 그래프를 만들지 못한 경우 작업을 실패로 기록 (안내 문구는 error와 함께 남김)
+        raise RuntimeError(f"{response.get('text_response')} ({response['error']})")
+    return await _build_chat_payload(response, options["graph_format"])
+
+
+graph_jobs = GraphJobManager(_run_graph_job, store=create_job_store())
+
+
+@router.post("/graph_jobs", status_code=202, response_model=GraphJobAccepted)
+async def submit_graph_job(request: GraphJobRequest):
+    """그래프 생성 요청을 백그라운드 작업으로 등록하고 작업 ID를 즉시 반환합니다. 같은 요청이 진행 중이면 기존 작업 ID를 반환합니다."""
+    try:
+        return await graph_jobs.submit(request.message, {"graph_format": request.graph_format, "timeout": request.timeout})
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+
+
+@router.get("/graph_jobs/{job_id}", response_model=GraphJobStatus)
+async def get_graph_job(job_id: str):
+    """그래프 작업의 상태, 단계별 진행 상황과 결과를 반환합니다."""
+    snapshot = await graph_jobs.get(job_id)
+    if snapshot is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없거나 결과 보관 기간이 지났습니다.")
+    return FastJSONResponse(snapshot)
+
+
+@router.get("/graph_jobs/{job_id}/events")
+async def stream_graph_job(job_id: str):
+    """그래프 작업의 진행 상황을 Server-Sent Events로 전송합니다. (snapshot, stage, status, done 이벤트)"""
+    if await graph_jobs.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없거나 결과 보관 기간이 지났습니다.")
+
+    async def generate():
+        events = graph_jobs.events(job_id).__aiter__()
+        next_event = asyncio.ensure_future(events.__anext__())
+        try:
+            while True:
+                # 이벤트가 없는 동안에는 주기적으로 주석 줄을 보내 프록시가 연결을 끊지 않도록 함
+                done, _ = await asyncio.wait({next_event}, timeout=settings.GRAPH_JOB_HEARTBEAT)
+                if not done:
+                    yield ": heartbeat\n\n"
+                    continue
+                try:
+                    event = next_event.result()
+                except StopAsyncIteration:
+                    break
+                yield f"event: {event['event']}\ndata: {json.dumps(jsonable_encoder(event['data']), ensure_ascii=False)}\n\n"
+                next_event = asyncio.ensure_future(events.__anext__())
+        finally:
+            next_event.cancel()
+            await events.aclose()
+
+    return StreamingResponse(generate(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 @router.post("/viability_search", response_model=List[dict])
 async def business_viability_assessment_search(input: SupportProgramInfoSearchRequest):
     """입력된 지원 프로그램 정보를 바탕으로 유사한 회사들을 검색하는 엔드포인트"""
     try:
-        collection = get_collection()
-        query_embedding = get_support_program_embedding(input.query)
-        search_params = {"metric_type": "L2", "params": {"nprobe": 10}}
-        results = collection.search(
-            data=[query_embedding],
-            anns_field="embedding",
-            param=search_params,
-            limit=input.k,
-            output_fields=["content"],
-        )
-
-        logger.info(f"Raw search results: {results}")
+        query_embedding = await aget_support_program_embedding(input.query)
+        results = await _search_collection(support_program_info_to_text(input.query), query_embedding, limit=input.k)
 
         search_results = []
         for hits in results:
@@ -154,14 +352,46 @@ async def business_viability_assessment_search(input: SupportProgramInfoSearchRe
 
                     # 유사도 계산: 0에 가까울수록 유사, 1에 가까울수록 상이
                     similarity = 1 - (hit.distance / (max(hit.distance, 1) * 2))
-                    logger.info(f"Calculated similarity: {similarity}")
+                    logger.debug(f"Calculated similarity: {similarity:.4f}")
                     if similarity >= input.threshold:
                         search_results.append({"content": {"businessName": content.get("businessName"), "info": content.get("info")}, "metadata": {}})
                 except Exception as e:
-                    logger.error(f"처리 중 오류 발생: {str(e)}, 원본 데이터: {hit.entity}")
+                    logger.error(f"처리 중 오류 발생: {str(e)}, 원본 데이터: {truncate(hit.entity.get('content'))}")
 
-        logger.info(f"Processed search results: {search_results}")
+        logger.info(f"사업 가능성 검색 완료: 후보 {sum(len(hits) for hits in results)}개 중 {len(search_results)}개가 임계값 {input.threshold} 이상")
         return search_results
     except Exception as e:
         logger.error(f"사업 가능성 검색 중 오류 발생: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """
+    단계별 소요 시간 히스토그램, 캐시/업스트림 통계를 Prometheus 텍스트 형식으로 반환합니다.
+    """
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@router.get("/health/live", include_in_schema=False)
+async def health_live():
+    """
+    프로세스(워커)가 이벤트 루프를 처리하고 있는지 확인합니다.
+    """
+    return {"status": "ok", "pid": os.getpid()}
+
+
+@router.get("/health/ready")
+async def health_ready(request: Request):
+    """
+    워커가 요청을 받을 준비가 되었는지 확인합니다. (시작 완료 및 Milvus 컬렉션 접근 가능 여부)
+    준비되지 않았으면 503을 반환하여 로드밸런서가 해당 워커/인스턴스로 요청을 보내지 않도록 합니다.
+    """
+    checks = {"startup": getattr(request.app.state, "ready", False), "milvus": False}
+    if checks["startup"]:
+        try:
+            checks["milvus"] = await asyncio.wait_for(asyncio.to_thread(has_collection), timeout=settings.HEALTH_CHECK_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"준비 상태 확인 중 Milvus 확인 실패: {str(e)}")
+    ready = all(checks.values())
+    return FastJSONResponse({"status": "ready" if ready else "not_ready", "pid": os.getpid(), "checks": checks}, status_code=200 if ready else 503)
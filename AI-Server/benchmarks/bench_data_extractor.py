@@ -0,0 +1,154 @@
+"""
+규칙 기반 시계열 추출기(DataExtractor)의 적중률과 지연 시간을 측정하는 벤치마크
+
+사용법 (AI-Server 디렉토리에서 실행):
+    python -m benchmarks.bench_data_extractor
+    python -m benchmarks.bench_data_extractor --with-llm   # OPENAI_API_KEY가 있으면 LLM 추출 경로와 비교
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Any, Dict, List
+
+from utils.data_extractor import DataExtractor
+from utils.page_fetcher import extract_text
+
+# (설명, HTML, 데이터 필드, 기대 값 {연도: 값})
+SAMPLES: List[Dict[str, Any]] = [
+    {
+        "name": "연도 머리글 표",
+        "html": """<html><body><h1>주요 경제지표</h1>
+            <table><tr><th>구분</th><th>2019</th><th>2020</th><th>2021</th><th>2022</th></tr>
+            <tr><td>경제성장률(%)</td><td>2.2</td><td>△0.7</td><td>4.3</td><td>2.6</td></tr>
+            <tr><td>소비자물가 상승률(%)</td><td>0.4</td><td>0.5</td><td>2.5</td><td>5.1</td></tr></table></body></html>""",
+        "fields": ["경제성장률"],
+        "expected": {2019: 2.2, 2020: -0.7, 2021: 4.3, 2022: 2.6},
+    },
+    {
+        "name": "연도 열 표",
+        "html": """<html><body><table><tr><th>연도</th><th>매출액(억원)</th><th>영업이익(억원)</th></tr>
+            <tr><td>2020년</td><td>1,250</td><td>120</td></tr>
+            <tr><td>2021년</td><td>1,480</td><td>150</td></tr>
+            <tr><td>2022년</td><td>1,730</td><td>95</td></tr></table></body></html>""",
+        "fields": ["영업이익"],
+        "expected": {2020: 120.0, 2021: 150.0, 2022: 95.0},
+    },
+    {
+        "name": "본문 연도-값 (%)",
+        "html": """<html><body><article><p>한국 경제성장률은 2019년 2.2%, 2020년 -0.7%, 2021년 4.3%를 기록했다.</p>
+            <p>2019년 12월 발표된 자료 기준이다.</p></article></body></html>""",
+        "fields": ["경제성장률"],
+        "expected": {2019: 2.2, 2020: -0.7, 2021: 4.3},
+    },
+    {
+        "name": "본문 연도-값 (만대)",
+        "html": """<html><body><p>국내 전기차 판매량은 2021년 10만대, 2022년에는 16만대, 2023년: 17만 대로 증가했다.</p>
+            <p>2020년 직원 수는 300명이었다.</p></body></html>""",
+        "fields": ["전기차 판매량"],
+        "expected": {2021: 10.0, 2022: 16.0, 2023: 17.0},
+    },
+    {
+        "name": "관련 없는 본문 수치",
+        "html": """<html><body><h2>회사 소개</h2><p>2022년 직원 150명</p><p>2023년 직원 200명</p></body></html>""",
+        "fields": ["경제성장률"],
+        "expected": {},
+    },
+    {
+        "name": "관련 없는 연도 머리글 표",
+        "html": """<html><body><table><tr><th>구분</th><th>2021</th><th>2022</th><th>2023</th></tr>
+            <tr><td>방문자 수(명)</td><td>12,000</td><td>15,500</td><td>18,200</td></tr></table></body></html>""",
+        "fields": ["경제성장률"],
+        "expected": {},
+    },
+    {
+        "name": "관련 없는 연도 열 표",
+        "html": """<html><body><table><tr><th>연도</th><th>매출액(억원)</th><th>직원 수</th></tr>
+            <tr><td>2021</td><td>1,480</td><td>210</td></tr>
+            <tr><td>2022</td><td>1,730</td><td>245</td></tr></table></body></html>""",
+        "fields": ["물가 상승률"],
+        "expected": {},
+    },
+    {
+        "name": "수치 없는 페이지",
+        "html": """<html><body><p>경제성장률은 경제 규모가 얼마나 커졌는지를 나타내는 지표입니다.</p></body></html>""",
+        "fields": ["경제성장률"],
+        "expected": {},
+    },
+]
+
+
+def _to_series(records: List[Dict[str, Any]]) -> Dict[int, float]:
+    return {int(record["date"][:4]): record["value"] for record in records}
+
+
+def _is_correct(records: List[Dict[str, Any]], expected: Dict[int, float]) -> bool:
+    return _to_series(records) == expected
+
+
+def run_rule_based(samples: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    extractor = DataExtractor()
+    latencies = []
+    hits = correct = 0
+    for sample in samples:
+        text = extract_text(sample["html"])
+        for _ in range(repeat):
+            start = time.perf_counter()
+            records = extractor.extract(sample["html"], text, sample["fields"])
+            latencies.append((time.perf_counter() - start) * 1000)
+        hits += bool(records) and bool(sample["expected"])
+        correct += _is_correct(records, sample["expected"])
+        print(f"  [규칙] {sample['name']}: {_to_series(records)}")
+    return _summary("rule_based", samples, hits, correct, latencies)
+
+
+async def run_llm(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # 실제 LLM 호출이 필요하므로 --with-llm 옵션에서만 불러옴
+    from utils.graph_generator import GraphGenerator
+
+    generator = GraphGenerator()
+    latencies = []
+    hits = correct = 0
+    for sample in samples:
+        text = extract_text(sample["html"])
+        start = time.perf_counter()
+        records = await generator._extract_data_from_content(text, sample["fields"])
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += bool(records) and bool(sample["expected"])
+        correct += _is_correct(records, sample["expected"])
+        print(f"  [LLM] {sample['name']}: {_to_series(records)}")
+    return _summary("llm", samples, hits, correct, latencies)
+
+
+def _summary(name: str, samples: List[Dict[str, Any]], hits: int, correct: int, latencies: List[float]) -> Dict[str, Any]:
+    answerable = sum(1 for sample in samples if sample["expected"])
+    return {
+        "path": name,
+        "hit_rate": round(hits / answerable, 4) if answerable else 0.0,
+        "accuracy": round(correct / len(samples), 4),
+        "latency_ms_p50": round(statistics.median(latencies), 3),
+        "latency_ms_max": round(max(latencies), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="규칙 기반 시계열 추출 벤치마크")
+    parser.add_argument("--repeat", type=int, default=50, help="샘플당 규칙 기반 추출 반복 횟수")
+    parser.add_argument("--with-llm", action="store_true", help="LLM 추출 경로와 비교 (OPENAI_API_KEY 필요)")
+    args = parser.parse_args()
+
+    results = [run_rule_based(SAMPLES, args.repeat)]
+    if args.with_llm:
+        results.append(asyncio.run(run_llm(SAMPLES)))
+
+    print()
+    for result in results:
+        print(
+            f"{result['path']:>10}: 적중률 {result['hit_rate']:.0%}, 정확도 {result['accuracy']:.0%}, "
+            f"지연 p50 {result['latency_ms_p50']:.2f}ms, 최대 {result['latency_ms_max']:.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
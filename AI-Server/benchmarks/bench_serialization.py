@@ -0,0 +1,139 @@
+"""
+/chat 응답 직렬화 시간과 전송 크기를 비교하는 벤치마크
+
+- pydantic 검증 + 기본 JSON 직렬화 (이전 /chat 경로)
+- 검증 없이 표준 json 직렬화
+- 검증 없이 orjson 직렬화 (현재 /chat 경로)
+그리고 원본/gzip/brotli 크기와 압축 시간을 그래프 형식(compact, plotly)별로 측정합니다.
+
+사용법 (AI-Server 디렉토리에서 실행):
+    python -m benchmarks.bench_serialization --points 20 --repeat 200
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+
+from services.models import ChatResponse
+from utils.responses import compress, encoded_sizes
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def make_compact_graph(points: int) -> Dict[str, Any]:
+    years = list(range(2024 - points, 2024))
+    return {
+        "type": "line",
+        "title": "경제성장률 추이",
+        "x": [f"{year}-01-01" for year in years],
+        "y": [round(2 + (year % 7) * 0.37 - (year % 3), 2) for year in years],
+        "x_label": "날짜",
+        "y_label": "경제성장률",
+        "series_name": "경제성장률",
+    }
+
+
+def make_plotly_graph(compact: Dict[str, Any]) -> Dict[str, Any]:
+    # 실제 Plotly 그림 (기본 템플릿 포함). plotly가 없으면 None
+    try:
+        import plotly.graph_objects as go
+    except ImportError:
+        return None
+    fig = go.Figure(go.Scatter(x=compact["x"], y=compact["y"], mode="lines+markers", name=compact["series_name"]))
+    fig.update_layout(title=compact["title"], xaxis_title=compact["x_label"], yaxis_title=compact["y_label"])
+    return json.loads(fig.to_json())
+
+
+def make_response(graph_data: Dict[str, Any], web_results: int) -> Dict[str, Any]:
+    return {
+        "text_response": "한국의 경제성장률은 2020년 코로나19 영향으로 역성장한 뒤 2021년에 크게 반등했습니다. " * 8,
+        "web_results": [
+            {
+                "title": f"경제성장률 통계 {i}",
+                "snippet": "한국은행이 발표한 실질 GDP 성장률 자료에 따르면 ... " * 3,
+                "url": f"https://example.com/stats/{i}",
+                "image_url": None,
+            }
+            for i in range(web_results)
+        ],
+        "graph_data": graph_data,
+        "image_url": None,
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def serializers(payload: Dict[str, Any]) -> Dict[str, Callable[[], bytes]]:
+    candidates = {
+        # FastAPI가 response_model로 하던 작업: 모델 생성/검증 -> jsonable_encoder -> json.dumps
+        "pydantic+json": lambda: json.dumps(jsonable_encoder(ChatResponse(**payload)), ensure_ascii=False).encode("utf-8"),
+        "json": lambda: json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+    }
+    if orjson is not None:
+        candidates["orjson"] = lambda: orjson.dumps(payload)
+    return candidates
+
+
+def run(points: int, web_results: int, repeat: int) -> List[Dict[str, Any]]:
+    compact = make_compact_graph(points)
+    graphs = {"compact": compact, "plotly": make_plotly_graph(compact)}
+    rows = []
+    for graph_format, graph_data in graphs.items():
+        if graph_data is None:
+            print(f"plotly가 설치되어 있지 않아 {graph_format} 형식은 건너뜁니다.")
+            continue
+        payload = make_response(graph_data, web_results)
+        for name, serialize in serializers(payload).items():
+            body = serialize()
+            raw, gzip_size, br_size = encoded_sizes(body)
+            rows.append(
+                {
+                    "graph_format": graph_format,
+                    "serializer": name,
+                    "serialize_ms": round(measure(serialize, repeat), 4),
+                    "raw_bytes": raw,
+                    "gzip_bytes": gzip_size,
+                    "gzip_ms": round(measure(lambda: compress(body, "gzip"), repeat), 4),
+                    "br_bytes": br_size,
+                    "br_ms": round(measure(lambda: compress(body, "br"), repeat), 4) if br_size is not None else None,
+                }
+            )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/chat 응답 직렬화/압축 벤치마크")
+    parser.add_argument("--points", type=int, default=20, help="그래프 데이터 포인트 수")
+    parser.add_argument("--web-results", type=int, default=10, help="응답에 포함할 웹 검색 결과 수")
+    parser.add_argument("--repeat", type=int, default=200, help="측정 반복 횟수")
+    parser.add_argument("--output", default="", help="결과 JSON 경로 (선택)")
+    args = parser.parse_args()
+
+    rows = run(args.points, args.web_results, args.repeat)
+    print(f"{'형식':<9}{'직렬화':<15}{'직렬화ms':>10}{'원본B':>9}{'gzipB':>9}{'gzip ms':>9}{'brB':>9}{'br ms':>9}")
+    for row in rows:
+        print(
+            f"{row['graph_format']:<9}{row['serializer']:<15}{row['serialize_ms']:>10}{row['raw_bytes']:>9}"
+            f"{row['gzip_bytes']:>9}{row['gzip_ms']:>9}{str(row['br_bytes']):>9}{str(row['br_ms']):>9}"
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": rows}, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,334 @@
+"""
+API 부하 테스트 및 지연 시간 벤치마크
+
+FastAPI 앱을 프로세스 안에서 띄우고 Milvus와 OpenAI/Serper/웹 페이지를 로컬 대체 구현으로 바꾼 뒤,
+/chat, /insert_company, /search_similar_companies, /viability_search 를 지정한 동시성으로 호출하여
+엔드포인트별 처리량과 p50/p95/p99 지연 시간, 파이프라인 단계별 지연 시간을 JSON 파일로 저장합니다.
+
+사용법 (AI-Server 디렉토리에서 실행):
+    python -m benchmarks.load_test --requests 200 --concurrency 16
+    python -m benchmarks.load_test --upstream replay --cassette-dir data/cassettes   # 녹화된 실제 응답 사용
+    python -m benchmarks.load_test --baseline benchmarks/results/baseline.json       # 기준 대비 회귀 확인 (회귀 시 종료 코드 1)
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Callable, Dict, List
+
+CHAT_MESSAGES = [
+    "예비창업자가 신청할 수 있는 정부 지원 사업을 알려줘",
+    "초기 창업 기업의 투자 유치 방법이 궁금해",
+    "사업자등록 절차를 알려줘",
+    "한국 경제성장률 추이 그래프 보여줘",
+]
+
+COMPANY_FIELDS = {
+    "businessPlatform": ["SaaS", "제조업", "플랫폼", "커머스"],
+    "businessScale": ["스타트업", "중소기업", "대기업"],
+    "business_field": ["AI, 모바일", "바이오", "금융", "교육", "물류"],
+    "investmentStatus": ["시드", "시리즈 A", "시리즈 B", "주식회사"],
+    "customerType": ["B2B", "B2C", "B2B, B2C", "B2G"],
+}
+
+# 단계별 지연 시간 측정 대상 (모듈 경로, 클래스 이름, 메서드 이름, 단계 이름)
+STAGES = [
+    ("utils.intent_analyzer", "IntentAnalyzer", "analyze_intent", "intent"),
+    ("utils.query_generator", "QueryGenerator", "generate_queries", "query_generation"),
+    ("utils.web_search", "WebSearch", "search", "web_search"),
+    ("utils.vector_store", "VectorStore", "asearch_with_similarity_threshold", "vector_search"),
+    ("utils.page_fetcher", "PageFetcher", "fetch", "page_fetch"),
+    ("utils.graph_generator", "GraphGenerator", "analyze_query", "graph_analysis"),
+    ("utils.graph_generator", "GraphGenerator", "process_graph_request", "graph_generation"),
+    ("services.chatbot", "Chatbot", "_predict", "llm_answer"),
+]
+
+
+def percentile(samples: List[float], p: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    # 지연 시간은 밀리초 단위
+    return {
+        "count": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 2) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p95_ms": round(percentile(samples, 95) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        "max_ms": round(max(samples) * 1000, 2) if samples else 0.0,
+    }
+
+
+class StageRecorder:
+    """
+    지정한 메서드를 감싸 호출별 소요 시간을 단계 이름으로 기록합니다.
+    """
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def install(self, stages):
+        import importlib
+
+        for module_name, class_name, method_name, stage in stages:
+            cls = getattr(importlib.import_module(module_name), class_name)
+            setattr(cls, method_name, self._wrap(getattr(cls, method_name), stage))
+
+    def _wrap(self, method: Callable, stage: str) -> Callable:
+        @functools.wraps(method)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - start)
+
+        return wrapper
+
+
+def configure_environment(args):
+    # settings를 불러오기 전에 환경 변수를 지정해야 함
+    workdir = tempfile.mkdtemp(prefix="jiwoo-bench-")
+    os.environ["SERIES_STORE_PATH"] = os.path.join(workdir, "graph_series.db") if args.series_store else ""
+    os.environ["SEARCH_CACHE_PATH"] = ""
+    os.environ["INGEST_ENABLED"] = "false"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    if args.upstream == "replay":
+        os.environ["TRANSPORT_MODE"] = "replay"
+        os.environ["TRANSPORT_CASSETTE_DIR"] = args.cassette_dir
+        os.environ["TRANSPORT_REPLAY_LATENCY_SCALE"] = str(args.latency_scale)
+
+
+def install_stand_ins(args):
+    """
+    앱 모듈을 불러오기 전에 Milvus 연결과 외부 서비스 호출을 로컬 대체 구현으로 교체합니다.
+    """
+    import pymilvus
+    import utils.database as database
+    import utils.transport as transport
+    from benchmarks.stubs import FakeCollection, StubTransport
+    from config.settings import settings
+
+    collections: Dict[str, FakeCollection] = {}
+
+    def get_collection(collection_name: str = settings.COLLECTION_NAME):
+        if collection_name not in collections:
+            collections[collection_name] = FakeCollection(collection_name, settings.EMBEDDING_DIMENSION)
+        return collections[collection_name]
+
+    database.connect_to_milvus = lambda: None
+    database.close_milvus_connection = lambda: None
+    database.get_collection = get_collection
+    pymilvus.utility.has_collection = lambda name, *a, **kw: True
+
+    if args.upstream == "stub":
+        latencies = {"openai": args.llm_latency, "serper": args.search_latency, "page": args.page_latency}
+        transport._transport = StubTransport(latencies, jitter=args.jitter, seed=args.seed)
+    return get_collection
+
+
+def seed_companies(get_collection, count: int, rng: random.Random):
+    # 유사 기업 검색이 의미 있도록 가상 기업을 미리 저장 (임베딩은 배치로 계산)
+    from config.settings import settings
+    from utils.embedding_utils import get_embeddings
+
+    companies = [make_company(rng) for _ in range(count)]
+    texts = [" ".join([c["businessPlatform"], c["businessScale"], c["business_field"], c["businessStartDate"], c["investmentStatus"], c["customerType"]]) for c in companies]
+    embeddings = get_embeddings(texts)
+    contents = [json.dumps({"businessName": f"기업{i}", "info": company}, ensure_ascii=False) for i, company in enumerate(companies)]
+    get_collection(settings.COLLECTION_NAME).insert([contents, embeddings])
+
+
+def make_company(rng: random.Random) -> Dict[str, str]:
+    company = {field: rng.choice(values) for field, values in COMPANY_FIELDS.items()}
+    company["businessStartDate"] = f"{rng.randint(2000, 2024)}-{rng.randint(1, 12):02d}-01"
+    return company
+
+
+def make_request(endpoint: str, rng: random.Random) -> Dict[str, Any]:
+    if endpoint == "chat":
+        return {"message": rng.choice(CHAT_MESSAGES)}
+    if endpoint == "insert_company":
+        return {"businessName": f"벤치기업{rng.randint(0, 10**6)}", "info": make_company(rng)}
+    if endpoint == "search_similar_companies":
+        return make_company(rng)
+    if endpoint == "viability_search":
+        return {
+            "query": {
+                "name": "예비창업패키지",
+                "target": "예비창업자",
+                "scare_of_support": "최대 1억원",
+                "support_content": "사업화 자금, 멘토링",
+                "support_characteristics": rng.choice(["AI", "바이오", "제조"]) + " 분야 우대",
+                "support_info": "창업 아이템 사업화 지원",
+                "support_year": 2024,
+            },
+            "threshold": 0.5,
+            "k": 5,
+        }
+    raise ValueError(f"알 수 없는 엔드포인트: {endpoint}")
+
+
+async def run_load(client, endpoints: List[str], total: int, concurrency: int, rng: random.Random) -> Dict[str, Any]:
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    jobs = [endpoints[i % len(endpoints)] for i in range(total)]
+    rng.shuffle(jobs)
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+
+    async def worker():
+        while True:
+            try:
+                endpoint = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            payload = make_request(endpoint, rng)
+            start = time.perf_counter()
+            try:
+                response = await client.post(f"/{endpoint}", json=payload)
+                body = response.json()
+                # /chat은 오류 시에도 200과 함께 오류 메시지를 반환하므로 본문으로도 확인
+                failed = response.status_code >= 400 or (endpoint == "chat" and "내부 서버 오류" in str(body.get("text_response", "")))
+            except Exception:
+                failed = True
+            latencies[endpoint].append(time.perf_counter() - start)
+            if failed:
+                errors[endpoint] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    results = {}
+    for endpoint in endpoints:
+        samples = latencies[endpoint]
+        results[endpoint] = {**summarize(samples), "errors": errors[endpoint], "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0}
+    return {"elapsed_s": round(elapsed, 3), "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0, "endpoints": results}
+
+
+async def run_benchmark(args) -> Dict[str, Any]:
+    import httpx
+
+    rng = random.Random(args.seed)
+    stage_recorder = StageRecorder()
+
+    if args.base_url:
+        # 이미 실행 중인 서버를 호출 (단계별 지연 시간은 측정하지 않음)
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        async with client:
+            await run_load(client, args.endpoints, args.warmup, args.concurrency, rng)
+            return await run_load(client, args.endpoints, args.requests, args.concurrency, rng)
+
+    get_collection = install_stand_ins(args)
+    from main import app
+
+    stage_recorder.install(STAGES)
+    async with app.router.lifespan_context(app):
+        if args.seed_companies:
+            await asyncio.to_thread(seed_companies, get_collection, args.seed_companies, rng)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            await run_load(client, args.endpoints, args.warmup, args.concurrency, rng)
+            stage_recorder.samples.clear()
+            result = await run_load(client, args.endpoints, args.requests, args.concurrency, rng)
+    result["stages"] = {stage: summarize(samples) for stage, samples in sorted(stage_recorder.samples.items())}
+    return result
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    기준 결과와 비교하여 p95 지연 시간 또는 처리량이 허용 비율 이상 나빠진 항목을 반환합니다.
+    """
+    regressions = []
+    for endpoint, current in result["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(endpoint)
+        if not previous:
+            continue
+        if previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{endpoint} p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+        if previous["throughput_rps"] and current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            regressions.append(f"{endpoint} 처리량 {previous['throughput_rps']} -> {current['throughput_rps']} req/s")
+    for stage, current in result.get("stages", {}).items():
+        previous = baseline.get("stages", {}).get(stage)
+        if previous and previous["p95_ms"] and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"단계 {stage} p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms")
+    return regressions
+
+
+def print_report(result: Dict[str, Any]):
+    print(f"\n전체: {result['throughput_rps']} req/s ({result['elapsed_s']}초)")
+    print(f"{'엔드포인트':<28}{'요청':>6}{'오류':>6}{'req/s':>9}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for endpoint, stats in result["endpoints"].items():
+        print(f"{endpoint:<28}{stats['count']:>6}{stats['errors']:>6}{stats['throughput_rps']:>9}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+    if result.get("stages"):
+        print(f"\n{'단계':<28}{'호출':>6}{'p50':>10}{'p95':>10}{'p99':>10}")
+        for stage, stats in result["stages"].items():
+            print(f"{stage:<28}{stats['count']:>6}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Jiwoo AI 서버 부하 테스트")
+    parser.add_argument("--endpoints", default="chat,insert_company,search_similar_companies,viability_search", help="쉼표로 구분한 대상 엔드포인트")
+    parser.add_argument("--requests", type=int, default=200, help="측정할 전체 요청 수")
+    parser.add_argument("--warmup", type=int, default=20, help="측정 전 워밍업 요청 수")
+    parser.add_argument("--concurrency", type=int, default=16, help="동시 요청 수")
+    parser.add_argument("--timeout", type=float, default=60.0, help="요청 시간 제한(초)")
+    parser.add_argument("--seed", type=int, default=42, help="난수 시드")
+    parser.add_argument("--base-url", default="", help="지정하면 실행 중인 서버를 호출 (예: http://localhost:8000)")
+    parser.add_argument("--upstream", choices=["stub", "replay"], default="stub", help="외부 서비스 대체 방식")
+    parser.add_argument("--cassette-dir", default="data/cassettes", help="replay 모드의 녹화 디렉토리")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="replay 모드의 녹화된 지연 배율")
+    parser.add_argument("--llm-latency", type=float, default=0.8, help="stub 모드의 LLM 응답 지연(초)")
+    parser.add_argument("--search-latency", type=float, default=0.4, help="stub 모드의 검색 응답 지연(초)")
+    parser.add_argument("--page-latency", type=float, default=0.2, help="stub 모드의 웹 페이지 응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="stub 모드 지연의 무작위 변동 비율")
+    parser.add_argument("--seed-companies", type=int, default=500, help="미리 저장할 가상 기업 수")
+    parser.add_argument("--series-store", action="store_true", help="그래프 시계열 저장소 사용 (기본: 사용 안 함)")
+    parser.add_argument("--output", default="", help="결과 JSON 경로 (기본: benchmarks/results/load_<시각>.json)")
+    parser.add_argument("--baseline", default="", help="비교할 기준 결과 JSON 경로")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="회귀로 판단할 허용 비율")
+    args = parser.parse_args()
+    args.endpoints = [endpoint.strip() for endpoint in args.endpoints.split(",") if endpoint.strip()]
+
+    configure_environment(args)
+    result = asyncio.run(run_benchmark(args))
+    result["config"] = {key: value for key, value in vars(args).items() if key not in ("output", "baseline")}
+    result["environment"] = {"python": platform.python_version(), "platform": platform.platform(), "cpu_count": os.cpu_count()}
+    result["timestamp"] = datetime.now().isoformat(timespec="seconds")
+
+    output = args.output or os.path.join("benchmarks", "results", f"load_{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+
+    print_report(result)
+    print(f"\n결과 저장: {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(result, json.load(f), args.tolerance)
+        if regressions:
+            print("\n성능 회귀:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\n기준 대비 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+부하 테스트용 로컬 대체 구현
+- FakeCollection: 메모리에서 L2 전수 검색을 하는 Milvus 컬렉션 대체
+- StubTransport: OpenAI/Serper/웹 페이지 호출에 미리 정해진 응답을 인위적 지연과 함께 반환하는 전송 계층
+"""
+
+import asyncio
+import itertools
+import json
+import random
+import re
+import threading
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from utils.transport import Transport
+
+
+class _Entity:
+    def __init__(self, row: Dict[str, Any], output_fields: List[str]):
+        self._row = {field: row.get(field) for field in output_fields}
+
+    def get(self, field: str) -> Any:
+        return self._row.get(field)
+
+
+class _Hit:
+    def __init__(self, id: int, distance: float, entity: _Entity):
+        self.id = id
+        self.distance = distance
+        self.entity = entity
+
+
+class FakeCollection:
+    """
+    pymilvus Collection에서 서버가 사용하는 메서드만 구현한 메모리 컬렉션
+    벡터는 numpy 배열에 보관하고 검색은 제곱 L2 거리로 전수 비교합니다. (Milvus L2 지표와 동일)
+    """
+
+    def __init__(self, name: str, dim: int):
+        self.name = name
+        self.dim = dim
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._rows: List[Dict[str, Any]] = []
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+
+    @property
+    def num_entities(self) -> int:
+        return len(self._rows)
+
+    def insert(self, entities: List[List[Any]]):
+        # VectorStore 스키마 [content, url, embedding, created_at] 와 라우트의 [content, embedding] 모두 지원
+        if len(entities) == 2:
+            contents, embeddings = entities
+            urls, created = [""] * len(contents), [0] * len(contents)
+        else:
+            contents, urls, embeddings, created = entities
+        ids = []
+        with self._lock:
+            for content, url, created_at in zip(contents, urls, created):
+                row_id = next(self._ids)
+                self._rows.append({"id": row_id, "content": content, "url": url, "created_at": created_at})
+                ids.append(row_id)
+            self._vectors = np.vstack([self._vectors, np.asarray(embeddings, dtype=np.float32)])
+        return SimpleNamespace(primary_keys=ids, insert_count=len(ids))
+
+    def search(self, data, anns_field, param, limit, output_fields=None, expr=None, **kwargs):
+        with self._lock:
+            vectors, rows = self._vectors, list(self._rows)
+        output_fields = output_fields or []
+        results = []
+        for query in np.asarray(data, dtype=np.float32):
+            if not rows:
+                results.append([])
+                continue
+            distances = ((vectors - query) ** 2).sum(axis=1)
+            order = np.argsort(distances)[:limit]
+            results.append([_Hit(rows[i]["id"], float(distances[i]), _Entity(rows[i], output_fields)) for i in order])
+        return results
+
+    def delete(self, expr: str):
+        match = re.match(r'\s*url\s*==\s*(".*")\s*$', expr)
+        if not match:
+            return SimpleNamespace(delete_count=0)
+        url = json.loads(match.group(1))
+        with self._lock:
+            keep = [i for i, row in enumerate(self._rows) if row["url"] != url]
+            deleted = len(self._rows) - len(keep)
+            self._rows = [self._rows[i] for i in keep]
+            self._vectors = self._vectors[keep]
+        return SimpleNamespace(delete_count=deleted)
+
+    def flush(self):
+        pass
+
+    def load(self):
+        pass
+
+    def release(self):
+        pass
+
+    def has_index(self) -> bool:
+        return True
+
+    def create_index(self, field_name: str, index_params: Dict[str, Any]):
+        pass
+
+
+# 그래프 요청용 통계 페이지 (규칙 기반 추출기가 표에서 값을 읽을 수 있는 형태)
+_STATS_PAGE = """<html><head><title>주요 경제지표</title></head><body>
+<h1>연도별 주요 경제지표</h1>
+<table><tr><th>구분</th><th>2018</th><th>2019</th><th>2020</th><th>2021</th><th>2022</th><th>2023</th></tr>
+<tr><td>경제성장률(%)</td><td>2.9</td><td>2.2</td><td>△0.7</td><td>4.3</td><td>2.6</td><td>1.4</td></tr>
+<tr><td>소비자물가 상승률(%)</td><td>1.5</td><td>0.4</td><td>0.5</td><td>2.5</td><td>5.1</td><td>3.6</td></tr></table>
+<p>{filler}</p></body></html>"""
+
+_FILLER = "창업 지원 사업은 예비창업자와 초기 창업기업의 사업화 자금, 멘토링, 판로 개척을 지원합니다. " * 40
+
+
+class StubTransport(Transport):
+    """
+    외부 서비스 호출에 정해진 응답을 반환하는 전송 계층
+    서비스별 지연(초)에 ±jitter 비율의 무작위 변동을 적용합니다.
+    """
+
+    def __init__(self, latencies: Dict[str, float], jitter: float = 0.2, seed: int = 0):
+        # replay 모드로 초기화하여 LangChain 모델도 이 전송 계층을 거치도록 함
+        super().__init__(mode="replay", cassette_dir="", latency_scale=0.0, extra_latency=0.0, jitter=jitter)
+        self.latencies = latencies
+        self._random = random.Random(seed)
+
+    async def call(self, service: str, request: Any, func: Callable[[], Awaitable[Any]]) -> Any:
+        delay = self.latencies.get(service, 0.0)
+        if delay > 0:
+            await asyncio.sleep(delay * (1 + self._random.uniform(-self.jitter, self.jitter)))
+        self.stats["replayed"] += 1
+        if service == "openai":
+            return self._openai(json.dumps(request, ensure_ascii=False))
+        if service == "serper":
+            return self._serper(request)
+        if service == "page":
+            return self._page(request)
+        raise ValueError(f"알 수 없는 서비스: {service}")
+
+    def _openai(self, prompt: str) -> str:
+        if "의도를 분석" in prompt:
+            return "카테고리: 정보 요청\n키워드: 창업, 지원 사업"
+        if "검색 쿼리" in prompt or "쿼리를 생성" in prompt:
+            return "창업 지원 사업 2024\n예비창업패키지 신청 방법\n초기창업패키지 지원 대상"
+        if "그래프 유형" in prompt:
+            return "그래프 유형: line\n데이터 필드: 경제성장률"
+        if "가장 관련성 높은 URL" in prompt:
+            match = re.search(r"https?://[^\s\\\"]+", prompt)
+            return match.group(0) if match else ""
+        if "연도: [YYYY]" in prompt:
+            return "연도: 2019, 값: 2.2\n연도: 2020, 값: -0.7\n연도: 2021, 값: 4.3"
+        return "요청하신 내용에 대한 안내입니다. 예비창업패키지는 사업화 자금과 교육, 멘토링을 지원합니다. 자세한 내용은 K-Startup 공고를 확인해 주세요."
+
+    def _serper(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        query = payload.get("q", "")
+        organic = [
+            {"title": f"{query} 결과 {i}", "link": f"http://bench.local/page/{i}", "snippet": f"{query}에 대한 설명 {i}. " + _FILLER[:200], "position": i + 1}
+            for i in range(payload.get("num", 10))
+        ]
+        return {"searchParameters": payload, "organic": organic}
+
+    def _page(self, url: str) -> Optional[Dict[str, Any]]:
+        html = _STATS_PAGE.format(filler=_FILLER)
+        text = re.sub(r"<[^>]+>", "\n", html)
+        return {"url": url, "content_type": "text/html", "html": html, "text": text, "truncated": False}
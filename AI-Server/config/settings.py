@@ -1,3 +1,5 @@
+from typing import Any, Dict, List
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -15,23 +17,84 @@ class Settings(BaseSettings):
     MILVUS_HOST: str = Field(default="standalone", env="MILVUS_HOST")
     MILVUS_PORT: str = Field(default="19530", env="MILVUS_PORT")
     COLLECTION_NAME: str = "business_info"
+    # 벡터 인덱스/검색 설정 (JSON 형식의 환경 변수로 지정, 인덱스를 바꾸려면 migrate_collection.py로 새 컬렉션을 만들어 교체)
+    VECTOR_INDEX_PARAMS: Dict[str, Any] = Field(default={"index_type": "IVF_FLAT", "metric_type": "L2", "params": {"nlist": 1024}}, env="VECTOR_INDEX_PARAMS")
+    VECTOR_SEARCH_PARAMS: Dict[str, Any] = Field(default={"metric_type": "L2", "params": {"nprobe": 10}}, env="VECTOR_SEARCH_PARAMS")
 
     # 임베딩 모델 설정
     EMBEDDING_MODEL: str = "intfloat/multilingual-e5-base"
     EMBEDDING_DIMENSION: int = 768
 
+    # 로컬 임베딩 서버 설정 (EMBEDDING_SERVER_SOCKET이 있으면 모델을 직접 로드하지 않고 서버에 요청)
+    EMBEDDING_SERVER_SOCKET: str = Field(default="", env="EMBEDDING_SERVER_SOCKET")
+    EMBEDDING_SERVER_MAX_BATCH: int = Field(default=64, env="EMBEDDING_SERVER_MAX_BATCH")
+    EMBEDDING_SERVER_BATCH_WAIT: float = Field(default=0.005, env="EMBEDDING_SERVER_BATCH_WAIT")
+    EMBEDDING_SERVER_TIMEOUT: float = Field(default=30.0, env="EMBEDDING_SERVER_TIMEOUT")
+
     # FastAPI 설정
     API_V1_STR: str = "/api/v1"
 
-    # 로깅 설정
+    # 응답 압축 설정 (이 크기 이상인 응답만 압축)
+    COMPRESSION_MIN_SIZE: int = Field(default=1024, env="COMPRESSION_MIN_SIZE")
+    COMPRESSION_GZIP_LEVEL: int = Field(default=6, env="COMPRESSION_GZIP_LEVEL")
+    COMPRESSION_BROTLI_QUALITY: int = Field(default=4, env="COMPRESSION_BROTLI_QUALITY")
+
+    # 로깅 설정 (큐를 거쳐 백그라운드 스레드에서 출력)
     LOG_LEVEL: str = Field(default="INFO", env="LOG_LEVEL")
+    LOG_FORMAT: str = Field(default="json", env="LOG_FORMAT")  # json 또는 text
+    LOG_MAX_MESSAGE_CHARS: int = Field(default=2000, env="LOG_MAX_MESSAGE_CHARS")
+    LOG_MAX_PAYLOAD_CHARS: int = Field(default=300, env="LOG_MAX_PAYLOAD_CHARS")
+    LOG_QUEUE_SIZE: int = Field(default=10000, env="LOG_QUEUE_SIZE")
+    LOG_DEBUG_SAMPLE_RATE: float = Field(default=0.0, env="LOG_DEBUG_SAMPLE_RATE")  # 디버그 로그를 남길 요청 비율 (0~1)
+    LANGCHAIN_VERBOSE: bool = Field(default=False, env="LANGCHAIN_VERBOSE")
 
     # 서버 설정
     HOST: str = Field(default="0.0.0.0", env="HOST")
     PORT: int = Field(default=8000, env="PORT")
 
+    # 프로덕션 멀티 워커 서버 설정 (gunicorn.conf.py)
+    SERVER_WORKERS: int = Field(default=0, env="SERVER_WORKERS")  # 0이면 CPU 코어 수
+    SERVER_TIMEOUT: int = Field(default=120, env="SERVER_TIMEOUT")
+    SERVER_GRACEFUL_TIMEOUT: int = Field(default=30, env="SERVER_GRACEFUL_TIMEOUT")
+    SERVER_KEEPALIVE: int = Field(default=5, env="SERVER_KEEPALIVE")
+    SERVER_MAX_REQUESTS: int = Field(default=0, env="SERVER_MAX_REQUESTS")  # 0이면 요청 수에 따른 워커 재시작 안 함
+    SERVER_MAX_REQUESTS_JITTER: int = Field(default=0, env="SERVER_MAX_REQUESTS_JITTER")
+    SERVER_PRELOAD_MODEL: bool = Field(default=True, env="SERVER_PRELOAD_MODEL")
+    EMBEDDING_TORCH_THREADS: int = Field(default=0, env="EMBEDDING_TORCH_THREADS")  # 0이면 코어 수 / 워커 수
+    HEALTH_CHECK_TIMEOUT: float = Field(default=2.0, env="HEALTH_CHECK_TIMEOUT")
+
+    # 지표 설정 (METRICS_MULTIPROC_DIR을 지정하면 모든 워커의 지표를 합쳐서 반환, 비어 있으면 요청을 처리한 워커의 지표만 반환)
+    METRICS_MULTIPROC_DIR: str = Field(default="", env="METRICS_MULTIPROC_DIR")
+    METRICS_SNAPSHOT_INTERVAL: float = Field(default=5.0, env="METRICS_SNAPSHOT_INTERVAL")
+
     # Serper API 설정 (웹 검색용)
     SERPER_API_KEY: str = Field(default="", env="SERPER_API_KEY")
+    SERPER_QUERY_TIMEOUT: float = Field(default=5.0, env="SERPER_QUERY_TIMEOUT")
+    SERPER_CALL_CONCURRENCY: int = Field(default=5, env="SERPER_CALL_CONCURRENCY")
+
+    # 검색 결과 캐시 설정 (SEARCH_CACHE_PATH가 비어 있으면 메모리 캐시만 사용)
+    SEARCH_CACHE_TTL: float = Field(default=3600.0, env="SEARCH_CACHE_TTL")
+    SEARCH_CACHE_STALE_TTL: float = Field(default=86400.0, env="SEARCH_CACHE_STALE_TTL")
+    SEARCH_CACHE_MAXSIZE: int = Field(default=2048, env="SEARCH_CACHE_MAXSIZE")
+    SEARCH_CACHE_PATH: str = Field(default="", env="SEARCH_CACHE_PATH")
+
+    # 공유 HTTP 세션 설정
+    HTTP_POOL_LIMIT: int = Field(default=100, env="HTTP_POOL_LIMIT")
+    HTTP_POOL_LIMIT_PER_HOST: int = Field(default=20, env="HTTP_POOL_LIMIT_PER_HOST")
+    HTTP_KEEPALIVE_TIMEOUT: float = Field(default=30.0, env="HTTP_KEEPALIVE_TIMEOUT")
+    HTTP_TOTAL_TIMEOUT: float = Field(default=30.0, env="HTTP_TOTAL_TIMEOUT")
+
+    # 웹 페이지 가져오기 설정
+    PAGE_FETCH_MAX_BYTES: int = Field(default=2 * 1024 * 1024, env="PAGE_FETCH_MAX_BYTES")
+    PAGE_FETCH_CONNECT_TIMEOUT: float = Field(default=3.0, env="PAGE_FETCH_CONNECT_TIMEOUT")
+    PAGE_FETCH_READ_TIMEOUT: float = Field(default=5.0, env="PAGE_FETCH_READ_TIMEOUT")
+    PAGE_FETCH_TOTAL_TIMEOUT: float = Field(default=10.0, env="PAGE_FETCH_TOTAL_TIMEOUT")
+    PAGE_CACHE_TTL: float = Field(default=600.0, env="PAGE_CACHE_TTL")
+    PAGE_CACHE_MAX_CHARS: int = Field(default=32 * 1024 * 1024, env="PAGE_CACHE_MAX_CHARS")
+
+    # 유사 회사 일괄 검색 설정
+    SIMILAR_COMPANY_MAX_BATCH: int = Field(default=500, env="SIMILAR_COMPANY_MAX_BATCH")
+    SIMILAR_COMPANY_STREAM_CHUNK: int = Field(default=64, env="SIMILAR_COMPANY_STREAM_CHUNK")
 
     # 챗봇 및 검색 설정
     MAX_QUERIES: int = Field(default=3, env="MAX_QUERIES")
@@ -39,11 +102,84 @@ class Settings(BaseSettings):
     MAX_TOKENS: int = Field(default=4096, env="MAX_TOKENS")
     TEMPERATURE: float = Field(default=0.7, env="TEMPERATURE")
 
+    # WebSocket 채팅 설정 (연결 수 제한은 워커 프로세스별)
+    WS_MAX_CONNECTIONS: int = Field(default=200, env="WS_MAX_CONNECTIONS")
+    WS_HEARTBEAT_INTERVAL: float = Field(default=20.0, env="WS_HEARTBEAT_INTERVAL")
+    WS_IDLE_TIMEOUT: float = Field(default=300.0, env="WS_IDLE_TIMEOUT")
+    WS_SEND_TIMEOUT: float = Field(default=10.0, env="WS_SEND_TIMEOUT")
+    WS_SEND_QUEUE_SIZE: int = Field(default=64, env="WS_SEND_QUEUE_SIZE")
+    WS_MAX_MESSAGE_BYTES: int = Field(default=16384, env="WS_MAX_MESSAGE_BYTES")
+
+    # 요청 시간 예산 설정 (남은 예산이 단계별 최소 시간보다 적으면 해당 단계를 생략하거나 축소)
+    CHAT_DEADLINE: float = Field(default=25.0, env="CHAT_DEADLINE")
+    CHAT_MAX_DEADLINE: float = Field(default=120.0, env="CHAT_MAX_DEADLINE")
+    DEADLINE_ANSWER_RESERVE: float = Field(default=6.0, env="DEADLINE_ANSWER_RESERVE")  # 최종 답변 생성을 위해 남겨 둘 시간
+    DEADLINE_MIN_WEB_SEARCH: float = Field(default=3.0, env="DEADLINE_MIN_WEB_SEARCH")
+    DEADLINE_MIN_GRAPH: float = Field(default=8.0, env="DEADLINE_MIN_GRAPH")
+    DEADLINE_MIN_LLM_EXTRACTION: float = Field(default=4.0, env="DEADLINE_MIN_LLM_EXTRACTION")
+
+    # 업스트림 요청 제한 설정
+    OPENAI_RPM: int = Field(default=500, env="OPENAI_RPM")
+    OPENAI_TPM: int = Field(default=160000, env="OPENAI_TPM")
+    OPENAI_MAX_CONCURRENCY: int = Field(default=8, env="OPENAI_MAX_CONCURRENCY")
+    SERPER_RPM: int = Field(default=300, env="SERPER_RPM")
+    SERPER_MAX_CONCURRENCY: int = Field(default=5, env="SERPER_MAX_CONCURRENCY")
+    RATE_LIMIT_QUEUE_TIMEOUT: float = Field(default=30.0, env="RATE_LIMIT_QUEUE_TIMEOUT")
+    RATE_LIMIT_MAX_RETRIES: int = Field(default=3, env="RATE_LIMIT_MAX_RETRIES")
+    RATE_LIMIT_BACKOFF_BASE: float = Field(default=0.5, env="RATE_LIMIT_BACKOFF_BASE")
+    RATE_LIMIT_BACKOFF_MAX: float = Field(default=8.0, env="RATE_LIMIT_BACKOFF_MAX")
+
     # 그래프 생성 설정
     MAX_GRAPH_DATA_POINTS: int = Field(default=100, env="MAX_GRAPH_DATA_POINTS")
     DEFAULT_GRAPH_WIDTH: int = Field(default=800, env="DEFAULT_GRAPH_WIDTH")
     DEFAULT_GRAPH_HEIGHT: int = Field(default=600, env="DEFAULT_GRAPH_HEIGHT")
     GRAPH_DPI: int = Field(default=100, env="GRAPH_DPI")
+    GRAPH_CANDIDATE_URLS: int = Field(default=3, env="GRAPH_CANDIDATE_URLS")
+    GRAPH_EXTRACTION_TOKEN_BUDGET: int = Field(default=2000, env="GRAPH_EXTRACTION_TOKEN_BUDGET")
+    GRAPH_CHUNK_CHARS: int = Field(default=600, env="GRAPH_CHUNK_CHARS")
+
+    # 그래프 백그라운드 작업 설정 (GRAPH_JOB_STORE_PATH가 비어 있으면 작업 상태를 워커 프로세스 안에서만 조회 가능)
+    GRAPH_JOB_WORKERS: int = Field(default=4, env="GRAPH_JOB_WORKERS")
+    GRAPH_JOB_MAX_PENDING: int = Field(default=100, env="GRAPH_JOB_MAX_PENDING")
+    GRAPH_JOB_TTL: float = Field(default=600.0, env="GRAPH_JOB_TTL")
+    GRAPH_JOB_DEADLINE: float = Field(default=60.0, env="GRAPH_JOB_DEADLINE")
+    GRAPH_JOB_HEARTBEAT: float = Field(default=15.0, env="GRAPH_JOB_HEARTBEAT")
+    GRAPH_JOB_POLL_INTERVAL: float = Field(default=0.5, env="GRAPH_JOB_POLL_INTERVAL")
+    GRAPH_JOB_STORE_PATH: str = Field(default="data/graph_jobs.db", env="GRAPH_JOB_STORE_PATH")
+
+    # 시계열 데이터 저장소 설정 (기본값은 사용 안 함, 사용하려면 SERIES_STORE_PATH에 절대 경로 지정)
+    SERIES_STORE_PATH: str = Field(default="", env="SERIES_STORE_PATH")
+    SERIES_STORE_TTL: float = Field(default=7 * 24 * 3600.0, env="SERIES_STORE_TTL")
+
+    # 벡터 저장소 사전 수집 설정 (시드 목록은 JSON 배열 형식의 환경 변수로 지정)
+    INGEST_ENABLED: bool = Field(default=False, env="INGEST_ENABLED")
+    INGEST_INTERVAL: float = Field(default=6 * 3600.0, env="INGEST_INTERVAL")
+    INGEST_SEED_QUERIES: List[str] = Field(default=[], env="INGEST_SEED_QUERIES")
+    INGEST_SEED_URLS: List[str] = Field(default=[], env="INGEST_SEED_URLS")
+    INGEST_RESULTS_PER_QUERY: int = Field(default=5, env="INGEST_RESULTS_PER_QUERY")
+    INGEST_CONCURRENCY: int = Field(default=4, env="INGEST_CONCURRENCY")
+    INGEST_CHUNK_CHARS: int = Field(default=1000, env="INGEST_CHUNK_CHARS")
+    INGEST_MIN_CHUNK_CHARS: int = Field(default=50, env="INGEST_MIN_CHUNK_CHARS")
+    INGEST_MAX_CHUNKS_PER_PAGE: int = Field(default=50, env="INGEST_MAX_CHUNKS_PER_PAGE")
+    INGEST_EMBED_BATCH_SIZE: int = Field(default=32, env="INGEST_EMBED_BATCH_SIZE")
+    INGEST_REGISTRY_PATH: str = Field(default="data/ingest_registry.db", env="INGEST_REGISTRY_PATH")
+
+    # 컬렉션 스냅샷 내보내기/가져오기 설정 (snapshot_collection.py)
+    SNAPSHOT_EXPORT_BATCH: int = Field(default=2000, env="SNAPSHOT_EXPORT_BATCH")
+    SNAPSHOT_IMPORT_BATCH: int = Field(default=5000, env="SNAPSHOT_IMPORT_BATCH")
+    SNAPSHOT_VECTOR_DTYPE: str = Field(default="float16", env="SNAPSHOT_VECTOR_DTYPE")
+
+    # 컬렉션 재임베딩 마이그레이션 설정 (migrate_collection.py)
+    MIGRATION_BATCH: int = Field(default=1024, env="MIGRATION_BATCH")
+    MIGRATION_WORKERS: int = Field(default=1, env="MIGRATION_WORKERS")
+    MIGRATION_STATE_DIR: str = Field(default="data/migrations", env="MIGRATION_STATE_DIR")
+
+    # 외부 서비스 전송 계층 설정 (live: 실제 호출, record: 호출 후 녹화, replay: 녹화된 응답 재생)
+    TRANSPORT_MODE: str = Field(default="live", env="TRANSPORT_MODE")
+    TRANSPORT_CASSETTE_DIR: str = Field(default="data/cassettes", env="TRANSPORT_CASSETTE_DIR")
+    TRANSPORT_REPLAY_LATENCY_SCALE: float = Field(default=1.0, env="TRANSPORT_REPLAY_LATENCY_SCALE")
+    TRANSPORT_REPLAY_EXTRA_LATENCY: float = Field(default=0.0, env="TRANSPORT_REPLAY_EXTRA_LATENCY")
+    TRANSPORT_REPLAY_JITTER: float = Field(default=0.0, env="TRANSPORT_REPLAY_JITTER")
 
     # 환경 변수 설정
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=True)
@@ -0,0 +1,81 @@
+"""
+프로덕션 멀티 워커 서버 설정
+
+    gunicorn -c gunicorn.conf.py
+
+마스터 프로세스에서 임베딩 모델을 미리 로드한 뒤 워커를 fork하므로, 모델 가중치는 워커 간에
+copy-on-write로 공유됩니다. 애플리케이션(main:app)은 워커마다 fork 이후에 임포트하여
+Milvus 연결, HTTP 세션, SQLite 연결 등 fork 이후 공유하면 안 되는 자원은 워커별로 생성됩니다.
+
+- 워커 수 변경/무중단 재시작: kill -HUP <master pid> (새 워커가 뜬 뒤 기존 워커를 정상 종료)
+- 워커 수 증감: kill -TTIN / -TTOU <master pid>
+"""
+
+import gc
+import logging
+import multiprocessing
+
+from config.settings import settings
+
+logger = logging.getLogger("gunicorn.error")
+
+# uvicorn 0.30부터 워커 클래스가 별도 패키지(uvicorn-worker)로 분리됨
+try:
+    import uvicorn_worker  # noqa: F401
+
+    worker_class = "uvicorn_worker.UvicornWorker"
+except ImportError:
+    worker_class = "uvicorn.workers.UvicornWorker"
+
+wsgi_app = "main:app"
+bind = f"{settings.HOST}:{settings.PORT}"
+workers = settings.SERVER_WORKERS or multiprocessing.cpu_count()
+timeout = settings.SERVER_TIMEOUT
+graceful_timeout = settings.SERVER_GRACEFUL_TIMEOUT
+keepalive = settings.SERVER_KEEPALIVE
+max_requests = settings.SERVER_MAX_REQUESTS
+max_requests_jitter = settings.SERVER_MAX_REQUESTS_JITTER
+loglevel = settings.LOG_LEVEL.lower()
+accesslog = "-"
+
+# 앱 전체를 미리 로드하면 Milvus 연결 등이 fork 전에 만들어지므로, 모델만 마스터에서 로드
+preload_app = False
+
+
+def _torch_threads() -> int:
+    # 워커들이 코어를 나눠 쓰도록 워커당 추론 스레드 수 제한
+    return settings.EMBEDDING_TORCH_THREADS or max(1, multiprocessing.cpu_count() // workers)
+
+
+def on_starting(server):
+    """
+    마스터 프로세스에서 임베딩 모델을 로드하고, 이후 생성된 객체를 GC 대상에서 제외합니다.
+    GC가 공유 객체의 참조 정보를 건드리면 워커마다 메모리 페이지가 복사되므로 gc.freeze()로 방지합니다.
+    """
+    if not settings.SERVER_PRELOAD_MODEL or settings.EMBEDDING_SERVER_SOCKET:
+        # 임베딩 서버를 사용하면 워커는 모델을 로드하지 않음
+        return
+    from utils.embedding_utils import get_model
+
+    get_model()
+
+    gc.collect()
+    gc.freeze()
+    logger.info(f"임베딩 모델을 마스터 프로세스에 미리 로드했습니다. (워커 {workers}개, 워커당 추론 스레드 {_torch_threads()}개)")
+
+
+def post_fork(server, worker):
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(_torch_threads())
+
+
+def worker_exit(server, worker):
+    logger.info(f"워커 종료 (pid: {worker.pid})")
+    if settings.METRICS_MULTIPROC_DIR:
+        # 종료된 워커의 지표가 다른 워커의 /metrics 응답에 남지 않도록 스냅샷 삭제
+        from utils.metrics import remove_metrics_snapshot
+
+        remove_metrics_snapshot(worker.pid)
@@ -1,5 +1,7 @@
+import asyncio
 import logging
-from contextlib import asynccontextmanager
+import os
+from contextlib import asynccontextmanager, suppress
 
 import uvicorn
 from dotenv import load_dotenv
@@ -9,43 +11,106 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.api import routes
 from config.settings import settings
 from utils.database import close_milvus_connection, connect_to_milvus
+from utils.embedding_utils import get_model
+from utils.http_client import close_http_session, get_http_session
+from utils.ingestion import IngestionPipeline
+from utils.logging_utils import RequestLogContextMiddleware, setup_logging
+from utils.metrics import MetricsMiddleware, run_metrics_snapshots
+from utils.responses import CompressionMiddleware, FastJSONResponse
 from utils.vector_store import VectorStore
 
+# 파일 잠금은 Unix에서만 지원
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
 # .env 파일에서 환경 변수 로드
 load_dotenv()
 
-# 로깅 설정
-logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+# 로깅 설정 (큐 핸들러 + 백그라운드 출력 스레드)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # 전역 변수로 VectorStore 인스턴스 선언
 vector_store = None
+_ingest_lock_file = None
+
+
+def _acquire_ingest_lock() -> bool:
+    """
+    멀티 워커로 실행할 때 백그라운드 수집이 한 워커에서만 실행되도록 파일 잠금을 획득합니다.
+    잠금은 워커 프로세스가 종료될 때 자동으로 해제됩니다.
+    :return: 잠금 획득 여부 (fcntl을 지원하지 않는 환경에서는 항상 True)
+    """
+    global _ingest_lock_file
+    if fcntl is None:
+        return True
+    lock_path = f"{settings.INGEST_REGISTRY_PATH}.lock"
+    os.makedirs(os.path.dirname(lock_path) or ".", exist_ok=True)
+    lock_file = open(lock_path, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        logger.info("Background ingestion is running in another worker")
+        return False
+    _ingest_lock_file = lock_file
+    return True
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     애플리케이션 생명주기 관리
-    시작 시 Milvus 연결 및 VectorStore 초기화
-    종료 시 Milvus 연결 해제
+    시작 시 Milvus 연결, VectorStore 및 공유 HTTP 세션 초기화, 그래프 작업 워커 및 (설정 시) 백그라운드 수집/지표 스냅샷 기록 시작
+    종료 시 그래프 작업 워커와 백그라운드 작업 중지, HTTP 세션 및 Milvus 연결 해제
     """
     global vector_store
+    ingestion_task = None
+    metrics_task = None
     try:
         # Milvus 연결 및 VectorStore 초기화
         connect_to_milvus()
+        if not settings.EMBEDDING_SERVER_SOCKET:
+            # 첫 요청이 모델 로드를 기다리지 않도록 시작 시 로드 (gunicorn 마스터에서 미리 로드했다면 즉시 반환)
+            await asyncio.to_thread(get_model)
         vector_store = VectorStore()
+        get_http_session()
+        if settings.INGEST_ENABLED and (settings.INGEST_SEED_QUERIES or settings.INGEST_SEED_URLS) and _acquire_ingest_lock():
+            ingestion_task = asyncio.create_task(IngestionPipeline(vector_store).run_forever())
+            logger.info("Background ingestion started")
+        routes.graph_jobs.start()
+        if settings.METRICS_MULTIPROC_DIR:
+            # 다른 워커의 /metrics 응답에 이 워커의 지표가 포함되도록 주기적으로 기록
+            metrics_task = asyncio.create_task(run_metrics_snapshots())
+        app.state.ready = True
         logger.info("Startup completed successfully")
     except Exception as e:
         logger.error(f"Error during startup: {str(e)}")
         raise
     yield
-    # 종료 시 Milvus 연결 해제
+    app.state.ready = False
+    # 종료 시 그래프 작업 및 백그라운드 작업 중지, HTTP 세션 및 Milvus 연결 해제
+    await routes.graph_jobs.stop()
+    for task in (ingestion_task, metrics_task):
+        if task is not None:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+    await close_http_session()
     close_milvus_connection()
     logger.info("Shutting down")
 
 
 # FastAPI 애플리케이션 인스턴스 생성
-app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# 응답 압축 미들웨어 추가 (기준 크기 이상인 응답만 gzip/brotli 압축)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# 요청/단계별 소요 시간 측정 미들웨어 추가 (디버그 모드에서는 Server-Timing 헤더로 단계별 시간 반환)
+app.add_middleware(MetricsMiddleware, debug=settings.DEBUG)
 
 # CORS 미들웨어 추가
 app.add_middleware(
@@ -56,9 +121,12 @@ app.add_middleware(
     allow_headers=["*"],  # 모든 HTTP 헤더 허용
 )
 
+# 요청 ID 및 디버그 로그 샘플링 문맥 설정 미들웨어 추가 (가장 바깥에서 실행되도록 마지막에 추가)
+app.add_middleware(RequestLogContextMiddleware, sample_rate=settings.LOG_DEBUG_SAMPLE_RATE)
+
 # API 라우터 포함
 app.include_router(routes.router)
 
 if __name__ == "__main__":
-    # 개발 서버 실행
+    # 개발 서버 실행 (프로덕션에서는 gunicorn -c gunicorn.conf.py 로 멀티 워커 실행)
     uvicorn.run("main:app", host=settings.HOST, port=settings.PORT, reload=True)
@@ -0,0 +1,310 @@
+"""
+컬렉션 재임베딩/인덱스 마이그레이션 (별칭 교체)
+
+서비스(VectorStore, API 라우트)는 COLLECTION_NAME으로 컬렉션을 사용하며, Milvus는 이 이름이 별칭이면 별칭이 가리키는
+컬렉션을 사용합니다. 이 도구는 서비스를 멈추지 않고 새 컬렉션을 만든 뒤 별칭을 새 컬렉션으로 교체합니다.
+
+    python migrate_collection.py --model intfloat/multilingual-e5-large --dim 1024 --workers 4
+    python migrate_collection.py --index '{"index_type": "HNSW", "metric_type": "L2", "params": {"M": 16, "efConstruction": 200}}'
+    python migrate_collection.py --model intfloat/multilingual-e5-large --dim 1024 --no-swap
+    python migrate_collection.py --swap-to business_info_v2     # --no-swap으로 준비한 컬렉션으로 교체
+    python migrate_collection.py --swap-to business_info_v1     # 이전 컬렉션으로 되돌리기
+
+진행 순서
+1. 새 컬렉션 {COLLECTION_NAME}_v{n}을 인덱스 없이 생성
+2. 기존 컬렉션의 content를 기본 키 순서로 읽어 배치 단위로 재임베딩하여 삽입 (--workers > 1이면 여러 프로세스에서 임베딩)
+   배치마다 진행 상황을 {MIGRATION_STATE_DIR}/{COLLECTION_NAME}.json에 기록하므로, 중단되면 같은 명령으로 이어서 진행
+3. 한 번만 flush하고 인덱스 생성 후 로드
+4. 그동안 기존 컬렉션에 추가된 행을 옮긴 뒤 별칭 교체
+   첫 마이그레이션에서는 COLLECTION_NAME이 실제 컬렉션이므로 {COLLECTION_NAME}_v1로 이름을 바꾸고 같은 이름의 별칭을 생성
+5. 교체 직전까지 기존 컬렉션에 추가된 행을 한 번 더 옮김
+
+- 마이그레이션 중 기존 컬렉션에서 삭제된 행은 새 컬렉션에 반영되지 않습니다.
+- 임베딩 모델/차원을 바꾸는 경우 질의 임베딩도 새 모델이어야 하므로 --no-swap으로 만든 뒤,
+  EMBEDDING_MODEL/EMBEDDING_DIMENSION 설정 변경과 함께 --swap-to로 교체하고 워커를 재시작(kill -HUP)합니다.
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+from pymilvus import Collection, utility
+
+from config.settings import settings
+from snapshot_collection import Throughput, after_pk_expr, build_schema, describe_collection, primary_field, read_json, vector_field, write_json
+from utils.database import close_milvus_connection, connect_to_milvus, get_alias_target, swap_alias
+from utils.logging_utils import setup_logging
+
+logger = logging.getLogger(__name__)
+
+TEXT_FIELD = "content"
+
+# 임베딩 작업 프로세스의 모델 (프로세스마다 한 번 로드)
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int):
+    global _worker_model
+    from sentence_transformers import SentenceTransformer
+
+    if threads:
+        try:
+            import torch
+
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+    _worker_model = SentenceTransformer(model_name)
+
+
+def _embed(texts: List[str]) -> np.ndarray:
+    return _worker_model.encode(texts, batch_size=64, convert_to_numpy=True).astype(np.float32)
+
+
+class Embedder:
+    """
+    여러 배치를 한 번에 임베딩합니다. workers가 2 이상이면 배치를 프로세스들에 나눠 동시에 임베딩합니다.
+    """
+
+    def __init__(self, model_name: str, workers: int):
+        self.workers = max(1, workers)
+        threads = max(1, multiprocessing.cpu_count() // self.workers)
+        self.pool = None
+        if self.workers > 1:
+            # Milvus(gRPC) 연결이 있는 프로세스를 fork하지 않도록 spawn 사용
+            self.pool = multiprocessing.get_context("spawn").Pool(self.workers, initializer=_init_worker, initargs=(model_name, threads))
+        else:
+            _init_worker(model_name, 0)
+
+    def __call__(self, batches: List[List[str]]) -> List[np.ndarray]:
+        if self.pool is None:
+            return [_embed(texts) for texts in batches]
+        return self.pool.map(_embed, batches)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+
+
+def _next_version_name(alias: str) -> str:
+    versions = [int(match.group(1)) for name in utility.list_collections() for match in [re.fullmatch(rf"{re.escape(alias)}_v(\d+)", name)] if match]
+    # 첫 마이그레이션이면 기존 컬렉션이 _v1이 되므로 새 컬렉션은 _v2
+    return f"{alias}_v{max(versions + [1]) + 1}"
+
+
+def copy_rows(
+    source: Collection, target: Collection, state: Dict[str, Any], state_path: str, embedder: Callable[[List[List[str]]], List[np.ndarray]], batch_size: int, dim: int
+) -> int:
+    """
+    state["last_pk"] 다음 행부터 source의 행을 재임베딩하여 target에 삽입합니다. 배치마다 진행 상황을 기록합니다.
+    :return: 이번에 옮긴 행 수
+    """
+    fields = state["schema"]["fields"]
+    vector_name = vector_field(fields)["name"]
+    primary = primary_field(fields)
+    read_names = [field["name"] for field in fields if field["name"] != vector_name]
+    insert_names = [field["name"] for field in fields if not (field["is_primary"] and field["auto_id"])]
+    window = max(1, getattr(embedder, "workers", 1))
+
+    iterator = source.query_iterator(batch_size=batch_size, expr=after_pk_expr(primary, state["last_pk"]), output_fields=read_names)
+    throughput = Throughput("재임베딩")
+    copied = 0
+    try:
+        exhausted = False
+        while not exhausted:
+            # 작업 프로세스 수만큼 배치를 모아 한 번에 임베딩
+            pages = []
+            while len(pages) < window:
+                rows = iterator.next()
+                if not rows:
+                    exhausted = True
+                    break
+                pages.append(rows)
+            if not pages:
+                break
+            vectors = embedder([[row[TEXT_FIELD] or "" for row in rows] for rows in pages])
+            for rows, page_vectors in zip(pages, vectors):
+                if page_vectors.shape[1] != dim:
+                    raise ValueError(f"임베딩 차원({page_vectors.shape[1]})이 --dim({dim})과 다릅니다.")
+                target.insert([page_vectors if name == vector_name else [row[name] for row in rows] for name in insert_names])
+                state.update(last_pk=rows[-1][primary["name"]], migrated=state["migrated"] + len(rows))
+                write_json(state_path, state)
+                throughput.add(len(rows), page_vectors.nbytes)
+                copied += len(rows)
+            logger.info(throughput.report(state["migrated"], state["source_rows"]))
+    finally:
+        iterator.close()
+    return copied
+
+
+def _state_path(alias: str) -> str:
+    os.makedirs(settings.MIGRATION_STATE_DIR, exist_ok=True)
+    return os.path.join(settings.MIGRATION_STATE_DIR, f"{alias}.json")
+
+
+def migrate(
+    alias: str = settings.COLLECTION_NAME,
+    model_name: str = settings.EMBEDDING_MODEL,
+    dim: int = settings.EMBEDDING_DIMENSION,
+    index_params: Optional[Dict[str, Any]] = None,
+    batch_size: int = settings.MIGRATION_BATCH,
+    workers: int = settings.MIGRATION_WORKERS,
+    target_name: Optional[str] = None,
+    swap: bool = True,
+):
+    """
+    alias가 가리키는 컬렉션을 새 모델/인덱스로 다시 만들고 (swap이면) 별칭을 교체합니다.
+
+    :param alias: 서비스가 사용하는 컬렉션 이름 (COLLECTION_NAME)
+    :param model_name: 재임베딩할 모델
+    :param dim: 새 모델의 임베딩 차원
+    :param index_params: 새 컬렉션의 인덱스 설정 (없으면 VECTOR_INDEX_PARAMS)
+    :param batch_size: 한 번에 읽고 임베딩할 행 수
+    :param workers: 임베딩 프로세스 수
+    :param target_name: 새 컬렉션 이름 (없으면 {alias}_v{n})
+    :param swap: 완료 후 별칭을 새 컬렉션으로 교체할지 여부
+    """
+    index_params = index_params or settings.VECTOR_INDEX_PARAMS
+    state_path = _state_path(alias)
+    state = read_json(state_path)
+    plan = {"model": model_name, "dim": dim, "index_params": index_params}
+
+    if state and state["status"] != "complete" and all(state[key] == value for key, value in plan.items()) and utility.has_collection(state["target"]):
+        logger.info(f"이전 마이그레이션에 이어서 진행합니다: {state['source']} → {state['target']} ({state['migrated']}행, 단계 {state['status']})")
+    else:
+        source_name = get_alias_target(alias) or alias
+        if not utility.has_collection(source_name):
+            raise ValueError(f"컬렉션 {alias}이(가) 없습니다.")
+        target_name = target_name or _next_version_name(alias)
+        if utility.has_collection(target_name):
+            raise FileExistsError(f"컬렉션 {target_name}이(가) 이미 있습니다.")
+
+        source = Collection(source_name)
+        description = describe_collection(source)
+        vector_field(description["fields"])["params"]["dim"] = dim
+        description["indexes"] = [{"field_name": vector_field(description["fields"])["name"], "params": index_params}]
+        # 인덱스 없이 만들어 삽입 중에는 인덱스를 만들지 않음
+        Collection(target_name, build_schema(description))
+        state = {
+            **plan,
+            "alias": alias,
+            "source": source_name,
+            "target": target_name,
+            "schema": description,
+            "source_rows": source.num_entities,
+            "migrated": 0,
+            "last_pk": None,
+            "status": "copying",
+            "started_at": time.time(),
+        }
+        write_json(state_path, state)
+        logger.info(f"마이그레이션 시작: {source_name} → {target_name} (모델 {model_name}, 차원 {dim}, 인덱스 {index_params})")
+
+    source = Collection(state["source"])
+    target = Collection(state["target"])
+    embedder = Embedder(model_name, workers)
+    try:
+        if state["status"] == "copying":
+            copy_rows(source, target, state, state_path, embedder, batch_size, dim)
+            # 모든 행을 삽입한 뒤 한 번만 flush하고 인덱스 생성
+            target.flush()
+            for index in state["schema"]["indexes"]:
+                target.create_index(index["field_name"], index["params"])
+            utility.wait_for_index_building_complete(state["target"])
+            target.load()
+            state["status"] = "indexed"
+            write_json(state_path, state)
+            logger.info(f"새 컬렉션 인덱스 생성 및 로드 완료: {state['target']} ({state['migrated']}행)")
+
+        if state["status"] == "indexed":
+            # 복사하는 동안 기존 컬렉션에 추가된 행 따라잡기
+            copy_rows(source, target, state, state_path, embedder, batch_size, dim)
+            if not swap:
+                logger.info(f"새 컬렉션 준비 완료: {state['target']} (교체: python migrate_collection.py --swap-to {state['target']})")
+                return state
+            previous = _swap(alias, state["target"])
+            state.update(status="swapped", previous=previous)
+            write_json(state_path, state)
+
+        # 교체 직전까지 이전 컬렉션에 추가된 행 옮기기
+        copy_rows(Collection(state["previous"]), target, state, state_path, embedder, batch_size, dim)
+        target.flush()
+    finally:
+        embedder.close()
+
+    state.update(status="complete", finished_at=time.time())
+    write_json(state_path, state)
+    logger.info(f"마이그레이션 완료: {state['alias']} → {state['target']} ({state['migrated']}행, 되돌리기: python migrate_collection.py --swap-to {state['previous']})")
+    return state
+
+
+def swap_to(alias: str, collection_name: str, batch_size: int = settings.MIGRATION_BATCH, workers: int = settings.MIGRATION_WORKERS) -> Optional[str]:
+    """
+    별칭을 collection_name으로 교체합니다.
+    collection_name이 진행 중인 마이그레이션(--no-swap)의 대상이면 남은 행을 옮기고 교체한 뒤 마이그레이션을 완료합니다.
+
+    :param alias: 서비스가 사용하는 컬렉션 이름 (COLLECTION_NAME)
+    :param collection_name: 별칭이 가리킬 컬렉션 이름
+    :param batch_size: 한 번에 읽고 임베딩할 행 수
+    :param workers: 임베딩 프로세스 수
+    :return: 이전에 별칭이 가리키던 컬렉션 이름
+    """
+    state = read_json(_state_path(alias))
+    if state and state["status"] != "complete" and state["target"] == collection_name:
+        state = migrate(alias, state["model"], state["dim"], state["index_params"], batch_size=batch_size, workers=workers, swap=True)
+        return state["previous"]
+
+    Collection(collection_name).load()
+    previous = _swap(alias, collection_name)
+    logger.info(f"별칭 교체 완료: {alias} → {collection_name} (이전: {previous})")
+    return previous
+
+
+def _swap(alias: str, target: str) -> Optional[str]:
+    if get_alias_target(alias) is not None or not utility.has_collection(alias):
+        return swap_alias(alias, target)
+
+    # 첫 마이그레이션: 실제 컬렉션의 이름을 바꾸고 같은 이름의 별칭 생성 (실패하면 이름 복구)
+    renamed = f"{alias}_v1"
+    utility.rename_collection(alias, renamed)
+    try:
+        swap_alias(alias, target)
+    except Exception:
+        utility.rename_collection(renamed, alias)
+        raise
+    return renamed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="컬렉션 재임베딩/인덱스 마이그레이션 (별칭 교체)")
+    parser.add_argument("--alias", default=settings.COLLECTION_NAME, help="서비스가 사용하는 컬렉션 이름 (별칭)")
+    parser.add_argument("--model", default=settings.EMBEDDING_MODEL, help="재임베딩할 모델")
+    parser.add_argument("--dim", type=int, default=settings.EMBEDDING_DIMENSION, help="새 모델의 임베딩 차원")
+    parser.add_argument("--index", type=json.loads, default=None, help="새 컬렉션의 인덱스 설정 (JSON, 기본: VECTOR_INDEX_PARAMS)")
+    parser.add_argument("--batch-size", type=int, default=settings.MIGRATION_BATCH, help="한 번에 읽고 임베딩할 행 수")
+    parser.add_argument("--workers", type=int, default=settings.MIGRATION_WORKERS, help="임베딩 프로세스 수")
+    parser.add_argument("--target", default=None, help="새 컬렉션 이름 (기본: {alias}_v{n})")
+    parser.add_argument("--no-swap", action="store_true", help="새 컬렉션만 만들고 별칭은 교체하지 않음")
+    parser.add_argument("--swap-to", default=None, help="별칭을 지정한 컬렉션으로 교체 (--no-swap으로 준비한 컬렉션이면 남은 행을 옮기고 마이그레이션 완료, 아니면 되돌리기)")
+    args = parser.parse_args()
+
+    setup_logging()
+    connect_to_milvus()
+    try:
+        if args.swap_to:
+            swap_to(args.alias, args.swap_to, batch_size=args.batch_size, workers=args.workers)
+        else:
+            migrate(args.alias, args.model, args.dim, args.index, batch_size=args.batch_size, workers=args.workers, target_name=args.target, swap=not args.no_swap)
+    finally:
+        close_milvus_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from config.settings import settings
+from services.chatbot import Chatbot
+from services.models import ChatInput
+from utils.metrics import stage_listener
+from utils.responses import dumps_json
+
+logger = logging.getLogger(__name__)
+
+# WebSocket 종료 코드
+CLOSE_TRY_AGAIN_LATER = 1013
+CLOSE_POLICY_VIOLATION = 1008
+CLOSE_GOING_AWAY = 1001
+
+_stats = {"active": 0, "accepted": 0, "rejected": 0, "turns": 0, "dropped_messages": 0, "send_timeouts": 0, "slow_consumer_closed": 0, "idle_closed": 0}
+
+
+class ChatConnection:
+    """
+    WebSocket 채팅 연결 하나
+    연결마다 독립된 대화 세션을 유지하며, 한 번에 하나의 메시지를 처리하고 처리 중간 결과를 이벤트로 전송합니다.
+
+    클라이언트 → 서버: {"type": "message", "message", "graph_format", "timeout"}, {"type": "reset"}, {"type": "ping"}, {"type": "pong"}
+    서버 → 클라이언트: session, stage, retrieval, token, graph, done, reset, error, ping, pong
+
+    - 모든 전송은 하나의 전송 태스크가 대기열 순서대로 처리합니다. 클라이언트가 느리면 토큰은 합쳐서 보내고,
+      그래도 대기열이 가득 차거나 전송이 WS_SEND_TIMEOUT초를 넘으면 연결을 닫습니다.
+    - WS_HEARTBEAT_INTERVAL초마다 ping을 보내고, WS_IDLE_TIMEOUT초 동안 클라이언트 메시지가 없으면 연결을 닫습니다.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        chatbot: Chatbot,
+        build_payload: Callable[[Dict[str, Any], str], Awaitable[Dict[str, Any]]],
+        format_web_results: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+    ):
+        """
+        :param websocket: 연결된 WebSocket
+        :param chatbot: 응답을 생성할 챗봇
+        :param build_payload: (챗봇 응답, 그래프 형식)을 받아 /chat 응답 형식으로 변환하는 코루틴 함수
+        :param format_web_results: 검색 결과를 /chat 응답의 web_results 형식으로 변환하는 함수
+        """
+        self.websocket = websocket
+        self.chatbot = chatbot
+        self.build_payload = build_payload
+        self.format_web_results = format_web_results
+        self.session = chatbot.create_session(on_event=self._on_event)
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=settings.WS_SEND_QUEUE_SIZE)
+        self.overflow = asyncio.Event()
+        self.tokens: List[str] = []  # 아직 보내지 않은 토큰 (전송이 밀리면 합쳐서 한 번에 전송)
+        self.token_queued = False
+        self.graph_format = "compact"
+        self.turn: Optional[asyncio.Task] = None
+        self.last_received = time.monotonic()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def serve(self):
+        """
+        연결을 수락하고 연결이 끊어질 때까지 메시지를 처리합니다. 워커당 연결 수가 제한을 넘으면 바로 닫습니다.
+        """
+        await self.websocket.accept()
+        if _stats["active"] >= settings.WS_MAX_CONNECTIONS:
+            _stats["rejected"] += 1
+            await self._close(CLOSE_TRY_AGAIN_LATER, "too many connections")
+            return
+
+        _stats["active"] += 1
+        _stats["accepted"] += 1
+        self.loop = asyncio.get_running_loop()
+        self._enqueue({"type": "session", "session_id": self.session.id})
+        tasks = [
+            asyncio.create_task(self._receive_loop()),
+            asyncio.create_task(self._send_loop()),
+            asyncio.create_task(self._heartbeat_loop()),
+            asyncio.create_task(self.overflow.wait()),
+        ]
+        try:
+            # 연결 종료, 전송 지연, 유휴 시간 초과, 대기열 초과 중 하나가 일어나면 연결 종료
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                error = task.exception()
+                if error is not None and not isinstance(error, WebSocketDisconnect):
+                    logger.warning(f"WebSocket 연결 오류 ({self.session.id}): {error!r}")
+            if self.overflow.is_set():
+                _stats["slow_consumer_closed"] += 1
+                await self._close(CLOSE_POLICY_VIOLATION, "slow consumer")
+        finally:
+            pending = [task for task in [*tasks, self.turn] if task is not None]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+            _stats["active"] -= 1
+            await self._close(CLOSE_GOING_AWAY)
+
+    async def _close(self, code: int, reason: str = ""):
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except (RuntimeError, OSError):
+            # 이미 닫힌 연결
+            pass
+
+    async def _receive_loop(self):
+        while True:
+            text = await self.websocket.receive_text()
+            self.last_received = time.monotonic()
+            if len(text) > settings.WS_MAX_MESSAGE_BYTES:
+                self._enqueue({"type": "error", "detail": "메시지가 너무 깁니다."})
+                continue
+            try:
+                data = json.loads(text)
+                message_type = data.get("type", "message")
+            except (ValueError, AttributeError):
+                self._enqueue({"type": "error", "detail": "JSON 객체 형식의 메시지만 받을 수 있습니다."})
+                continue
+
+            if message_type == "ping":
+                self._enqueue({"type": "pong"})
+            elif message_type == "pong":
+                continue
+            elif message_type == "reset":
+                if self._busy():
+                    self._enqueue({"type": "error", "detail": "이전 메시지를 처리하는 중에는 대화를 초기화할 수 없습니다."})
+                    continue
+                with self.chatbot.use_session(self.session):
+                    self.chatbot.clear_conversation_history()
+                self._enqueue({"type": "reset"})
+            elif message_type == "message":
+                self._start_turn(data)
+            else:
+                self._enqueue({"type": "error", "detail": f"알 수 없는 메시지 유형: {message_type}"})
+
+    def _busy(self) -> bool:
+        return self.turn is not None and not self.turn.done()
+
+    def _start_turn(self, data: Dict[str, Any]):
+        if self._busy():
+            self._enqueue({"type": "error", "detail": "이전 메시지를 처리하는 중입니다. 응답이 끝난 뒤 다시 보내 주세요."})
+            return
+        try:
+            request = ChatInput(**{key: value for key, value in data.items() if key != "type"})
+        except ValidationError as e:
+            self._enqueue({"type": "error", "detail": jsonable_encoder(e.errors())})
+            return
+        self.turn = asyncio.create_task(self._run_turn(request))
+
+    async def _run_turn(self, request: ChatInput):
+        _stats["turns"] += 1
+        self.graph_format = request.graph_format
+        try:
+            with self.chatbot.use_session(self.session), stage_listener(self._on_stage):
+                response = await self.chatbot.get_response(request.message, budget=request.timeout)
+            self._enqueue({"type": "done", **await self.build_payload(response, request.graph_format)})
+        except Exception as e:
+            logger.error(f"WebSocket 챗봇 응답 생성 중 오류 발생: {str(e)}", exc_info=True)
+            self._enqueue({"type": "error", "detail": "내부 서버 오류가 발생했습니다. 나중에 다시 시도해 주세요."})
+
+    def _on_stage(self, stage: str, seconds: float):
+        message = {"type": "stage", "stage": stage, "ms": round(seconds * 1000, 1)}
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self._enqueue(message)
+        else:
+            # 스레드에서 끝난 단계는 이벤트 루프에서 대기열에 추가
+            self.loop.call_soon_threadsafe(self._enqueue, message)
+
+    def _on_event(self, event: str, data: Any):
+        # 챗봇 세션이 보내는 중간 결과 (retrieval, token, graph)
+        if event == "token":
+            self.tokens.append(data)
+            if self.token_queued:
+                return
+            # 대기열에는 토큰 전송 표시만 넣고, 실제 내용은 전송 시점까지 쌓인 토큰을 합쳐서 보냄
+            self.token_queued = True
+            self._enqueue({"type": "token"})
+        elif event == "retrieval":
+            self._enqueue({"type": "retrieval", "web_results": self.format_web_results(data)})
+        elif event == "graph":
+            self._enqueue({"type": "graph", "graph_data": data})
+
+    def _enqueue(self, message: Dict[str, Any]):
+        # 클라이언트가 메시지를 받지 않아 대기열이 가득 차면 연결을 닫도록 표시 (대기열은 더 늘리지 않음)
+        try:
+            self.outbox.put_nowait(message)
+        except asyncio.QueueFull:
+            _stats["dropped_messages"] += 1
+            self.overflow.set()
+
+    async def _send_loop(self):
+        while True:
+            message = await self.outbox.get()
+            if message["type"] == "token":
+                text, self.tokens, self.token_queued = "".join(self.tokens), [], False
+                if not text:
+                    continue
+                message = {"type": "token", "text": text}
+            elif message["type"] == "graph" and message["graph_data"] and self.graph_format == "plotly":
+                message = {"type": "graph", "graph_data": await asyncio.to_thread(self.chatbot.graph_generator.render_plotly, message["graph_data"])}
+            try:
+                await asyncio.wait_for(self.websocket.send_text(dumps_json(message)), timeout=settings.WS_SEND_TIMEOUT)
+            except asyncio.TimeoutError:
+                _stats["send_timeouts"] += 1
+                self.overflow.set()
+                return
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(settings.WS_HEARTBEAT_INTERVAL)
+            if time.monotonic() - self.last_received > settings.WS_IDLE_TIMEOUT and not self._busy():
+                _stats["idle_closed"] += 1
+                await self._close(CLOSE_GOING_AWAY, "idle timeout")
+                return
+            self._enqueue({"type": "ping"})
+
+
+def get_chat_socket_stats() -> Dict[str, Dict[str, int]]:
+    """
+    WebSocket 채팅 연결 통계를 반환합니다. (워커 프로세스 기준)
+    """
+    return {"chat": {**_stats, "max_connections": settings.WS_MAX_CONNECTIONS}}
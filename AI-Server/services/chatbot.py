@@ -1,8 +1,12 @@
 import asyncio
-from typing import Dict, Any, List, Optional, Tuple
+import contextvars
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 from datetime import datetime
 from langchain.chains import ConversationChain
 from langchain.memory import ConversationBufferWindowMemory
+from langchain_core.callbacks import AsyncCallbackHandler
 from langchain_openai import ChatOpenAI
 from config.settings import settings
 from utils.vector_store import VectorStore
@@ -10,8 +14,13 @@ from utils.web_search import WebSearch
 from utils.intent_analyzer import IntentAnalyzer
 from utils.graph_generator import GraphGenerator
 from utils.query_generator import QueryGenerator
+from utils.context_packer import ContextPacker
+from utils.deadline import DeadlineExceeded, deadline_scope, get_deadline
+from utils.metrics import timed_stage
+from utils.rate_limiter import estimate_tokens, get_rate_limiter
+from utils.single_flight import get_single_flight, make_key
+from utils.transport import wrap_chat_model
 import logging
-import json
 from collections import deque
 import tiktoken
 import re
@@ -19,47 +28,149 @@ import re
 logger = logging.getLogger(__name__)
 
 
+class ChatSession:
+    """
+    대화 상태 (LLM 대화 메모리와 단기 기억)
+    WebSocket 연결마다 하나씩 만들어 연결이 유지되는 동안 대화를 이어 가며, HTTP /chat은 Chatbot의 기본 세션을 공유합니다.
+    on_event가 있으면 응답 생성 중간 결과(retrieval, token, graph)를 on_event(이벤트, 데이터)로 전달합니다.
+    """
+
+    def __init__(self, llm, on_event: Optional[Callable[[str, Any], None]] = None):
+        self.id = uuid.uuid4().hex
+        self.memory = ConversationBufferWindowMemory(k=5)  # 최근 5개의 대화만 유지(LLM)
+        self.short_term_memory = deque(maxlen=5)  # 최근 5개의 대화 기록 유지(요약 및 히스토리 관리)
+        self.conversation = ConversationChain(llm=llm, memory=self.memory, verbose=settings.LANGCHAIN_VERBOSE)
+        self.on_event = on_event
+
+    def emit(self, event: str, data: Any):
+        if self.on_event is not None:
+            self.on_event(event, data)
+
+
+class _TokenStreamHandler(AsyncCallbackHandler):
+    # LLM이 생성하는 토큰을 세션 이벤트로 전달
+    def __init__(self, session: ChatSession):
+        self.session = session
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any):
+        if token:
+            self.session.emit("token", token)
+
+
+# 현재 요청이 사용하는 대화 세션 (설정되지 않았으면 Chatbot의 기본 세션)
+_current_session: contextvars.ContextVar[Optional[ChatSession]] = contextvars.ContextVar("chat_session", default=None)
+
+
 class Chatbot:
     def __init__(self):
         """
         Chatbot 클래스의 초기화 메서드.
         필요한 모든 유틸리티 객체와 설정을 초기화합니다.
         """
-        self.llm = ChatOpenAI(temperature=settings.TEMPERATURE, api_key=settings.OPENAI_API_KEY)
-        self.memory = ConversationBufferWindowMemory(k=5)  # 최근 5개의 대화만 유지(LLM)
-        self.short_term_memory = deque(maxlen=5)  # 최근 5개의 대화 기록 유지(요약 및 히스토리 관리)
-        self.conversation = ConversationChain(llm=self.llm, memory=self.memory, verbose=True)
+        self.llm = wrap_chat_model(ChatOpenAI(temperature=settings.TEMPERATURE, api_key=settings.OPENAI_API_KEY, max_retries=0))
+        # 세션 응답은 토큰 단위로 전달하도록 스트리밍 모델 사용
+        self.streaming_llm = wrap_chat_model(ChatOpenAI(temperature=settings.TEMPERATURE, api_key=settings.OPENAI_API_KEY, max_retries=0, streaming=True))
+        self.default_session = ChatSession(self.llm)
         self.vector_store = VectorStore()
         self.web_search = WebSearch()
         self.intent_analyzer = IntentAnalyzer()
         self.query_generator = QueryGenerator()
         self.graph_generator = GraphGenerator()
-        self.max_tokens = 14000
         self.encoding = tiktoken.encoding_for_model(settings.OPENAI_MODEL)
+        self.context_packer = ContextPacker(self.encoding, max_tokens=settings.MAX_TOKENS)
+        self.rate_limiter = get_rate_limiter("openai")
         self.forbidden_words = ["씨발", "개새끼", "좆", "병신", "지랄", "애미", "찌질"]  # 금지어 목록
 
-    async def get_response(self, user_input: str) -> Dict[str, Any]:
+    @property
+    def session(self) -> ChatSession:
+        return _current_session.get() or self.default_session
+
+    @property
+    def memory(self) -> ConversationBufferWindowMemory:
+        return self.session.memory
+
+    @property
+    def short_term_memory(self) -> deque:
+        return self.session.short_term_memory
+
+    @property
+    def conversation(self) -> ConversationChain:
+        return self.session.conversation
+
+    def create_session(self, on_event: Optional[Callable[[str, Any], None]] = None) -> ChatSession:
+        """
+        독립된 대화 세션을 생성합니다. (WebSocket 연결용)
+        :param on_event: 응답 생성 중간 결과를 받을 콜백 (이벤트, 데이터)
+        """
+        return ChatSession(self.streaming_llm, on_event=on_event)
+
+    @contextmanager
+    def use_session(self, session: Optional[ChatSession]) -> Iterator[ChatSession]:
+        """
+        블록 안에서 (생성된 태스크 포함) 처리하는 요청이 주어진 세션의 대화 상태를 사용하도록 합니다.
+        """
+        token = _current_session.set(session)
+        try:
+            yield self.session
+        finally:
+            _current_session.reset(token)
+
+    @timed_stage("chat_total")
+    async def get_response(self, user_input: str, budget: Optional[float] = None) -> Dict[str, Any]:
         """
         사용자의 입력을 받아 적절한 응답을 생성합니다.
+        모든 단계는 요청의 시간 예산을 공유하며, 예산이 부족하면 일부 단계를 생략하고 생략한 단계를 skipped_stages로 반환합니다.
 
         :param user_input: 사용자 입력 문자열
+        :param budget: 시간 예산(초). 없으면 CHAT_DEADLINE
         :return: 응답 데이터를 포함한 딕셔너리
         """
+        with deadline_scope(min(budget or settings.CHAT_DEADLINE, settings.CHAT_MAX_DEADLINE)) as deadline:
+            response = await self._respond(user_input)
+        response["skipped_stages"] = list(deadline.skipped)
+        return response
+
+    @timed_stage("graph_job")
+    async def get_graph_response(self, user_input: str, budget: Optional[float] = None) -> Dict[str, Any]:
+        """
+        의도 분석 없이 그래프 요청으로 처리합니다. (그래프 백그라운드 작업용)
+        시간 예산이 부족하면 get_response와 같이 그래프 없이 텍스트로 답변하고 생략한 단계를 skipped_stages로 반환합니다.
+
+        :param user_input: 사용자 입력 문자열
+        :param budget: 시간 예산(초). 없으면 GRAPH_JOB_DEADLINE
+        :return: 응답 데이터를 포함한 딕셔너리
+        """
+        validation_result = self._validate_input(user_input)
+        if validation_result:
+            return {"text_response": validation_result, "error": "Input validation failed"}
+
+        with deadline_scope(budget or settings.GRAPH_JOB_DEADLINE) as deadline:
+            self._save_to_short_term_memory(user_input)
+            response = await self._handle_graph_request(user_input, {"intent": "data_visualization", "keywords": []})
+        response["skipped_stages"] = list(deadline.skipped)
+        return response
+
+    async def _respond(self, user_input: str) -> Dict[str, Any]:
+        deadline = get_deadline()
         try:
             # 입력 검증
             validation_result = self._validate_input(user_input)
             if validation_result:
                 return {"text_response": validation_result, "error": "Input validation failed"}
 
-            intent = self.intent_analyzer.analyze_intent(user_input)
+            intent = await deadline.run(
+                "intent", self.intent_analyzer.analyze_intent(user_input), reserve=settings.DEADLINE_ANSWER_RESERVE, fallback={"category": "unknown", "keywords": []}
+            )
             logger.info(f"분석된 의도: {intent}")
 
             self._save_to_short_term_memory(user_input)
 
             if self._is_graph_request(intent, user_input):
-                return await self._handle_graph_request(user_input)
-            else:
-                return await self._handle_text_request(user_input, intent)
+                if deadline.has(settings.DEADLINE_ANSWER_RESERVE + settings.DEADLINE_MIN_GRAPH):
+                    return await self._handle_graph_request(user_input, intent)
+                # 그래프를 만들 시간이 부족하면 텍스트로만 답변
+                deadline.skip("graph")
+            return await self._handle_text_request(user_input, intent)
 
         except Exception as e:
             logger.error(f"응답 생성 중 오류 발생: {str(e)}", exc_info=True)
@@ -89,39 +200,70 @@ class Chatbot:
 
         return None
 
-    async def _handle_graph_request(self, user_input: str) -> Dict[str, Any]:
+    async def _handle_graph_request(self, user_input: str, intent: Dict[str, Any]) -> Dict[str, Any]:
         """
         그래프 요청을 처리합니다.
+        시간 예산 안에 그래프 데이터를 만들지 못하면 그래프 없이 (이미 받은 검색 결과가 있으면 그것으로) 텍스트 답변을 반환합니다.
 
         :param user_input: 사용자 입력 문자열
+        :param intent: 분석된 사용자 의도
         :return: 그래프 데이터와 설명을 포함한 딕셔너리
         """
+        deadline = get_deadline()
+        search_results = None
         try:
             logger.info(f"그래프 생성 요청 처리 시작: {user_input}")
 
-            # 웹 검색 수행
-            queries = self.query_generator.generate_queries(user_input, {"intent": "data_visualization"})
-            search_results = await self.web_search.search(queries)
-
-            if not search_results or not search_results.get("organic"):
-                logger.warning("검색 결과가 없습니다.")
-                return {"text_response": "요청하신 정보를 찾지 못했습니다. 다른 검색어로 시도해 보시겠습니까?", "graph_data": None}
+            # 그래프 유형/필드 분석을 웹 검색과 동시에 수행
+            analysis_task = asyncio.ensure_future(self.graph_generator.analyze_query(user_input))
+            search_task = asyncio.ensure_future(self._search_for_graph(user_input))
+            try:
+                graph_type, data_fields = await deadline.run("graph_analysis", analysis_task, reserve=settings.DEADLINE_ANSWER_RESERVE)
+                stored_series = await self.graph_generator.get_stored_series(data_fields)
+                if stored_series:
+                    # 신선한 시계열이 저장되어 있으면 검색/추출을 생략하고 저장된 데이터로 그래프 생성
+                    search_task.cancel()
+                else:
+                    search_results = await deadline.run("web_search", search_task, reserve=settings.DEADLINE_ANSWER_RESERVE)
+            except Exception:
+                analysis_task.cancel()
+                if search_task.done() and not search_task.cancelled() and search_task.exception() is None:
+                    # 분석이 시간 초과되어도 이미 끝난 검색 결과는 텍스트 답변의 컨텍스트로 사용
+                    search_results = search_task.result()
+                search_task.cancel()
+                raise
+
+            if stored_series:
+                relevant_info = []
+                graph_response = self.graph_generator.build_graph_response(stored_series, graph_type, user_input)
+            else:
+                if not search_results or not search_results.get("organic"):
+                    logger.warning("검색 결과가 없습니다.")
+                    return {"text_response": "요청하신 정보를 찾지 못했습니다. 다른 검색어로 시도해 보시겠습니까?", "graph_data": None}
 
-            # 웹 검색 결과 처리
-            relevant_info = self._process_web_results(search_results)
+                # 웹 검색 결과 처리
+                relevant_info = self._process_web_results(search_results)
 
-            # GraphGenerator를 사용하여 그래프 데이터 생성
-            graph_response = await self.graph_generator.process_graph_request(user_input, search_results)
+                # GraphGenerator를 사용하여 그래프 데이터 생성
+                graph_response = await deadline.run(
+                    "graph_extraction",
+                    self.graph_generator.process_graph_request(user_input, search_results, analysis=(graph_type, data_fields)),
+                    reserve=settings.DEADLINE_ANSWER_RESERVE,
+                )
 
             if "error" in graph_response:
                 return {"text_response": "그래프를 생성하는 동안 오류가 발생했습니다. 다시 시도해 주세요.", "error": graph_response["error"]}
+            self.session.emit("graph", graph_response["graph_data"])
 
-            # LLM을 사용하여 그래프에 대한 설명 생성
-            context = self._prepare_context(relevant_info)
-            graph_data_str = json.dumps(graph_response["graph_data"])
+            # LLM을 사용하여 그래프에 대한 설명 생성 (그래프 전체 대신 데이터 요약만 전달)
+            graph_data_str = self.graph_generator.summarize_graph(graph_response["graph_data"])
+            context = self._prepare_context(relevant_info, self._create_graph_prompt(user_input, "", graph_data_str))
             llm_prompt = self._create_graph_prompt(user_input, context, graph_data_str)
 
-            llm_response = self.conversation.predict(input=llm_prompt)
+            # 설명 생성 시간이 부족하면 규칙 기반으로 만든 그래프 설명을 사용
+            llm_response = await deadline.run("llm_answer", self._predict(llm_prompt), fallback=None)
+            if llm_response is None:
+                return {"text_response": graph_response["text_response"], "graph_data": graph_response["graph_data"]}
 
             # 최종 응답 구성
             final_response = {"text_response": llm_response, "graph_data": graph_response["graph_data"]}
@@ -131,10 +273,26 @@ class Chatbot:
                 self._save_to_vector_store(user_input, llm_response)
 
             return final_response
+        except DeadlineExceeded:
+            deadline.skip("graph")
+            if search_results and search_results.get("organic"):
+                # 이미 받은 검색 결과를 컨텍스트로 사용하여 그래프 없이 답변
+                return await self._answer_with_context(user_input, self._process_web_results(search_results))
+            return await self._handle_text_request(user_input, intent)
         except Exception as e:
             logger.error(f"그래프 요청 처리 중 예기치 않은 오류 발생: {str(e)}", exc_info=True)
             return {"text_response": "요청을 처리하는 동안 오류가 발생했습니다. 잠시 후 다시 시도해 주세요.", "error": str(e)}
 
+    async def _search_for_graph(self, user_input: str) -> Dict[str, Any]:
+        """
+        그래프 요청에 대한 검색 쿼리를 생성하고 웹 검색을 수행합니다.
+
+        :param user_input: 사용자 입력 문자열
+        :return: 웹 검색 결과
+        """
+        queries = await self.query_generator.generate_queries(user_input, {"intent": "data_visualization"})
+        return await self.web_search.search(queries)
+
     async def _handle_text_request(self, user_input: str, intent: Dict[str, Any]) -> Dict[str, Any]:
         """
         텍스트 요청을 처리합니다.
@@ -143,7 +301,8 @@ class Chatbot:
         :param intent: 분석된 사용자 의도
         :return: 텍스트 응답과 관련 정보를 포함한 딕셔너리
         """
-        queries = self.query_generator.generate_queries(user_input, intent)
+        deadline = get_deadline()
+        queries = await deadline.run("query_generation", self.query_generator.generate_queries(user_input, intent), reserve=settings.DEADLINE_ANSWER_RESERVE, fallback=[user_input])
         logger.info(f"생성된 쿼리: {queries}")
 
         # 과거 대화에 대한 질문인지 확인
@@ -154,29 +313,49 @@ class Chatbot:
             relevant_info = self._get_conversation_history()
         else:
             # 유사도 기준을 적용한 벡터 검색 수행
-            vector_results = self.vector_store.search_with_similarity_threshold(queries[0], k=3, threshold=settings.SIMILARITY_THRESHOLD)
+            vector_results = await deadline.run(
+                "vector_search",
+                self.vector_store.asearch_with_similarity_threshold(queries[0], k=3, threshold=settings.SIMILARITY_THRESHOLD),
+                reserve=settings.DEADLINE_ANSWER_RESERVE,
+                fallback=[],
+            )
 
             if vector_results:
                 logger.info("벡터 검색 결과를 찾았습니다.")
                 relevant_info = self._process_vector_results(vector_results)
+            elif not deadline.has(settings.DEADLINE_ANSWER_RESERVE + settings.DEADLINE_MIN_WEB_SEARCH):
+                # 웹 검색 폴백을 할 시간이 부족하면 컨텍스트 없이 답변
+                deadline.skip("web_search")
+                relevant_info = []
             else:
                 logger.info("벡터 검색 결과가 없습니다. 웹 검색을 수행합니다.")
                 try:
-                    search_results = await self.web_search.search(queries)
-                    relevant_info = self._process_web_results(search_results)
+                    search_results = await deadline.run("web_search", self.web_search.search(queries), reserve=settings.DEADLINE_ANSWER_RESERVE, fallback=None)
+                    relevant_info = self._process_web_results(search_results) if search_results else []
                 except Exception as e:
                     logger.error(f"웹 검색 중 오류 발생: {str(e)}")
                     relevant_info = []
 
-        context = self._prepare_context(relevant_info)
-        prompt = self._create_prompt(user_input, context)
+        return await self._answer_with_context(user_input, relevant_info)
+
+    async def _answer_with_context(self, user_input: str, relevant_info: List[Dict[str, str]]) -> Dict[str, Any]:
+        """
+        수집한 관련 정보를 컨텍스트로 최종 답변을 생성합니다.
+        남은 시간 안에 답변을 생성하지 못하면 관련 정보만 담은 안내 응답을 반환합니다.
 
-        # 토큰 수 계산 및 제한
-        total_tokens = len(self.encoding.encode(prompt))
-        if total_tokens > self.max_tokens:
-            prompt = self._reduce_context(prompt, self.max_tokens)
+        :param user_input: 사용자 입력 문자열
+        :param relevant_info: 컨텍스트로 사용할 관련 정보 리스트
+        :return: 텍스트 응답과 관련 정보를 포함한 딕셔너리
+        """
+        self.session.emit("retrieval", relevant_info)
+        # 컨텍스트 이외의 프롬프트 토큰 수를 제외한 예산 안에서 컨텍스트 구성
+        context = self._prepare_context(relevant_info, self._create_prompt(user_input, ""))
+        prompt = self._create_prompt(user_input, context)
 
-        response = self.conversation.predict(input=prompt)
+        response = await get_deadline().run("llm_answer", self._predict(prompt), fallback=None)
+        if response is None:
+            text = "답변을 생성하는 데 시간이 너무 오래 걸려 중단했습니다. 아래 관련 정보를 참고하시거나 잠시 후 다시 질문해 주세요."
+            return {"text_response": text, "relevant_info": relevant_info, "graph_data": None}
 
         self._save_to_short_term_memory(user_input, response)
         if self._should_save_response(response):
@@ -184,6 +363,25 @@ class Chatbot:
 
         return {"text_response": response, "relevant_info": relevant_info, "graph_data": None}
 
+    @timed_stage("llm_answer")
+    async def _predict(self, prompt: str) -> str:
+        """
+        요청 제한을 적용하여 대화 체인으로 응답을 생성합니다.
+        """
+        history = self.memory.buffer
+        session = self.session
+        if session.on_event is not None:
+            # 스트리밍 세션은 토큰을 세션으로 전달해야 하므로 다른 요청과 병합하지 않음
+            handler = _TokenStreamHandler(session)
+            return await self.rate_limiter.run(
+                lambda: session.conversation.apredict(input=prompt, callbacks=[handler]), tokens=estimate_tokens(prompt, history, completion_tokens=500)
+            )
+        # 같은 대화 상태에서 동시에 들어온 동일 프롬프트는 한 번만 생성
+        return await get_single_flight("llm").do(
+            make_key("conversation", history, prompt),
+            lambda: self.rate_limiter.run(lambda: session.conversation.apredict(input=prompt), tokens=estimate_tokens(prompt, history, completion_tokens=500)),
+        )
+
     def _check_historical_query(self, user_input: str) -> bool:
         """
         사용자 입력이 과거 대화에 대한 질문인지 확인합니다.
@@ -227,6 +425,7 @@ class Chatbot:
                     "snippet": result.get("content", ""),
                     "date": date_str,
                     "image_url": "",  # VectorStore에는 이미지 URL이 저장되어 있지 않음
+                    "score": result.get("metadata", {}).get("similarity", 0.0),
                 }
             )
         return processed_results
@@ -236,7 +435,7 @@ class Chatbot:
         웹 검색 결과를 처리하여 필요한 정보를 추출합니다.
         """
         processed_results = []
-        for item in search_results.get("organic", [])[:5]:  # 상위 5개 결과만 사용
+        for rank, item in enumerate(search_results.get("organic", [])[:5]):  # 상위 5개 결과만 사용
             processed_results.append(
                 {
                     "title": item.get("title", ""),
@@ -244,26 +443,37 @@ class Chatbot:
                     "url": item.get("link", ""),
                     "date": item.get("date", ""),
                     "image_url": item.get("imageUrl", ""),
+                    "score": 1.0 / (rank + 1),  # 검색 순위를 역순위 점수로 사용
                 }
             )
         return processed_results
 
-    def _prepare_context(self, relevant_info: List[Dict[str, str]]) -> str:
+    def _prepare_context(self, relevant_info: List[Dict[str, str]], prompt_without_context: str = "") -> str:
         """
-        검색 결과와 단기 기억을 기반으로 문맥을 준비합니다.
+        검색 결과를 관련도 순으로 토큰 예산 안에 채워 문맥을 준비합니다.
+
+        :param relevant_info: 검색 결과 리스트
+        :param prompt_without_context: 컨텍스트를 비운 프롬프트 (예산 계산용)
         """
-        context_parts = []
-        for info in relevant_info:
-            part = f"[제목: {info['title']}]\n{info['snippet']}"
-            if info["url"]:
-                part += f"\n[출처: {info['url']}]"
-            if info["date"]:
-                part += f"\n[날짜: {info['date']}]"
-            if info["image_url"]:
-                part += f"\n[이미지: {info['image_url']}]"
-            context_parts.append(part)
+        if not relevant_info:
+            return "관련된 구체적인 정보를 찾지 못했습니다."
 
-        return "\n\n".join(context_parts) if context_parts else "관련된 구체적인 정보를 찾지 못했습니다."
+        reserved_tokens = self.context_packer.count_tokens(prompt_without_context)
+        context, _ = self.context_packer.pack(relevant_info, self._format_context_part, reserved_tokens=reserved_tokens)
+        return context or "관련된 구체적인 정보를 찾지 못했습니다."
+
+    def _format_context_part(self, info: Dict[str, str]) -> str:
+        """
+        검색 결과 하나를 컨텍스트 문자열로 변환합니다.
+        """
+        part = f"[제목: {info['title']}]\n{info['snippet']}"
+        if info["url"]:
+            part += f"\n[출처: {info['url']}]"
+        if info["date"]:
+            part += f"\n[날짜: {info['date']}]"
+        if info["image_url"]:
+            part += f"\n[이미지: {info['image_url']}]"
+        return part
 
     def _create_prompt(self, user_input: str, context: str) -> str:
         """
@@ -306,38 +516,6 @@ class Chatbot:
         사용자 요청: {user_input}
         분석가:"""
 
-    def _reduce_context(self, prompt: str, max_tokens: int) -> str:
-        """
-        프롬프트의 컨텍스트를 줄여 토큰 수를 제한합니다.
-        """
-        tokens = self.encoding.encode(prompt)
-        if len(tokens) <= max_tokens:
-            return prompt
-
-        context_start = prompt.find("참고 정보:")
-        context_end = prompt.find("사용자:")
-        if context_start == -1 or context_end == -1:
-            return self.encoding.decode(tokens[:max_tokens])
-
-        context = prompt[context_start:context_end]
-        non_context = prompt[:context_start] + prompt[context_end:]
-        available_tokens = max_tokens - len(self.encoding.encode(non_context))
-
-        if available_tokens <= 0:
-            return prompt[:context_start] + prompt[context_end:]
-
-        context_lines = context.split("\n")
-        reduced_context = []
-        current_tokens = 0
-        for line in context_lines:
-            line_tokens = len(self.encoding.encode(line))
-            if current_tokens + line_tokens > available_tokens:
-                break
-            reduced_context.append(line)
-            current_tokens += line_tokens
-
-        return prompt[:context_start] + "\n".join(reduced_context) + prompt[context_end:]
-
     def _save_to_short_term_memory(self, user_input: str, response: Optional[str] = None):
         """
         단기 기억에 텍스트와 응답을 저장합니다.
@@ -352,6 +530,7 @@ class Chatbot:
         skip_keywords = ["찾지 못했습니다", "정보가 없습니다"]
         return not any(keyword in response for keyword in skip_keywords)
 
+    @timed_stage("save_vector_store")
     def _save_to_vector_store(self, user_input: str, response: str):
         """
         대화 내용을 벡터 저장소에 저장합니다.
@@ -0,0 +1,379 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from config.settings import settings
+from utils.metrics import stage_listener
+from utils.single_flight import make_key
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("succeeded", "failed")
+
+
+class JobQueueFull(RuntimeError):
+    """대기 중인 그래프 작업이 너무 많아 새 작업을 받을 수 없을 때 발생하는 예외"""
+
+
+class GraphJobStore:
+    """
+    그래프 작업 상태를 저장하는 로컬 SQLite 저장소
+    멀티 워커로 실행할 때 작업을 실행하지 않는 워커도 상태 조회/구독 요청에 응답할 수 있도록 공유합니다.
+    updated_at 열은 작업을 가진 워커가 마지막으로 저장하거나 갱신(touch)한 시각으로, 워커 종료 여부 판단에 사용합니다.
+    """
+
+    def __init__(self, path: str = settings.GRAPH_JOB_STORE_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS graph_jobs (id TEXT PRIMARY KEY, key TEXT NOT NULL, status TEXT NOT NULL, snapshot TEXT NOT NULL, updated_at REAL NOT NULL, expires_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_graph_jobs_key ON graph_jobs (key, status)")
+        self._db.commit()
+
+    def save(self, snapshot: Dict[str, Any], key: str, expires_at: Optional[float]):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO graph_jobs (id, key, status, snapshot, updated_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (snapshot["job_id"], key, snapshot["status"], json.dumps(snapshot, ensure_ascii=False, default=str), time.time(), expires_at),
+            )
+            self._db.commit()
+
+    def touch(self, job_ids: List[str], now: float):
+        # 대기/실행 중인 작업을 가진 워커가 살아 있음을 기록
+        if not job_ids:
+            return
+        with self._lock:
+            self._db.execute(f"UPDATE graph_jobs SET updated_at = ? WHERE status IN (?, ?) AND id IN ({', '.join('?' * len(job_ids))})", (now, *ACTIVE_STATUSES, *job_ids))
+            self._db.commit()
+
+    def load(self, job_id: str, stale_before: float = 0.0) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT snapshot, expires_at, status, updated_at FROM graph_jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        snapshot = json.loads(row[0])
+        if row[2] in ACTIVE_STATUSES and row[3] < stale_before:
+            # 작업을 가진 워커가 응답하지 않으면 실패로 표시
+            snapshot.update(status="failed", error="작업을 실행하던 워커가 응답하지 않습니다.")
+        return snapshot
+
+    def find_active(self, key: str, updated_after: float) -> Optional[Tuple[str, str]]:
+        # 다른 워커에서 진행 중인 같은 작업의 (ID, 상태) (응답이 끊긴 워커의 작업은 제외)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, status FROM graph_jobs WHERE key = ? AND status IN (?, ?) AND updated_at > ? ORDER BY updated_at DESC LIMIT 1", (key, *ACTIVE_STATUSES, updated_after)
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def purge(self, now: float, stale_before: float) -> int:
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM graph_jobs WHERE (expires_at IS NOT NULL AND expires_at < ?) OR (status IN (?, ?) AND updated_at < ?)", (now, *ACTIVE_STATUSES, stale_before)
+            )
+            self._db.commit()
+        return cursor.rowcount
+
+
+class GraphJob:
+    """
+    실행 중인 그래프 작업 하나의 상태와 구독자
+    """
+
+    def __init__(self, query: str, key: str, options: Dict[str, Any]):
+        now = time.time()
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.query = query
+        self.options = options
+        self.status = "queued"
+        self.stages: List[Dict[str, Any]] = []
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.created_at = now
+        self.updated_at = now
+        self.finished_at: Optional[float] = None
+        self.subscribers: List[asyncio.Queue] = []
+        # 상태 저장 순서 보장 (이전 상태가 나중에 저장되어 최신 상태를 덮어쓰지 않도록)
+        self.persist_lock = asyncio.Lock()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "query": self.query,
+            "stages": list(self.stages),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class GraphJobManager:
+    """
+    그래프 생성 요청을 백그라운드 작업으로 실행하는 관리자
+    - 제한된 수의 워커 태스크가 대기열의 작업을 실행합니다.
+    - 같은 요청(쿼리와 옵션)이 대기/실행 중이면 새 작업을 만들지 않고 기존 작업 ID를 반환합니다.
+    - 끝난 작업의 결과는 ttl초 동안 보관합니다.
+    - 작업 상태는 SQLite에도 기록되어 다른 워커 프로세스에서도 조회/구독할 수 있습니다.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]],
+        workers: int = settings.GRAPH_JOB_WORKERS,
+        max_pending: int = settings.GRAPH_JOB_MAX_PENDING,
+        ttl: float = settings.GRAPH_JOB_TTL,
+        store: Optional[GraphJobStore] = None,
+    ):
+        """
+        :param run: (쿼리, 옵션)을 받아 결과 딕셔너리를 반환하는 코루틴 함수
+        :param workers: 동시에 실행할 작업 수
+        :param max_pending: 대기열에 둘 수 있는 최대 작업 수
+        :param ttl: 끝난 작업 결과 보관 시간(초)
+        :param store: 작업 상태 공유 저장소 (없으면 이 프로세스 안에서만 조회 가능)
+        """
+        self.run = run
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.store = store
+        self.jobs: Dict[str, GraphJob] = {}
+        self.active_by_key: Dict[str, GraphJob] = {}
+        self.queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        # 단계 기록마다 시작하는 상태 저장 태스크 (완료 전에 가비지 컬렉션되지 않도록 참조 유지)
+        self._persist_tasks: Set[asyncio.Task] = set()
+        self.stats = {"submitted": 0, "deduplicated": 0, "rejected": 0, "succeeded": 0, "failed": 0}
+
+    @property
+    def stale_after(self) -> float:
+        # 워커는 GRAPH_JOB_HEARTBEAT초마다 자신의 대기/실행 중 작업을 갱신하므로, 이 시간 동안 갱신되지 않은 작업은 워커가 종료된 것으로 간주
+        return settings.GRAPH_JOB_HEARTBEAT * 4
+
+    def start(self):
+        """
+        워커 태스크와 만료 작업 정리 태스크를 시작합니다. (애플리케이션 시작 시 호출)
+        """
+        if self._tasks:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_pending)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._purge_loop()))
+        if self.store is not None:
+            self._tasks.append(asyncio.create_task(self._heartbeat_loop()))
+        logger.info(f"그래프 작업 워커 시작 ({self.workers}개)")
+
+    async def stop(self):
+        """
+        워커 태스크를 중지합니다. 실행 중이던 작업은 실패로 기록합니다. (애플리케이션 종료 시 호출)
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await asyncio.gather(*self._persist_tasks, return_exceptions=True)
+        for job in list(self.active_by_key.values()):
+            await self._finish(job, error="서버가 종료되어 작업이 중단되었습니다.")
+
+    async def submit(self, query: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        그래프 작업을 등록하고 즉시 반환합니다.
+        :param query: 사용자 요청 문자열
+        :param options: 결과 형식 등 작업 옵션 (중복 판단 키에 포함)
+        :return: {"job_id", "status", "deduplicated"}
+        :raises JobQueueFull: 대기열이 가득 찬 경우
+        """
+        key = make_key("graph_job", query, options)
+        job = self.active_by_key.get(key)
+        if job is None and self.store is not None:
+            active = await asyncio.to_thread(self.store.find_active, key, time.time() - self.stale_after)
+            if active is not None:
+                self.stats["deduplicated"] += 1
+                return {"job_id": active[0], "status": active[1], "deduplicated": True}
+        if job is not None:
+            self.stats["deduplicated"] += 1
+            return {"job_id": job.id, "status": job.status, "deduplicated": True}
+
+        if self.queue is None or self.queue.full():
+            self.stats["rejected"] += 1
+            raise JobQueueFull("대기 중인 그래프 작업이 너무 많습니다.")
+        job = GraphJob(query, key, options)
+        self.jobs[job.id] = job
+        self.active_by_key[key] = job
+        self.queue.put_nowait(job)
+        self.stats["submitted"] += 1
+        await self._persist(job)
+        return {"job_id": job.id, "status": job.status, "deduplicated": False}
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        작업 상태를 반환합니다. 없거나 만료되었으면 None
+        """
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.snapshot()
+        if self.store is None:
+            return None
+        return await asyncio.to_thread(self.store.load, job_id, time.time() - self.stale_after)
+
+    async def events(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        작업의 진행 이벤트를 순서대로 내보냅니다. 처음에 현재 상태를 보내고, 작업이 끝나면 "done" 이벤트로 종료합니다.
+        다른 워커가 실행 중인 작업은 저장소를 주기적으로 확인하여 변경을 내보냅니다.
+        :return: {"event": "snapshot" | "stage" | "status" | "done", "data": ...}
+        """
+        job = self.jobs.get(job_id)
+        if job is None:
+            async for event in self._poll_events(job_id):
+                yield event
+            return
+
+        queue: asyncio.Queue = asyncio.Queue()
+        job.subscribers.append(queue)
+        try:
+            if job.status in FINISHED_STATUSES:
+                yield {"event": "done", "data": job.snapshot()}
+                return
+            yield {"event": "snapshot", "data": job.snapshot()}
+            # 작업 상태가 아니라 done 이벤트로 종료 여부를 판단 (작업이 먼저 끝나도 대기열에 남은 이벤트를 모두 전달)
+            while True:
+                event = await queue.get()
+                yield event
+                if event["event"] == "done":
+                    break
+        finally:
+            if queue in job.subscribers:
+                job.subscribers.remove(queue)
+
+    async def _poll_events(self, job_id: str) -> AsyncIterator[Dict[str, Any]]:
+        previous = None
+        while True:
+            snapshot = await self.get(job_id)
+            if snapshot is None:
+                return
+            if previous is None or snapshot["updated_at"] != previous["updated_at"] or snapshot["status"] != previous["status"]:
+                finished = snapshot["status"] in FINISHED_STATUSES
+                yield {"event": "done" if finished else ("snapshot" if previous is None else "status"), "data": snapshot}
+                if finished:
+                    return
+                previous = snapshot
+            await asyncio.sleep(settings.GRAPH_JOB_POLL_INTERVAL)
+
+    async def _worker(self):
+        while True:
+            job = await self.queue.get()
+            try:
+                await self._execute(job)
+            except asyncio.CancelledError:
+                await self._finish(job, error="서버가 종료되어 작업이 중단되었습니다.")
+                raise
+            except Exception as e:
+                logger.error(f"그래프 작업 실행 중 오류 발생 ({job.id}): {str(e)}", exc_info=True)
+                await self._finish(job, error=str(e))
+
+    async def _execute(self, job: GraphJob):
+        loop = asyncio.get_running_loop()
+        job.status = "running"
+        job.updated_at = time.time()
+        self._publish(job, "status", job.snapshot())
+        await self._persist(job)
+
+        def on_stage(stage: str, seconds: float):
+            # 단계 완료 알림 (스레드에서 실행된 단계는 이벤트 루프로 넘겨서 처리)
+            # 이벤트 루프에서 끝난 단계는 바로 기록해야 마지막 단계가 작업 완료 처리보다 늦게 기록되어 빠지지 않음
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if running is loop:
+                self._record_stage(job, stage, seconds)
+            else:
+                loop.call_soon_threadsafe(self._record_stage, job, stage, seconds)
+
+        with stage_listener(on_stage):
+            result = await self.run(job.query, job.options)
+        await self._finish(job, result=result)
+
+    def _record_stage(self, job: GraphJob, stage: str, seconds: float):
+        if job.status in FINISHED_STATUSES:
+            return
+        entry = {"stage": stage, "ms": round(seconds * 1000, 1)}
+        job.stages.append(entry)
+        job.updated_at = time.time()
+        self._publish(job, "stage", entry)
+        if self.store is not None:
+            task = asyncio.create_task(self._persist(job))
+            self._persist_tasks.add(task)
+            task.add_done_callback(self._persist_tasks.discard)
+
+    async def _finish(self, job: GraphJob, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        if job.status in FINISHED_STATUSES:
+            return
+        job.status = "failed" if error else "succeeded"
+        job.result = result
+        job.error = error
+        job.finished_at = job.updated_at = time.time()
+        self.stats[job.status] += 1
+        if self.active_by_key.get(job.key) is job:
+            del self.active_by_key[job.key]
+        await self._persist(job)
+        self._publish(job, "done", job.snapshot())
+
+    def _publish(self, job: GraphJob, event: str, data: Dict[str, Any]):
+        for queue in job.subscribers:
+            queue.put_nowait({"event": event, "data": data})
+
+    async def _persist(self, job: GraphJob):
+        if self.store is None:
+            return
+        async with job.persist_lock:
+            expires_at = job.finished_at + self.ttl if job.finished_at else None
+            try:
+                await asyncio.to_thread(self.store.save, job.snapshot(), job.key, expires_at)
+            except Exception as e:
+                logger.warning(f"그래프 작업 상태 저장 실패 ({job.id}): {str(e)}")
+
+    async def _purge_loop(self):
+        while True:
+            await asyncio.sleep(min(60.0, self.ttl))
+            now = time.time()
+            for job_id, job in list(self.jobs.items()):
+                if job.finished_at is not None and job.finished_at + self.ttl < now:
+                    del self.jobs[job_id]
+            if self.store is not None:
+                try:
+                    # 워커가 종료된 작업도 ttl초 동안은 실패 상태로 조회할 수 있도록 남겨 둠
+                    await asyncio.to_thread(self.store.purge, now, now - self.stale_after - self.ttl)
+                except Exception as e:
+                    logger.warning(f"만료된 그래프 작업 정리 실패: {str(e)}")
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(settings.GRAPH_JOB_HEARTBEAT)
+            try:
+                await asyncio.to_thread(self.store.touch, [job.id for job in self.active_by_key.values()], time.time())
+            except Exception as e:
+                logger.warning(f"그래프 작업 상태 갱신 실패: {str(e)}")
+
+
+def create_job_store() -> Optional[GraphJobStore]:
+    """
+    설정에 따라 작업 상태 저장소를 생성합니다. GRAPH_JOB_STORE_PATH가 비어 있으면 None
+    """
+    if not settings.GRAPH_JOB_STORE_PATH:
+        return None
+    return GraphJobStore(settings.GRAPH_JOB_STORE_PATH)
@@ -1,4 +1,4 @@
-from typing import Any, List, Optional, Dict
+from typing import Any, List, Literal, Optional, Dict
 from pydantic import BaseModel, Field, HttpUrl, validator
 
 
@@ -30,10 +30,19 @@ class CompanySearchResult(BaseModel):
     image_url: Optional[HttpUrl] = Field(None, description="회사 관련 이미지 URL")
 
 
+class CompanyBatchSearchRequest(BaseModel):
+    """여러 회사의 유사 회사 일괄 검색 요청 모델"""
+
+    companies: List[CompanyInfo] = Field(..., description="검색할 회사 정보 목록")
+    limit: int = Field(5, ge=1, le=100, description="회사별로 반환할 결과의 수")
+
+
 class ChatInput(BaseModel):
     """채팅 입력을 위한 모델"""
 
     message: str = Field(..., description="사용자 메시지")
+    graph_format: Literal["compact", "plotly"] = Field("compact", description="그래프 데이터 형식 (compact: {type, title, x, y}, plotly: Plotly 그림 전체)")
+    timeout: Optional[float] = Field(None, gt=0, le=120, description="응답 시간 예산(초). 예산이 부족하면 일부 단계를 생략하고 응답합니다. (기본: 서버 설정)")
 
 
 class WebSearchResult(BaseModel):
@@ -54,8 +63,40 @@ class WebSearchResult(BaseModel):
 class ChatResponse(BaseModel):
     text_response: str = Field(..., description="AI 응답 메시지")
     web_results: Optional[List[WebSearchResult]] = Field(None, description="웹 검색 결과 목록")
-    graph_data: Optional[Dict[str, Any]] = Field(None, description="그래프 데이터 (Plotly 형식)")
+    graph_data: Optional[Dict[str, Any]] = Field(None, description="그래프 데이터 (기본: {type, title, x, y} 형식, graph_format이 plotly이면 Plotly 형식)")
     image_url: Optional[str] = Field(None, description="응답과 관련된 이미지 URL")
+    skipped_stages: List[str] = Field(default_factory=list, description="시간 예산이 부족하여 생략하거나 축소한 단계 (예: web_search, graph)")
+
+
+class GraphJobRequest(BaseModel):
+    """그래프 생성 백그라운드 작업 요청 모델"""
+
+    message: str = Field(..., description="사용자 메시지 (그래프로 보고 싶은 데이터)")
+    graph_format: Literal["compact", "plotly"] = Field("compact", description="그래프 데이터 형식 (compact: {type, title, x, y}, plotly: Plotly 그림 전체)")
+    timeout: Optional[float] = Field(None, gt=0, le=600, description="작업 시간 예산(초) (기본: 서버 설정)")
+
+
+class GraphJobAccepted(BaseModel):
+    job_id: str = Field(..., description="작업 ID")
+    status: Literal["queued", "running", "succeeded", "failed"] = Field(..., description="작업 상태")
+    deduplicated: bool = Field(..., description="같은 요청이 이미 진행 중이어서 기존 작업 ID를 반환했는지 여부")
+
+
+class GraphJobStage(BaseModel):
+    stage: str = Field(..., description="완료된 단계 이름")
+    ms: float = Field(..., description="단계 소요 시간(ms)")
+
+
+class GraphJobStatus(BaseModel):
+    job_id: str = Field(..., description="작업 ID")
+    status: Literal["queued", "running", "succeeded", "failed"] = Field(..., description="작업 상태")
+    query: str = Field(..., description="요청 메시지")
+    stages: List[GraphJobStage] = Field(default_factory=list, description="완료된 단계 목록 (완료 순서)")
+    result: Optional[ChatResponse] = Field(None, description="작업 결과 (succeeded인 경우)")
+    error: Optional[str] = Field(None, description="오류 메시지 (failed인 경우)")
+    created_at: float = Field(..., description="작업 등록 시각 (Unix time)")
+    updated_at: float = Field(..., description="마지막 갱신 시각 (Unix time)")
+    finished_at: Optional[float] = Field(None, description="작업 종료 시각 (Unix time)")
 
 
 class SupportProgramInfo(BaseModel):
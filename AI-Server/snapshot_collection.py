@@ -0,0 +1,356 @@
+"""
+벡터 컬렉션 스냅샷 내보내기/가져오기
+
+임베딩을 다시 계산하지 않고 컬렉션을 다른 환경으로 옮기거나 복원합니다.
+
+    python snapshot_collection.py export data/snapshots/business_info
+    python snapshot_collection.py import data/snapshots/business_info [--collection business_info_restore] [--load]
+
+스냅샷 디렉터리 구성
+- manifest.json: 컬렉션 스키마, 인덱스 설정, 행 수, 내보내기 진행 상황
+- scalars/part-00000.parquet ...: 벡터를 제외한 필드 (페이지 단위 파일, 행 순서는 vectors.npy와 같음)
+- vectors.npy: 벡터 (행 수 x 차원, 기본 float16, 메모리 매핑으로 읽고 씀)
+- import_state.json: 가져오기 진행 상황
+
+내보내기와 가져오기 모두 페이지/배치마다 진행 상황을 기록하므로, 중단되면 같은 명령을 다시 실행하여 이어서 진행합니다.
+가져오기는 인덱스 없이 큰 배치로 삽입한 뒤 마지막에 한 번만 flush하고 인덱스를 생성합니다.
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, utility
+
+from config.settings import settings
+from utils.database import close_milvus_connection, connect_to_milvus
+from utils.logging_utils import setup_logging
+
+# pyarrow가 없으면 스냅샷 명령을 사용할 수 없음 (서버 실행에는 필요 없음)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.json"
+VECTORS = "vectors.npy"
+IMPORT_STATE = "import_state.json"
+SNAPSHOT_VERSION = 1
+
+
+def write_json(path: str, data: Dict[str, Any]):
+    # 중단되어도 이전 내용이 남도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_json(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _part_path(directory: str, index: int) -> str:
+    return os.path.join(directory, "scalars", f"part-{index:05d}.parquet")
+
+
+class Throughput:
+    """
+    처리한 행 수와 바이트 수로 처리 속도를 기록합니다.
+    """
+
+    def __init__(self, label: str):
+        self.label = label
+        self.start = time.perf_counter()
+        self.rows = 0
+        self.bytes = 0
+
+    def add(self, rows: int, nbytes: int):
+        self.rows += rows
+        self.bytes += nbytes
+
+    def report(self, done: int, total: int) -> str:
+        elapsed = max(time.perf_counter() - self.start, 1e-9)
+        return f"{self.label}: {done}/{total}행, {self.rows / elapsed:,.0f}행/초, {self.bytes / elapsed / 1024 / 1024:,.1f}MB/초 ({elapsed:.1f}초)"
+
+
+def describe_collection(collection: Collection) -> Dict[str, Any]:
+    """
+    컬렉션을 다시 만들 수 있도록 스키마와 인덱스 설정을 딕셔너리로 반환합니다.
+    """
+    fields = [
+        {"name": field.name, "dtype": field.dtype.name, "is_primary": field.is_primary, "auto_id": field.auto_id, "params": dict(field.params)}
+        for field in collection.schema.fields
+    ]
+    indexes = [{"field_name": index.field_name, "params": dict(index.params)} for index in collection.indexes]
+    return {"description": collection.schema.description, "fields": fields, "indexes": indexes}
+
+
+def build_schema(description: Dict[str, Any]) -> CollectionSchema:
+    """
+    describe_collection 결과로 컬렉션 스키마를 만듭니다.
+    """
+    fields = []
+    for field in description["fields"]:
+        kwargs = dict(field["params"])
+        if field["is_primary"]:
+            kwargs.update(is_primary=True, auto_id=field["auto_id"])
+        fields.append(FieldSchema(name=field["name"], dtype=DataType[field["dtype"]], **kwargs))
+    return CollectionSchema(fields, description.get("description", ""))
+
+
+def vector_field(fields: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    스키마 필드 목록에서 벡터 필드를 반환합니다. (FLOAT_VECTOR 필드가 하나인 컬렉션만 지원)
+    """
+    vector_fields = [field for field in fields if field["dtype"] == "FLOAT_VECTOR"]
+    if len(vector_fields) != 1:
+        raise ValueError(f"FLOAT_VECTOR 필드가 하나인 컬렉션만 지원합니다: {[field['name'] for field in vector_fields]}")
+    return vector_fields[0]
+
+
+def primary_field(fields: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    스키마 필드 목록에서 기본 키 필드를 반환합니다.
+    """
+    return next(field for field in fields if field["is_primary"])
+
+
+def after_pk_expr(primary: Dict[str, Any], last_pk: Any) -> str:
+    """
+    기본 키가 last_pk보다 큰 행을 고르는 필터 식을 반환합니다. (last_pk가 없으면 전체)
+    query iterator는 기본 키 순서로 읽으므로 중단된 위치부터 이어서 읽을 때 사용합니다.
+    """
+    if last_pk is None:
+        return ""
+    return f"{primary['name']} > {last_pk}" if primary["dtype"] == "INT64" else f"{primary['name']} > {json.dumps(last_pk, ensure_ascii=False)}"
+
+
+def _require_pyarrow():
+    if pq is None:
+        raise RuntimeError("스냅샷 명령에는 pyarrow가 필요합니다. (pip install pyarrow)")
+
+
+def export_collection(
+    directory: str,
+    collection_name: str = settings.COLLECTION_NAME,
+    batch_size: int = settings.SNAPSHOT_EXPORT_BATCH,
+    dtype: str = settings.SNAPSHOT_VECTOR_DTYPE,
+    overwrite: bool = False,
+) -> Dict[str, Any]:
+    """
+    컬렉션을 페이지 단위로 읽어 스냅샷 디렉터리에 저장합니다.
+    같은 디렉터리에 끝나지 않은 스냅샷이 있으면 마지막으로 기록한 기본 키 다음부터 이어서 내보냅니다.
+
+    :param directory: 스냅샷 디렉터리
+    :param collection_name: 내보낼 컬렉션 이름
+    :param batch_size: 한 번에 읽을 행 수
+    :param dtype: 벡터 저장 형식 (float16 또는 float32)
+    :param overwrite: 완료된 스냅샷이 있어도 새로 내보낼지 여부
+    :return: 완료된 manifest
+    """
+    _require_pyarrow()
+    manifest_path = os.path.join(directory, MANIFEST)
+    vectors_path = os.path.join(directory, VECTORS)
+    manifest = read_json(manifest_path)
+    if manifest and manifest["status"] == "complete" and not overwrite:
+        raise FileExistsError(f"이미 완료된 스냅샷이 있습니다: {directory} (--overwrite로 다시 내보내기)")
+    if manifest and (overwrite or manifest["collection"] != collection_name):
+        manifest = None
+
+    collection = Collection(collection_name)
+    collection.flush()
+    if manifest is None:
+        for path in glob.glob(os.path.join(directory, "scalars", "*.parquet")):
+            os.remove(path)
+        os.makedirs(os.path.join(directory, "scalars"), exist_ok=True)
+        description = describe_collection(collection)
+        manifest = {
+            "version": SNAPSHOT_VERSION,
+            "collection": collection_name,
+            "schema": description,
+            "vector_dtype": dtype,
+            "capacity": collection.num_entities,
+            "count": 0,
+            "parts": 0,
+            "last_pk": None,
+            "status": "partial",
+            "created_at": time.time(),
+        }
+        np.lib.format.open_memmap(vectors_path, mode="w+", dtype=dtype, shape=(max(manifest["capacity"], 1), vector_field(description["fields"])["params"]["dim"])).flush()
+        write_json(manifest_path, manifest)
+    else:
+        logger.info(f"이전 내보내기에 이어서 진행합니다: {manifest['count']}행, 마지막 기본 키 {manifest['last_pk']}")
+
+    fields = manifest["schema"]["fields"]
+    vector_name = vector_field(fields)["name"]
+    primary = primary_field(fields)
+    scalar_names = [field["name"] for field in fields if field["name"] != vector_name]
+
+    iterator = collection.query_iterator(batch_size=batch_size, expr=after_pk_expr(primary, manifest["last_pk"]), output_fields=scalar_names + [vector_name])
+
+    vectors = np.load(vectors_path, mmap_mode="r+")
+    throughput = Throughput("내보내기")
+    try:
+        while True:
+            rows = iterator.next()
+            if not rows:
+                break
+            count = manifest["count"]
+            if count + len(rows) > vectors.shape[0]:
+                # 내보내는 동안 추가된 행이 있으면 벡터 파일을 늘림
+                vectors = _grow_vectors(vectors_path, vectors, count + len(rows))
+            vectors[count : count + len(rows)] = np.asarray([row[vector_name] for row in rows], dtype=np.float32)
+            vectors.flush()
+
+            table = pa.table({name: [row[name] for row in rows] for name in scalar_names})
+            pq.write_table(table, _part_path(directory, manifest["parts"]), compression="zstd")
+
+            manifest.update(count=count + len(rows), parts=manifest["parts"] + 1, last_pk=rows[-1][primary["name"]])
+            write_json(manifest_path, manifest)
+            throughput.add(len(rows), len(rows) * vectors.shape[1] * vectors.dtype.itemsize + table.nbytes)
+            logger.info(throughput.report(manifest["count"], manifest["capacity"]))
+    finally:
+        iterator.close()
+        del vectors
+
+    manifest.update(status="complete", finished_at=time.time())
+    write_json(manifest_path, manifest)
+    logger.info(f"내보내기 완료: {collection_name} → {directory} ({manifest['count']}행, {manifest['parts']}개 파일)")
+    return manifest
+
+
+def _grow_vectors(path: str, vectors: np.memmap, rows: int) -> np.memmap:
+    capacity = max(rows, vectors.shape[0] * 2)
+    tmp_path = f"{path}.tmp"
+    grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=vectors.dtype, shape=(capacity, vectors.shape[1]))
+    grown[: vectors.shape[0]] = vectors
+    grown.flush()
+    del grown
+    os.replace(tmp_path, path)
+    return np.load(path, mmap_mode="r+")
+
+
+def import_collection(directory: str, collection_name: Optional[str] = None, batch_size: int = settings.SNAPSHOT_IMPORT_BATCH, drop: bool = False, load: bool = False) -> int:
+    """
+    스냅샷을 새 컬렉션에 삽입합니다. 임베딩은 다시 계산하지 않습니다.
+    인덱스 없이 batch_size행씩 삽입한 뒤 마지막에 한 번만 flush하고 인덱스를 생성합니다.
+    중단된 가져오기는 import_state.json에 기록된 행 다음부터 이어서 진행합니다.
+    (삽입 직후 진행 상황을 기록하기 전에 중단되면 마지막 배치가 중복될 수 있습니다.)
+
+    :param directory: 스냅샷 디렉터리
+    :param collection_name: 만들 컬렉션 이름 (없으면 스냅샷의 컬렉션 이름)
+    :param batch_size: 한 번에 삽입할 행 수
+    :param drop: 같은 이름의 컬렉션이 있으면 삭제하고 새로 만들지 여부
+    :param load: 가져온 뒤 컬렉션을 메모리에 로드할지 여부
+    :return: 삽입한 행 수
+    """
+    _require_pyarrow()
+    manifest = read_json(os.path.join(directory, MANIFEST))
+    if manifest is None or manifest["status"] != "complete":
+        raise ValueError(f"완료된 스냅샷이 아닙니다: {directory}")
+    collection_name = collection_name or manifest["collection"]
+    state_path = os.path.join(directory, IMPORT_STATE)
+    state = read_json(state_path)
+    if state is None or state["collection"] != collection_name or state["status"] == "complete" or drop:
+        state = None
+
+    if utility.has_collection(collection_name):
+        if drop:
+            utility.drop_collection(collection_name)
+        elif state is None:
+            raise FileExistsError(f"컬렉션 {collection_name}이(가) 이미 있습니다. (--drop으로 삭제 후 가져오기)")
+    if state is None:
+        Collection(collection_name, build_schema(manifest["schema"]))
+        state = {"collection": collection_name, "imported": 0, "status": "partial"}
+        write_json(state_path, state)
+    else:
+        logger.info(f"이전 가져오기에 이어서 진행합니다: {state['imported']}/{manifest['count']}행")
+    collection = Collection(collection_name)
+
+    fields = manifest["schema"]["fields"]
+    vector_name = vector_field(fields)["name"]
+    # 자동 생성 기본 키는 삽입하지 않음 (새 컬렉션에서 다시 생성)
+    insert_names = [field["name"] for field in fields if not (field["is_primary"] and field["auto_id"])]
+
+    vectors = np.load(os.path.join(directory, VECTORS), mmap_mode="r")
+    throughput = Throughput("가져오기")
+    offset = 0
+    for part in range(manifest["parts"]):
+        table = pq.read_table(_part_path(directory, part))
+        part_rows = table.num_rows
+        if offset + part_rows <= state["imported"]:
+            offset += part_rows
+            continue
+        columns = {name: table.column(name).to_pylist() for name in insert_names if name != vector_name}
+        start = max(state["imported"] - offset, 0)
+        while start < part_rows:
+            end = min(start + batch_size, part_rows)
+            batch_vectors = np.asarray(vectors[offset + start : offset + end], dtype=np.float32)
+            data = [batch_vectors if name == vector_name else columns[name][start:end] for name in insert_names]
+            collection.insert(data)
+            state["imported"] = offset + end
+            write_json(state_path, state)
+            throughput.add(end - start, batch_vectors.nbytes)
+            logger.info(throughput.report(state["imported"], manifest["count"]))
+            start = end
+        offset += part_rows
+    del vectors
+
+    # 모든 행을 삽입한 뒤 한 번만 flush하고 인덱스 생성
+    collection.flush()
+    for index in manifest["schema"]["indexes"]:
+        collection.create_index(index["field_name"], index["params"])
+    utility.wait_for_index_building_complete(collection_name)
+    if load:
+        collection.load()
+
+    state["status"] = "complete"
+    write_json(state_path, state)
+    logger.info(f"가져오기 완료: {directory} → {collection_name} ({state['imported']}행)")
+    return state["imported"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벡터 컬렉션 스냅샷 내보내기/가져오기")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = subparsers.add_parser("export", help="컬렉션을 스냅샷 디렉터리로 내보내기")
+    export_parser.add_argument("directory", help="스냅샷 디렉터리")
+    export_parser.add_argument("--collection", default=settings.COLLECTION_NAME, help="내보낼 컬렉션 이름")
+    export_parser.add_argument("--batch-size", type=int, default=settings.SNAPSHOT_EXPORT_BATCH, help="한 번에 읽을 행 수")
+    export_parser.add_argument("--dtype", choices=["float16", "float32"], default=settings.SNAPSHOT_VECTOR_DTYPE, help="벡터 저장 형식")
+    export_parser.add_argument("--overwrite", action="store_true", help="완료된 스냅샷이 있어도 새로 내보내기")
+
+    import_parser = subparsers.add_parser("import", help="스냅샷을 컬렉션으로 가져오기")
+    import_parser.add_argument("directory", help="스냅샷 디렉터리")
+    import_parser.add_argument("--collection", default=None, help="만들 컬렉션 이름 (기본: 스냅샷의 컬렉션 이름)")
+    import_parser.add_argument("--batch-size", type=int, default=settings.SNAPSHOT_IMPORT_BATCH, help="한 번에 삽입할 행 수")
+    import_parser.add_argument("--drop", action="store_true", help="같은 이름의 컬렉션이 있으면 삭제하고 새로 만들기")
+    import_parser.add_argument("--load", action="store_true", help="가져온 뒤 컬렉션을 메모리에 로드")
+    args = parser.parse_args()
+
+    setup_logging()
+    connect_to_milvus()
+    try:
+        if args.command == "export":
+            export_collection(args.directory, args.collection, batch_size=args.batch_size, dtype=args.dtype, overwrite=args.overwrite)
+        else:
+            import_collection(args.directory, args.collection, batch_size=args.batch_size, drop=args.drop, load=args.load)
+    finally:
+        close_milvus_connection()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import types
+from contextlib import contextmanager
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+chat_socket = pytest.importorskip("services.chat_socket")
+
+
+class FakeWebSocket:
+    """받을 메시지를 대기열로 넣고, 보낸 메시지와 종료 코드를 기록하는 테스트용 WebSocket"""
+
+    def __init__(self, send_delay: float = 0.0):
+        self.incoming: asyncio.Queue = asyncio.Queue()
+        self.sent = []
+        self.closed = None
+        self.send_delay = send_delay
+
+    async def accept(self):
+        pass
+
+    async def receive_text(self):
+        text = await self.incoming.get()
+        if text is None:
+            raise WebSocketDisconnect(1000)
+        return text
+
+    async def send_text(self, text):
+        await asyncio.sleep(self.send_delay)
+        self.sent.append(json.loads(text))
+
+    async def close(self, code=1000, reason=""):
+        if self.closed is None:
+            self.closed = (code, reason)
+
+    def types_sent(self):
+        return [message["type"] for message in self.sent]
+
+
+class FakeChatbot:
+    """응답 토큰과 중간 결과를 세션 이벤트로 보내는 테스트용 챗봇"""
+
+    def __init__(self, tokens=(), retrievals=0, release: asyncio.Event = None):
+        self.tokens = list(tokens)
+        self.retrievals = retrievals
+        self.release = release
+        self.cleared = 0
+        self.on_event = None
+
+    def create_session(self, on_event):
+        self.on_event = on_event
+        return types.SimpleNamespace(id="session-1")
+
+    @contextmanager
+    def use_session(self, session):
+        yield
+
+    def clear_conversation_history(self):
+        self.cleared += 1
+
+    async def get_response(self, message, budget=None):
+        if self.release is not None:
+            await self.release.wait()
+        for index in range(self.retrievals):
+            self.on_event("retrieval", [{"title": str(index)}])
+        for token in self.tokens:
+            self.on_event("token", token)
+            await asyncio.sleep(0)
+        return {"answer": "".join(self.tokens)}
+
+
+async def build_payload(response, graph_format):
+    return {"answer": response["answer"]}
+
+
+async def converse(websocket, chatbot, messages, until=lambda websocket: True, timeout=5.0):
+    # 연결을 열고 메시지를 보낸 뒤 until 조건이 만족되면 연결을 끊음
+    connection = chat_socket.ChatConnection(websocket, chatbot, build_payload, lambda results: results)
+    serving = asyncio.create_task(connection.serve())
+    for message in messages:
+        await websocket.incoming.put(json.dumps(message))
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not serving.done() and not until(websocket):
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError(f"조건을 만족하지 못했습니다: {websocket.sent}")
+        await asyncio.sleep(0.01)
+    await websocket.incoming.put(None)
+    await asyncio.wait_for(serving, timeout)
+
+
+def done_sent(websocket):
+    return "done" in websocket.types_sent()
+
+
+def test_tokens_are_coalesced_for_slow_clients():
+    tokens = [f"{index} " for index in range(200)]
+    websocket = FakeWebSocket(send_delay=0.002)
+
+    asyncio.run(converse(websocket, FakeChatbot(tokens), [{"type": "message", "message": "안녕"}], until=done_sent))
+
+    token_messages = [message["text"] for message in websocket.sent if message["type"] == "token"]
+    assert websocket.sent[0] == {"type": "session", "session_id": "session-1"}
+    assert websocket.sent[-1] == {"type": "done", "answer": "".join(tokens)}
+    assert "".join(token_messages) == "".join(tokens)
+    assert len(token_messages) < len(tokens)
+
+
+def test_send_timeout_closes_slow_consumer(monkeypatch):
+    monkeypatch.setattr(chat_socket.settings, "WS_SEND_TIMEOUT", 0.05)
+    websocket = FakeWebSocket(send_delay=1.0)
+    before = dict(chat_socket._stats)
+
+    asyncio.run(converse(websocket, FakeChatbot(["a"]), [{"type": "message", "message": "안녕"}], until=lambda websocket: False))
+
+    assert websocket.closed == (chat_socket.CLOSE_POLICY_VIOLATION, "slow consumer")
+    assert chat_socket._stats["send_timeouts"] == before["send_timeouts"] + 1
+    assert chat_socket._stats["slow_consumer_closed"] == before["slow_consumer_closed"] + 1
+    assert chat_socket._stats["active"] == before["active"]
+
+
+def test_full_send_queue_closes_connection(monkeypatch):
+    monkeypatch.setattr(chat_socket.settings, "WS_SEND_QUEUE_SIZE", 4)
+    websocket = FakeWebSocket(send_delay=0.5)
+    before = dict(chat_socket._stats)
+
+    asyncio.run(converse(websocket, FakeChatbot(retrievals=10), [{"type": "message", "message": "안녕"}], until=lambda websocket: False))
+
+    assert websocket.closed == (chat_socket.CLOSE_POLICY_VIOLATION, "slow consumer")
+    assert chat_socket._stats["dropped_messages"] > before["dropped_messages"]
+    # 대기열 크기를 넘는 메시지는 보내지 않음
+    assert len(websocket.sent) <= 4
+
+
+def test_second_message_is_rejected_while_busy():
+    async def main():
+        release = asyncio.Event()
+        websocket = FakeWebSocket()
+        chatbot = FakeChatbot(["답변"], release=release)
+        messages = [{"type": "message", "message": "첫 질문"}, {"type": "message", "message": "둘째 질문"}, {"type": "reset"}]
+
+        def rejected_twice(websocket):
+            if websocket.types_sent().count("error") == 2:
+                release.set()
+            return done_sent(websocket)
+
+        await converse(websocket, chatbot, messages, until=rejected_twice)
+        return websocket, chatbot
+
+    websocket, chatbot = asyncio.run(main())
+
+    errors = [message["detail"] for message in websocket.sent if message["type"] == "error"]
+    assert errors[0].startswith("이전 메시지를 처리하는 중입니다.")
+    assert errors[1].startswith("이전 메시지를 처리하는 중에는 대화를 초기화할 수 없습니다.")
+    assert chatbot.cleared == 0
+    assert websocket.sent[-1] == {"type": "done", "answer": "답변"}
+
+
+def test_control_messages_and_invalid_input():
+    websocket = FakeWebSocket()
+    chatbot = FakeChatbot()
+    messages = [{"type": "ping"}, {"type": "reset"}, {"type": "unknown"}, {"type": "message"}]
+
+    async def main():
+        await websocket.incoming.put("not json")
+        await converse(websocket, chatbot, messages, until=lambda websocket: len(websocket.sent) == 6)
+
+    asyncio.run(main())
+
+    assert websocket.types_sent() == ["session", "error", "pong", "reset", "error", "error"]
+    assert chatbot.cleared == 1
+
+
+def test_connections_over_limit_are_rejected(monkeypatch):
+    monkeypatch.setattr(chat_socket.settings, "WS_MAX_CONNECTIONS", 0)
+    websocket = FakeWebSocket()
+
+    asyncio.run(chat_socket.ChatConnection(websocket, FakeChatbot(), build_payload, lambda results: results).serve())
+
+    assert websocket.closed == (chat_socket.CLOSE_TRY_AGAIN_LATER, "too many connections")
+    assert websocket.sent == []
@@ -0,0 +1,57 @@
+import types
+
+import pytest
+
+from utils.chunk_selector import ChunkSelector, split_into_chunks
+
+
+@pytest.fixture
+def make_selector(monkeypatch):
+    # 글자 하나를 토큰 하나로 세는 인코딩 사용 (tiktoken BPE 파일을 내려받지 않도록)
+    monkeypatch.setattr("utils.chunk_selector.tiktoken.encoding_for_model", lambda model: types.SimpleNamespace(encode=list))
+    return lambda token_budget, chunk_chars: ChunkSelector(token_budget=token_budget, chunk_chars=chunk_chars)
+
+
+def test_split_into_chunks_groups_lines_and_splits_long_lines():
+    text = "첫 줄\n\n둘째 줄\n" + "가" * 25 + "\n마지막"
+
+    assert split_into_chunks(text, max_chars=10) == ["첫 줄\n둘째 줄", "가" * 10, "가" * 10, "가" * 5 + "\n마지막"]
+
+
+def test_select_returns_text_unchanged_within_budget(make_selector):
+    selector = make_selector(token_budget=1000, chunk_chars=100)
+    text = "회사 소개\n경제성장률 2020년 3.2%"
+
+    selected, stats = selector.select(text, ["경제성장률"])
+
+    assert selected == text
+    assert stats["reduction"] == 0.0
+    assert stats["selected_chunks"] == stats["total_chunks"] == 1
+
+
+def test_select_keeps_relevant_chunks_in_document_order(make_selector):
+    selector = make_selector(token_budget=80, chunk_chars=40)
+    chunks = [
+        "경제성장률 추이 2019년 2.2% 2020년 -0.7%",
+        "회사 소개 및 오시는 길 안내 페이지입니다 " * 2,
+        "고객센터 운영 시간은 평일 오전부터 오후까지",
+        "경제성장률 2021년 4.3% 2022년 2.6% 전망치",
+        "개인정보 처리방침 이용약관 사이트맵 보기 " * 2,
+    ]
+
+    selected, stats = selector.select("\n".join(chunks), ["경제성장률"])
+
+    assert selected == "\n".join([chunks[0], chunks[3]])
+    assert stats["selected_tokens"] <= 80
+    assert stats["selected_chunks"] == 2
+    assert stats["reduction"] > 0.5
+
+
+def test_select_falls_back_to_document_head_without_relevant_chunks(make_selector):
+    selector = make_selector(token_budget=30, chunk_chars=15)
+    text = "\n".join(["회사 소개 페이지입니다", "오시는 길 안내입니다", "고객센터 운영 안내", "이용약관 및 개인정보"])
+
+    selected, stats = selector.select(text, ["경제성장률"])
+
+    assert selected == "회사 소개 페이지입니다\n오시는 길 안내입니다"
+    assert stats["selected_chunks"] == 2
@@ -0,0 +1,83 @@
+from utils.context_packer import ContextPacker
+
+
+class CharEncoding:
+    """글자 하나를 토큰 하나로 세는 테스트용 인코딩 (tiktoken 인코딩과 같은 encode/decode 인터페이스)"""
+
+    def encode(self, text):
+        return [ord(char) for char in text]
+
+    def decode(self, tokens, errors="strict"):
+        return "".join(chr(token) for token in tokens)
+
+
+def render(item):
+    return f"[{item['title']}] {item['snippet']}"
+
+
+def make_packer(max_tokens=100, min_snippet_tokens=5):
+    return ContextPacker(CharEncoding(), max_tokens=max_tokens, min_snippet_tokens=min_snippet_tokens)
+
+
+def test_pack_orders_by_score_and_keeps_original_order_for_ties():
+    items = [
+        {"title": "a", "snippet": "low", "score": 0.1},
+        {"title": "b", "snippet": "high", "score": 0.9},
+        {"title": "c", "snippet": "none"},
+        {"title": "d", "snippet": "tie", "score": 0.1},
+    ]
+
+    context, stats = make_packer().pack(items, render)
+
+    assert context.split("\n\n") == ["[b] high", "[a] low", "[d] tie", "[c] none"]
+    assert stats["included"] == 4
+    assert stats["truncated"] == 0
+    assert stats["dropped"] == 0
+    assert stats["tokens_saved"] == 0
+
+
+def test_pack_truncates_snippet_to_fit_budget():
+    items = [{"title": "a", "snippet": "x" * 20, "score": 1.0}, {"title": "b", "snippet": "y" * 40, "score": 0.5}]
+
+    context, stats = make_packer(max_tokens=50).pack(items, render)
+
+    first, second = context.split("\n\n")
+    assert first == "[a] " + "x" * 20
+    assert second.startswith("[b] y") and second.endswith("…")
+    assert len(context) <= 50
+    assert stats["packed_tokens"] <= stats["budget"] == 50
+    assert stats["truncated"] == 1
+    assert stats["tokens_saved"] == stats["total_tokens"] - stats["packed_tokens"]
+
+
+def test_pack_drops_item_when_minimum_snippet_does_not_fit():
+    items = [{"title": "a", "snippet": "x" * 40, "score": 1.0}, {"title": "b", "snippet": "y" * 40, "score": 0.5}]
+
+    context, stats = make_packer(max_tokens=50, min_snippet_tokens=10).pack(items, render)
+
+    assert context == "[a] " + "x" * 40
+    assert stats["included"] == 1
+    assert stats["dropped"] == 1
+
+
+def test_pack_respects_reserved_tokens_and_explicit_budget():
+    packer = make_packer(max_tokens=100)
+    items = [{"title": "a", "snippet": "x" * 50}]
+
+    _, reserved = packer.pack(items, render, reserved_tokens=80)
+    _, explicit = packer.pack(items, render, budget=30)
+    _, negative = packer.pack(items, render, reserved_tokens=200)
+
+    assert reserved["budget"] == 20
+    assert explicit["budget"] == 30
+    assert negative["budget"] == 0
+    assert negative["included"] == 0
+
+
+def test_encode_caches_tokens():
+    packer = make_packer()
+
+    first = packer.encode("같은 텍스트")
+
+    assert packer.encode("같은 텍스트") is first
+    assert packer.count_tokens("같은 텍스트") == 6
@@ -0,0 +1,70 @@
+import pytest
+
+from utils.data_extractor import DataExtractor, parse_number
+from utils.page_fetcher import extract_text
+
+
+def extract(html, fields, **kwargs):
+    return DataExtractor(**kwargs).extract(html, extract_text(html), fields)
+
+
+def as_series(records):
+    return {int(record["date"][:4]): record["value"] for record in records}
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [("1,250", 1250.0), ("△0.7", -0.7), ("▼3", -3.0), ("-2.5%", -2.5), ("4.3 %", 4.3), ("12월", None), ("없음", None)],
+)
+def test_parse_number(text, expected):
+    assert parse_number(text) == expected
+
+
+def test_extracts_matching_row_from_year_header_table():
+    html = """<table><tr><th>구분</th><th>2019</th><th>2020</th><th>2021</th></tr>
+        <tr><td>소비자물가 상승률(%)</td><td>0.4</td><td>0.5</td><td>2.5</td></tr>
+        <tr><td>경제성장률(%)</td><td>2.2</td><td>△0.7</td><td>4.3</td></tr></table>"""
+
+    records = extract(html, ["경제성장률"])
+
+    assert as_series(records) == {2019: 2.2, 2020: -0.7, 2021: 4.3}
+    assert records[0] == {"date": "2019-01-01", "value": 2.2, "name": "대한민국", "field": "경제성장률"}
+
+
+def test_extracts_matching_column_from_year_column_table():
+    html = """<table><tr><th>연도</th><th>매출액(억원)</th><th>영업이익(억원)</th></tr>
+        <tr><td>2020년</td><td>1,250</td><td>120</td></tr>
+        <tr><td>2021년</td><td>1,480</td><td>150</td></tr></table>"""
+
+    assert as_series(extract(html, ["영업이익"])) == {2020: 120.0, 2021: 150.0}
+    assert as_series(extract(html, ["매출액"])) == {2020: 1250.0, 2021: 1480.0}
+
+
+def test_extracts_year_value_pattern_from_matching_sentences_only():
+    html = """<p>한국 경제성장률은 2019년 2.2%, 2020년 -0.7%, 2021년 4.3%를 기록했다.</p>
+        <p>2019년 12월 발표된 자료 기준이다.</p><p>같은 기간 실업률은 2019년 3.8%, 2020년 4.0%였다.</p>"""
+
+    assert as_series(extract(html, ["경제성장률"])) == {2019: 2.2, 2020: -0.7, 2021: 4.3}
+
+
+def test_keeps_most_recent_points_up_to_max_points():
+    html = "<p>경제성장률은 2018년 2.9%, 2019년 2.2%, 2020년 -0.7%, 2021년 4.3%였다.</p>"
+
+    assert list(as_series(extract(html, ["경제성장률"], max_points=2))) == [2020, 2021]
+
+
+@pytest.mark.parametrize(
+    "html",
+    [
+        # 필드가 언급되지 않은 본문 수치
+        "<h2>회사 소개</h2><p>2022년 직원 150명</p><p>2023년 직원 200명</p>",
+        # 필드와 일치하는 행이 없는 연도 머리글 표
+        "<table><tr><th>구분</th><th>2021</th><th>2022</th></tr><tr><td>직원 수</td><td>150</td><td>200</td></tr></table>",
+        # 필드와 일치하는 열이 없는 연도 열 표
+        "<table><tr><th>연도</th><th>매출액</th></tr><tr><td>2021</td><td>1,480</td></tr><tr><td>2022</td><td>1,730</td></tr></table>",
+        # 일치하지만 데이터 포인트가 하나뿐인 경우
+        "<p>경제성장률은 2021년 4.3%였다.</p>",
+    ],
+)
+def test_returns_nothing_when_field_does_not_match(html):
+    assert extract(html, ["경제성장률"]) == []
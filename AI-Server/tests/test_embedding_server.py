@@ -0,0 +1,136 @@
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from utils import embedding_server
+from utils.embedding_server import EmbeddingClient, EmbeddingServer, EmbeddingServerError, _pack, _recv_frame
+
+
+class FakeModel:
+    """텍스트 길이와 첫 글자 코드로 2차원 벡터를 만드는 테스트용 모델 (배치 크기 기록)"""
+
+    def __init__(self):
+        self.batches = []
+
+    def encode(self, texts, batch_size, convert_to_numpy):
+        self.batches.append(len(texts))
+        if any(text == "fail" for text in texts):
+            raise RuntimeError("모델 오류")
+        return np.array([[len(text), ord(text[0])] for text in texts], dtype=np.float32)
+
+
+def expected(texts):
+    return np.array([[len(text), ord(text[0])] for text in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def server():
+    with tempfile.TemporaryDirectory() as directory:
+        server = EmbeddingServer(socket_path=os.path.join(directory, "embedding.sock"), max_batch=64, batch_wait=0.05)
+        server.model = FakeModel()
+        loop = asyncio.new_event_loop()
+        task = loop.create_task(server.serve_forever())
+
+        def run():
+            try:
+                loop.run_until_complete(task)
+            except asyncio.CancelledError:
+                pass
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+        for _ in range(100):
+            if os.path.exists(server.socket_path):
+                break
+            time.sleep(0.01)
+        yield server
+        loop.call_soon_threadsafe(task.cancel)
+        thread.join(timeout=5)
+        loop.close()
+
+
+def test_frames_round_trip_and_reject_oversized(monkeypatch):
+    left, right = socket.socketpair()
+    with left, right:
+        left.sendall(_pack(b"hello") + _pack(b""))
+        assert _recv_frame(right) == b"hello"
+        assert _recv_frame(right) == b""
+
+        monkeypatch.setattr(embedding_server, "MAX_FRAME_BYTES", 4)
+        left.sendall(_pack(b"too large"))
+        with pytest.raises(EmbeddingServerError):
+            _recv_frame(right)
+
+
+def test_recv_frame_raises_when_connection_closes_mid_frame():
+    left, right = socket.socketpair()
+    with right:
+        left.sendall(_pack(b"hello")[:6])
+        left.close()
+        with pytest.raises(ConnectionError):
+            _recv_frame(right)
+
+
+def test_client_receives_vectors_in_request_order(server):
+    client = EmbeddingClient(socket_path=server.socket_path, timeout=5.0)
+
+    vectors = client.encode(["가나", "abc", "한국어 문장"])
+    empty = client.encode([])
+
+    np.testing.assert_array_equal(vectors, expected(["가나", "abc", "한국어 문장"]))
+    assert vectors.dtype == np.float32
+    assert empty.shape == (0, embedding_server.settings.EMBEDDING_DIMENSION)
+
+
+def test_concurrent_requests_are_batched(server):
+    client = EmbeddingClient(socket_path=server.socket_path, timeout=5.0)
+    requests = [[f"문장 {i}", f"text {i * 10}"] for i in range(8)]
+
+    # 스레드마다 연결을 하나씩 사용
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(client.encode, requests))
+
+    for texts, vectors in zip(requests, results):
+        np.testing.assert_array_equal(vectors, expected(texts))
+    assert server.stats["requests"] == 8
+    assert server.stats["texts"] == 16
+    assert len(server.model.batches) < 8
+    assert sum(server.model.batches) == 16
+
+
+def test_model_error_is_returned_and_connection_is_reused(server):
+    client = EmbeddingClient(socket_path=server.socket_path, timeout=5.0)
+
+    with pytest.raises(EmbeddingServerError, match="모델 오류"):
+        client.encode(["fail"])
+    sock = client._local.sock
+    vectors = client.encode(["ok"])
+
+    assert client._local.sock is sock
+    np.testing.assert_array_equal(vectors, expected(["ok"]))
+    assert server.stats["errors"] == 1
+
+
+def test_client_reports_unreachable_server():
+    client = EmbeddingClient(socket_path="/nonexistent/embedding.sock", timeout=1.0)
+
+    with pytest.raises(EmbeddingServerError):
+        client.encode(["text"])
+
+
+def test_server_rejects_malformed_request(server):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(5.0)
+        sock.connect(server.socket_path)
+        sock.sendall(_pack(b'{"not_texts": []}'))
+        header = json.loads(_recv_frame(sock))
+
+    assert "error" in header
@@ -0,0 +1,175 @@
+import asyncio
+import time
+
+import pytest
+
+from services.graph_jobs import GraphJobManager, GraphJobStore, JobQueueFull
+from utils.metrics import track_stage
+
+
+def snapshot(job_id, status="queued", **extra):
+    return {"job_id": job_id, "status": status, "query": "q", "stages": [], "result": None, "error": None, **extra}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return GraphJobStore(str(tmp_path / "graph_jobs.db"))
+
+
+async def run_graph(query, options):
+    with track_stage("graph_search"):
+        await asyncio.sleep(0.01)
+    with track_stage("graph_render"):
+        await asyncio.sleep(0.01)
+    return {"query": query, "format": options.get("format")}
+
+
+async def wait_finished(manager, job_id):
+    for _ in range(200):
+        job = await manager.get(job_id)
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError("작업이 끝나지 않았습니다.")
+
+
+def test_identical_requests_are_deduplicated():
+    async def main():
+        manager = GraphJobManager(run_graph, workers=1, max_pending=10, ttl=60)
+        manager.start()
+        try:
+            first = await manager.submit("경제성장률 그래프", {"format": "compact"})
+            same = await manager.submit("경제성장률 그래프", {"format": "compact"})
+            other = await manager.submit("경제성장률 그래프", {"format": "plotly"})
+            finished = await wait_finished(manager, first["job_id"])
+            await wait_finished(manager, other["job_id"])
+            # 끝난 작업은 중복 판단에서 제외되므로 같은 요청도 새로 실행
+            again = await manager.submit("경제성장률 그래프", {"format": "compact"})
+            return first, same, other, finished, again, dict(manager.stats)
+        finally:
+            await manager.stop()
+
+    first, same, other, finished, again, stats = asyncio.run(main())
+
+    assert same == {"job_id": first["job_id"], "status": "queued", "deduplicated": True}
+    assert other["job_id"] != first["job_id"] and not other["deduplicated"]
+    assert again["job_id"] != first["job_id"]
+    assert finished["result"] == {"query": "경제성장률 그래프", "format": "compact"}
+    assert [stage["stage"] for stage in finished["stages"]] == ["graph_search", "graph_render"]
+    assert stats["deduplicated"] == 1
+
+
+def test_full_queue_rejects_new_jobs():
+    async def main():
+        release = asyncio.Event()
+
+        async def blocked(query, options):
+            await release.wait()
+            return {}
+
+        manager = GraphJobManager(blocked, workers=1, max_pending=1, ttl=60)
+        manager.start()
+        try:
+            await manager.submit("첫 번째", {})
+            await asyncio.sleep(0.01)  # 첫 작업이 워커에서 실행될 때까지 대기
+            await manager.submit("두 번째", {})
+            with pytest.raises(JobQueueFull):
+                await manager.submit("세 번째", {})
+            release.set()
+            return dict(manager.stats)
+        finally:
+            await manager.stop()
+
+    assert asyncio.run(main())["rejected"] == 1
+
+
+def test_failed_job_records_error_and_events_end_with_done():
+    async def failing(query, options):
+        with track_stage("graph_search"):
+            pass
+        raise ValueError("데이터 추출에 실패했습니다.")
+
+    async def main():
+        manager = GraphJobManager(failing, workers=1, max_pending=10, ttl=60)
+        manager.start()
+        try:
+            submitted = await manager.submit("q", {})
+            return [event async for event in manager.events(submitted["job_id"])]
+        finally:
+            await manager.stop()
+
+    events = asyncio.run(main())
+
+    assert events[-1]["event"] == "done"
+    assert events[-1]["data"]["status"] == "failed"
+    assert events[-1]["data"]["error"] == "데이터 추출에 실패했습니다."
+    assert {"event": "stage", "data": {"stage": "graph_search", "ms": events[-1]["data"]["stages"][0]["ms"]}} in events
+
+
+def test_shared_store_deduplicates_across_workers(store):
+    async def main():
+        release = asyncio.Event()
+
+        async def blocked(query, options):
+            await release.wait()
+            return {"ok": True}
+
+        owner = GraphJobManager(blocked, workers=1, max_pending=10, ttl=60, store=store)
+        other = GraphJobManager(blocked, workers=1, max_pending=10, ttl=60, store=store)
+        owner.start()
+        other.start()
+        try:
+            submitted = await owner.submit("q", {})
+            deduplicated = await other.submit("q", {})
+            release.set()
+            await wait_finished(owner, submitted["job_id"])
+            # 작업을 실행하지 않은 워커도 저장소에서 결과를 조회
+            return submitted, deduplicated, await other.get(submitted["job_id"])
+        finally:
+            await owner.stop()
+            await other.stop()
+
+    submitted, deduplicated, loaded = asyncio.run(main())
+
+    assert deduplicated["job_id"] == submitted["job_id"]
+    assert deduplicated["deduplicated"] is True
+    assert loaded["status"] == "succeeded"
+    assert loaded["result"] == {"ok": True}
+
+
+def test_store_marks_unresponsive_jobs_failed(store):
+    store.save(snapshot("stale"), "key", expires_at=None)
+    updated_at = time.time()
+
+    assert store.load("stale", stale_before=updated_at - 10)["status"] == "queued"
+    failed = store.load("stale", stale_before=updated_at + 10)
+    assert failed["status"] == "failed"
+    assert failed["error"] == "작업을 실행하던 워커가 응답하지 않습니다."
+    assert store.find_active("key", updated_after=updated_at - 10) == ("stale", "queued")
+    assert store.find_active("key", updated_after=updated_at + 10) is None
+
+
+def test_store_touch_keeps_active_jobs_alive(store):
+    store.save(snapshot("active", status="running"), "key", expires_at=None)
+    store.save(snapshot("done", status="succeeded"), "other", expires_at=time.time() + 60)
+    later = time.time() + 100
+
+    store.touch(["active", "done"], later)
+
+    assert store.find_active("key", updated_after=later - 1) == ("active", "running")
+    # 끝난 작업은 갱신하지 않음
+    assert store._db.execute("SELECT updated_at FROM graph_jobs WHERE id = 'done'").fetchone()[0] < later
+
+
+def test_store_expires_finished_jobs_and_purges_stale_ones(store):
+    now = time.time()
+    store.save(snapshot("expired", status="succeeded"), "a", expires_at=now - 1)
+    store.save(snapshot("kept", status="succeeded"), "b", expires_at=now + 60)
+    store.save(snapshot("stale", status="running"), "c", expires_at=None)
+    store.save(snapshot("alive", status="running"), "d", expires_at=None)
+    store._db.execute("UPDATE graph_jobs SET updated_at = ? WHERE id = 'stale'", (now - 1000,))
+    store._db.commit()
+
+    assert store.load("expired") is None
+    assert store.purge(now, stale_before=now - 500) == 2
+    assert [row[0] for row in store._db.execute("SELECT id FROM graph_jobs ORDER BY id")] == ["alive", "kept"]
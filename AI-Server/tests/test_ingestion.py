@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("pymilvus")
+
+from utils import ingestion  # noqa: E402
+from utils.ingestion import IngestionPipeline, IngestRegistry  # noqa: E402
+
+
+class FakeVectorStore:
+    """삭제/삽입 호출 순서를 기록하는 테스트용 벡터 저장소"""
+
+    def __init__(self):
+        self.calls = []
+        self.rows = {}
+
+    def delete_by_url(self, url):
+        self.calls.append(("delete", url))
+        return len(self.rows.pop(url, []))
+
+    def add_embeddings(self, texts, embeddings, urls):
+        self.calls.append(("add", urls[0], len(texts)))
+        for text, url in zip(texts, urls):
+            self.rows.setdefault(url, []).append(text)
+
+
+class FakePageFetcher:
+    def __init__(self, pages):
+        self.pages = pages
+
+    async def fetch(self, url):
+        text = self.pages.get(url)
+        return {"url": url, "html": "", "text": text} if text else None
+
+
+@pytest.fixture
+def make_pipeline(monkeypatch, tmp_path):
+    monkeypatch.setattr(ingestion, "get_embeddings", lambda chunks, batch_size: [[0.0] for _ in chunks])
+    monkeypatch.setattr(ingestion.settings, "INGEST_CHUNK_CHARS", 20)
+    monkeypatch.setattr(ingestion.settings, "INGEST_MIN_CHUNK_CHARS", 1)
+
+    def make(vector_store, pages, registry_name="registry.db"):
+        pipeline = IngestionPipeline(vector_store, seed_queries=[], seed_urls=list(pages), registry=IngestRegistry(str(tmp_path / registry_name)))
+        pipeline.page_fetcher = FakePageFetcher(pages)
+        return pipeline
+
+    return make
+
+
+def test_unchanged_page_is_skipped(make_pipeline):
+    store = FakeVectorStore()
+    pipeline = make_pipeline(store, {"https://example.com/a": "첫 문단\n둘째 문단"})
+
+    first = asyncio.run(pipeline.run_once())
+    second = asyncio.run(pipeline.run_once())
+
+    assert first["ingested"] == 1 and first["chunks"] == 1
+    assert second["unchanged"] == 1
+    assert store.calls == [("delete", "https://example.com/a"), ("add", "https://example.com/a", 1)]
+
+
+def test_changed_page_replaces_previous_chunks(make_pipeline):
+    store = FakeVectorStore()
+    pages = {"https://example.com/a": "첫 문단\n둘째 문단"}
+    pipeline = make_pipeline(store, pages)
+
+    asyncio.run(pipeline.run_once())
+    pages["https://example.com/a"] = "바뀐 문단 하나\n바뀐 문단 둘\n바뀐 문단 셋"
+    stats = asyncio.run(pipeline.run_once())
+
+    assert stats["ingested"] == 1
+    assert store.rows["https://example.com/a"] == ["바뀐 문단 하나\n바뀐 문단 둘", "바뀐 문단 셋"]
+
+
+def test_lost_registry_does_not_duplicate_chunks(make_pipeline):
+    store = FakeVectorStore()
+    pages = {"https://example.com/a": "첫 문단\n둘째 문단"}
+
+    asyncio.run(make_pipeline(store, pages, registry_name="first.db").run_once())
+    # 해시 기록 전에 중단되었거나 레지스트리 파일을 잃은 경우
+    asyncio.run(make_pipeline(store, pages, registry_name="second.db").run_once())
+
+    assert store.rows["https://example.com/a"] == ["첫 문단\n둘째 문단"]
+    assert [call[0] for call in store.calls] == ["delete", "add", "delete", "add"]
+
+
+def test_failed_fetch_is_counted(make_pipeline):
+    store = FakeVectorStore()
+    pipeline = make_pipeline(store, {"https://example.com/a": "본문", "https://example.com/missing": ""})
+
+    stats = asyncio.run(pipeline.run_once())
+
+    assert stats == {"pages": 2, "ingested": 1, "unchanged": 0, "failed": 1, "chunks": 1}
@@ -0,0 +1,205 @@
+import copy
+import re
+import types
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pymilvus")
+
+import migrate_collection  # noqa: E402
+from snapshot_collection import read_json  # noqa: E402
+
+DIM = 4
+DESCRIPTION = {
+    "description": "",
+    "fields": [
+        {"name": "id", "dtype": "INT64", "is_primary": True, "auto_id": False, "params": {}},
+        {"name": "content", "dtype": "VARCHAR", "is_primary": False, "auto_id": False, "params": {"max_length": 1000}},
+        {"name": "embedding", "dtype": "FLOAT_VECTOR", "is_primary": False, "auto_id": False, "params": {"dim": 8}},
+    ],
+    "indexes": [],
+}
+
+
+class FakeCollection:
+    """기본 키 순서로 행을 읽고 삽입/flush/인덱스 호출을 기록하는 테스트용 컬렉션"""
+
+    def __init__(self, name):
+        self.name = name
+        self.rows = []
+        self.indexes = []
+        self.flushed = False
+        self.loaded = False
+
+    @property
+    def num_entities(self):
+        return len(self.rows)
+
+    def query_iterator(self, batch_size, expr, output_fields):
+        match = re.fullmatch(r"id > (\d+)", expr)
+        after = int(match.group(1)) if match else None
+        rows = sorted((row for row in self.rows if after is None or row["id"] > after), key=lambda row: row["id"])
+        pages = [[{name: row[name] for name in output_fields} for row in rows[i : i + batch_size]] for i in range(0, len(rows), batch_size)]
+        return types.SimpleNamespace(next=lambda: pages.pop(0) if pages else [], close=lambda: None)
+
+    def insert(self, columns):
+        ids, contents, vectors = columns
+        self.rows.extend({"id": pk, "content": content, "embedding": vector} for pk, content, vector in zip(ids, contents, vectors))
+
+    def flush(self):
+        self.flushed = True
+
+    def create_index(self, field_name, params):
+        self.indexes.append((field_name, params))
+
+    def load(self):
+        self.loaded = True
+
+
+class FakeMilvus:
+    """컬렉션과 별칭을 메모리에 유지하는 테스트용 Milvus"""
+
+    def __init__(self):
+        self.collections = {}
+        self.aliases = {}
+        self.fail_swap = False
+
+    def add_rows(self, name, ids):
+        collection = self.collections.setdefault(name, FakeCollection(name))
+        collection.rows.extend({"id": pk, "content": f"문서 {pk}", "embedding": [0.0] * 8} for pk in ids)
+
+    def collection(self, name, schema=None):
+        name = self.aliases.get(name, name)
+        if schema is not None:
+            self.collections[name] = FakeCollection(name)
+        return self.collections[name]
+
+    def rename_collection(self, old, new):
+        collection = self.collections.pop(old)
+        collection.name = new
+        self.collections[new] = collection
+
+    def swap_alias(self, alias, name):
+        if self.fail_swap:
+            raise RuntimeError("별칭 교체 실패")
+        previous = self.aliases.get(alias)
+        self.aliases[alias] = name
+        return previous
+
+
+class FakeEmbedder:
+    """배치마다 고정 벡터를 반환하고, fail_after번 호출된 뒤에는 실패하는 테스트용 임베딩"""
+
+    calls = 0
+    fail_after = None
+
+    def __init__(self, model_name, workers):
+        self.workers = workers
+
+    def __call__(self, batches):
+        if FakeEmbedder.fail_after is not None and FakeEmbedder.calls >= FakeEmbedder.fail_after:
+            raise RuntimeError("임베딩 중단")
+        FakeEmbedder.calls += 1
+        return [np.ones((len(texts), DIM), dtype=np.float32) for texts in batches]
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def milvus(monkeypatch, tmp_path):
+    milvus = FakeMilvus()
+    monkeypatch.setattr(FakeEmbedder, "calls", 0)
+    monkeypatch.setattr(FakeEmbedder, "fail_after", None)
+    monkeypatch.setattr(migrate_collection.settings, "MIGRATION_STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(migrate_collection, "Embedder", FakeEmbedder)
+    monkeypatch.setattr(migrate_collection, "Collection", milvus.collection)
+    monkeypatch.setattr(migrate_collection, "describe_collection", lambda collection: copy.deepcopy(DESCRIPTION))
+    monkeypatch.setattr(migrate_collection, "build_schema", lambda description: description)
+    monkeypatch.setattr(migrate_collection, "get_alias_target", milvus.aliases.get)
+    monkeypatch.setattr(migrate_collection, "swap_alias", milvus.swap_alias)
+    monkeypatch.setattr(
+        migrate_collection,
+        "utility",
+        types.SimpleNamespace(
+            list_collections=lambda: list(milvus.collections),
+            has_collection=lambda name: name in milvus.collections,
+            rename_collection=milvus.rename_collection,
+            wait_for_index_building_complete=lambda name: None,
+        ),
+    )
+    milvus.add_rows("docs", range(1, 11))
+    return milvus
+
+
+def migrate(**kwargs):
+    return migrate_collection.migrate("docs", "new-model", DIM, {"index_type": "HNSW"}, batch_size=3, workers=1, **kwargs)
+
+
+def ids(collection):
+    return [row["id"] for row in collection.rows]
+
+
+def test_interrupted_migration_resumes_from_last_pk(milvus, tmp_path):
+    FakeEmbedder.fail_after = 2
+    with pytest.raises(RuntimeError, match="임베딩 중단"):
+        migrate()
+
+    state = read_json(str(tmp_path / "docs.json"))
+    assert (state["status"], state["migrated"], state["last_pk"], state["target"]) == ("copying", 6, 6, "docs_v2")
+    assert ids(milvus.collections["docs_v2"]) == [1, 2, 3, 4, 5, 6]
+
+    FakeEmbedder.fail_after = None
+    state = migrate()
+
+    target = milvus.collections["docs_v2"]
+    assert ids(target) == list(range(1, 11))
+    assert target.rows[0]["embedding"].shape == (DIM,)
+    assert target.flushed and target.loaded
+    assert target.indexes == [("embedding", {"index_type": "HNSW"})]
+    assert (state["status"], state["migrated"], state["previous"]) == ("complete", 10, "docs_v1")
+    # 첫 마이그레이션은 기존 컬렉션 이름을 바꾸고 같은 이름의 별칭을 생성
+    assert milvus.aliases == {"docs": "docs_v2"}
+    assert ids(milvus.collections["docs_v1"]) == list(range(1, 11))
+
+
+def test_changed_plan_starts_new_migration(milvus):
+    FakeEmbedder.fail_after = 1
+    with pytest.raises(RuntimeError):
+        migrate()
+
+    FakeEmbedder.fail_after = None
+    state = migrate_collection.migrate("docs", "other-model", DIM, {"index_type": "HNSW"}, batch_size=3, workers=1)
+
+    assert state["target"] == "docs_v3"
+    assert ids(milvus.collections["docs_v3"]) == list(range(1, 11))
+
+
+def test_no_swap_then_swap_to_copies_new_rows(milvus, tmp_path):
+    state = migrate(swap=False)
+
+    assert state["status"] == "indexed"
+    assert milvus.aliases == {}
+
+    # 준비한 뒤 교체하기 전까지 기존 컬렉션에 추가된 행
+    milvus.add_rows("docs", [11, 12])
+    previous = migrate_collection.swap_to("docs", "docs_v2", batch_size=3, workers=1)
+
+    assert previous == "docs_v1"
+    assert ids(milvus.collections["docs_v2"]) == list(range(1, 13))
+    assert read_json(str(tmp_path / "docs.json"))["status"] == "complete"
+    assert milvus.aliases == {"docs": "docs_v2"}
+
+    # 완료된 뒤에는 별칭만 되돌림
+    assert migrate_collection.swap_to("docs", "docs_v1") == "docs_v2"
+    assert milvus.aliases == {"docs": "docs_v1"}
+
+
+def test_failed_first_swap_restores_collection_name(milvus):
+    milvus.fail_swap = True
+
+    with pytest.raises(RuntimeError, match="별칭 교체 실패"):
+        migrate_collection._swap("docs", "docs_v2")
+
+    assert "docs" in milvus.collections and "docs_v1" not in milvus.collections
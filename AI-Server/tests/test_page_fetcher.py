@@ -0,0 +1,138 @@
+import asyncio
+
+from aiohttp import web
+
+from utils.http_client import close_http_session
+from utils.page_fetcher import PageFetcher, extract_text
+
+
+def make_fetcher(**kwargs):
+    options = {"max_bytes": 1024, "connect_timeout": 1.0, "read_timeout": 1.0, "total_timeout": 2.0, "cache_ttl": 60.0, "cache_max_chars": 10_000}
+    options.update(kwargs)
+    return PageFetcher(**options)
+
+
+def make_page(url, text="본문"):
+    return {"url": url, "content_type": "text/html", "html": f"<p>{text}</p>", "text": text, "truncated": False}
+
+
+async def serve(routes, callback):
+    # 로컬 HTTP 서버를 띄워 callback(base_url)을 실행
+    app = web.Application()
+    app.add_routes(routes)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        return await callback(f"http://127.0.0.1:{port}")
+    finally:
+        await close_http_session()
+        await runner.cleanup()
+
+
+def test_extract_text_drops_boilerplate():
+    html = "<html><head><style>p{}</style><script>var a=1;</script></head><body><nav>메뉴</nav><h1>제목</h1><p>첫 줄&nbsp;&nbsp;내용</p><footer>저작권</footer></body></html>"
+
+    assert extract_text(html) == "제목\n첫 줄 내용"
+
+
+def test_fetch_caches_pages_and_coalesces_concurrent_requests():
+    fetcher = make_fetcher()
+    downloads = []
+
+    async def download(url):
+        downloads.append(url)
+        await asyncio.sleep(0.01)
+        return make_page(url)
+
+    fetcher._download = download
+
+    async def main():
+        pages = await asyncio.gather(*(fetcher.fetch("https://example.com/a") for _ in range(3)))
+        return pages, await fetcher.fetch("https://example.com/a")
+
+    pages, cached = asyncio.run(main())
+
+    assert downloads == ["https://example.com/a"]
+    assert all(page is pages[0] for page in pages)
+    assert cached is pages[0]
+    assert fetcher.stats["hits"] == 1
+    assert fetcher.stats["misses"] == 3
+
+
+def test_failed_fetch_is_not_cached():
+    fetcher = make_fetcher()
+    downloads = []
+
+    async def download(url):
+        downloads.append(url)
+        return None
+
+    fetcher._download = download
+
+    async def main():
+        return await fetcher.fetch("https://example.com/missing"), await fetcher.fetch("https://example.com/missing")
+
+    assert asyncio.run(main()) == (None, None)
+    assert len(downloads) == 2
+    assert fetcher.stats["failures"] == 2
+
+
+def test_page_larger_than_cache_is_not_cached():
+    fetcher = make_fetcher(cache_max_chars=10)
+    downloads = []
+
+    async def download(url):
+        downloads.append(url)
+        return make_page(url, text="긴 본문 " * 10)
+
+    fetcher._download = download
+
+    async def main():
+        await fetcher.fetch("https://example.com/large")
+        await fetcher.fetch("https://example.com/large")
+
+    asyncio.run(main())
+
+    assert len(downloads) == 2
+    assert len(fetcher.cache) == 0
+
+
+def test_download_truncates_body_at_max_bytes():
+    fetcher = make_fetcher(max_bytes=1000)
+
+    async def large(request):
+        return web.Response(text="<p>" + "a" * 5000 + "</p>", content_type="text/html")
+
+    page = asyncio.run(serve([web.get("/large", large)], lambda base: fetcher._download(f"{base}/large")))
+
+    assert page["truncated"] is True
+    assert page["html"] == "<p>" + "a" * 997
+    assert page["text"] == "a" * 997
+    assert fetcher.stats["truncated"] == 1
+
+
+def test_download_uses_meta_charset_and_skips_unsupported_types():
+    fetcher = make_fetcher()
+    euc_kr = '<html><head><meta charset="euc-kr"></head><body><p>경제성장률</p></body></html>'.encode("euc-kr")
+
+    async def korean(request):
+        return web.Response(body=euc_kr, headers={"Content-Type": "text/html"})
+
+    async def pdf(request):
+        return web.Response(body=b"%PDF-1.4", content_type="application/pdf")
+
+    async def missing(request):
+        return web.Response(status=404)
+
+    async def main(base):
+        return await fetcher._download(f"{base}/korean"), await fetcher._download(f"{base}/pdf"), await fetcher._download(f"{base}/missing")
+
+    page, unsupported, not_found = asyncio.run(serve([web.get("/korean", korean), web.get("/pdf", pdf), web.get("/missing", missing)], main))
+
+    assert page["text"] == "경제성장률"
+    assert page["truncated"] is False
+    assert unsupported is None
+    assert not_found is None
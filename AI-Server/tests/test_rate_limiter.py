@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from utils.deadline import deadline_scope
+from utils.rate_limiter import RateLimiter, RateLimitTimeout, TokenBucket, estimate_tokens
+
+
+class UpstreamError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def make_limiter(**kwargs):
+    options = {"requests_per_minute": 600, "max_concurrency": 4, "queue_timeout": 1.0, "max_retries": 2, "backoff_base": 0.0, "backoff_max": 0.0}
+    options.update(kwargs)
+    return RateLimiter("test", **options)
+
+
+def test_token_bucket_consumes_and_reports_wait():
+    bucket = TokenBucket(per_minute=60)
+
+    assert bucket.try_consume(60) == 0.0
+    # 초당 1토큰이 채워지므로 빈 버킷에서 토큰 2개는 약 2초를 기다려야 함
+    assert bucket.try_consume(2) == pytest.approx(2.0, abs=0.05)
+    # 용량보다 큰 요청은 용량으로 제한
+    assert TokenBucket(per_minute=10).try_consume(100) == 0.0
+
+
+def test_run_retries_retryable_status_then_succeeds():
+    limiter = make_limiter()
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise UpstreamError(429)
+        return "ok"
+
+    assert asyncio.run(limiter.run(flaky, tokens=10)) == "ok"
+    assert len(calls) == 3
+    assert limiter.stats["retries"] == 2
+    assert limiter.stats["requests"] == 3
+    assert limiter.stats["tokens"] == 30
+    assert limiter.stats["failures"] == 0
+
+
+def test_run_does_not_retry_other_errors():
+    limiter = make_limiter()
+    calls = []
+
+    async def bad_request():
+        calls.append(1)
+        raise UpstreamError(400)
+
+    with pytest.raises(UpstreamError):
+        asyncio.run(limiter.run(bad_request))
+    assert len(calls) == 1
+    assert limiter.stats["failures"] == 1
+
+
+def test_run_gives_up_after_max_retries():
+    limiter = make_limiter(max_retries=1)
+
+    async def unavailable():
+        raise UpstreamError(503)
+
+    with pytest.raises(UpstreamError):
+        asyncio.run(limiter.run(unavailable))
+    assert limiter.stats["retries"] == 1
+    assert limiter.stats["failures"] == 1
+
+
+def test_run_rejects_when_request_budget_exhausted():
+    limiter = make_limiter(requests_per_minute=1, queue_timeout=0.1)
+
+    async def call():
+        return "ok"
+
+    async def main():
+        assert await limiter.run(call) == "ok"
+        # 다음 요청 토큰은 약 60초 뒤에 채워지므로 대기열 제한 시간 안에 실행할 수 없음
+        with pytest.raises(RateLimitTimeout):
+            await limiter.run(call)
+
+    asyncio.run(main())
+    assert limiter.stats["rejected"] == 1
+
+
+def test_run_limits_concurrency():
+    limiter = make_limiter(max_concurrency=1, queue_timeout=0.05)
+
+    async def quick():
+        return "quick"
+
+    async def main():
+        release = asyncio.Event()
+
+        async def hold():
+            await release.wait()
+            return "held"
+
+        holder = asyncio.create_task(limiter.run(hold))
+        await asyncio.sleep(0)
+        with pytest.raises(RateLimitTimeout):
+            await limiter.run(quick)
+        release.set()
+        assert await holder == "held"
+        assert await limiter.run(quick) == "quick"
+
+    asyncio.run(main())
+
+
+def test_queue_wait_is_capped_by_request_deadline():
+    limiter = make_limiter(requests_per_minute=1, queue_timeout=30.0)
+
+    async def call():
+        return "ok"
+
+    async def main():
+        await limiter.run(call)
+        with deadline_scope(0.05):
+            with pytest.raises(RateLimitTimeout):
+                await limiter.run(call)
+
+    asyncio.run(main())
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("abc", "", None, "de", completion_tokens=10) == 15
@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+from utils.search_cache import SearchCache
+
+
+class Fetcher:
+    """호출 횟수를 세고 호출할 때마다 다른 결과를 반환하는 테스트용 fetch 함수"""
+
+    def __init__(self, result=True):
+        self.calls = 0
+        self.result = result
+
+    async def __call__(self):
+        self.calls += 1
+        return {"organic": [{"link": f"https://example.com/{self.calls}"}]} if self.result else None
+
+
+def test_fresh_hit_does_not_fetch_again():
+    cache = SearchCache(ttl=60, stale_ttl=60, path="")
+    fetch = Fetcher()
+
+    async def main():
+        return await cache.get_or_fetch("key", fetch), await cache.get_or_fetch("key", fetch)
+
+    first, second = asyncio.run(main())
+
+    assert first == second
+    assert fetch.calls == 1
+    assert cache.stats["misses"] == 1
+    assert cache.stats["hits"] == 1
+
+
+def test_empty_result_is_not_cached():
+    cache = SearchCache(ttl=60, stale_ttl=60, path="")
+    fetch = Fetcher(result=False)
+
+    async def main():
+        return await cache.get_or_fetch("key", fetch), await cache.get_or_fetch("key", fetch)
+
+    assert asyncio.run(main()) == (None, None)
+    assert fetch.calls == 2
+
+
+def test_stale_entry_is_returned_and_refreshed_in_background():
+    cache = SearchCache(ttl=60, stale_ttl=60, path="")
+    fetch = Fetcher()
+    stale_value = {"organic": [{"link": "https://example.com/old"}]}
+    cache.memory["key"] = (stale_value, time.time() - 90)
+
+    async def main():
+        value = await cache.get_or_fetch("key", fetch)
+        # 같은 키의 갱신은 동시에 하나만 실행
+        await cache.get_or_fetch("key", fetch)
+        await asyncio.gather(*cache._background_tasks)
+        return value, await cache.get_or_fetch("key", fetch)
+
+    stale, refreshed = asyncio.run(main())
+
+    assert stale == stale_value
+    assert refreshed == {"organic": [{"link": "https://example.com/1"}]}
+    assert fetch.calls == 1
+    assert cache.stats["stale_hits"] == 2
+    assert cache.stats["refreshes"] == 1
+    assert cache.stats["hits"] == 1
+
+
+def test_expired_entry_is_fetched_synchronously():
+    cache = SearchCache(ttl=60, stale_ttl=60, path="")
+    fetch = Fetcher()
+    cache.memory["key"] = ({"organic": []}, time.time() - 200)
+
+    value = asyncio.run(cache.get_or_fetch("key", fetch))
+
+    assert value == {"organic": [{"link": "https://example.com/1"}]}
+    assert cache.stats["misses"] == 1
+
+
+def test_disk_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "search_cache.db")
+    fetch = Fetcher()
+
+    first = SearchCache(ttl=60, stale_ttl=60, path=path)
+    stored = asyncio.run(first.get_or_fetch("key", fetch))
+    # 재시작했거나 다른 워커인 경우 메모리 캐시는 비어 있지만 디스크 캐시에서 찾음
+    second = SearchCache(ttl=60, stale_ttl=60, path=path)
+    loaded = asyncio.run(second.get_or_fetch("key", fetch))
+
+    assert loaded == stored
+    assert fetch.calls == 1
+    assert second.stats["disk_hits"] == 1
+    assert second.stats["hits"] == 1
+
+
+def test_get_stats_reports_hit_rate():
+    cache = SearchCache(ttl=60, stale_ttl=60, path="")
+    fetch = Fetcher()
+
+    async def main():
+        for _ in range(4):
+            await cache.get_or_fetch("key", fetch)
+
+    asyncio.run(main())
+
+    stats = cache.get_stats()
+    assert stats["hit_rate"] == 0.75
+    assert stats["size"] == 1
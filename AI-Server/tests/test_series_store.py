@@ -0,0 +1,87 @@
+import time
+
+import pytest
+
+from utils.series_store import SeriesStore, normalize_key_part, normalize_source
+
+
+def records(points, field="경제성장률", name="대한민국"):
+    return [{"date": f"{year}-01-01", "value": value, "name": name, "field": field} for year, value in points.items()]
+
+
+def as_series(records):
+    return {int(record["date"][:4]): record["value"] for record in records}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SeriesStore(path=str(tmp_path / "series.db"), ttl=3600)
+
+
+def test_normalize_key_parts():
+    assert normalize_key_part(" 경제 성장률 (%) ") == "경제성장률"
+    assert normalize_source("https://www.kosis.kr/statHtml?id=1") == "kosis.kr"
+    assert normalize_source("kosis.kr") == "kosis.kr"
+    assert normalize_source("www.bok.or.kr/portal") == "bok.or.kr"
+
+
+def test_save_merges_new_years_and_updates_existing(store):
+    store.save(records({2019: 2.2, 2020: -0.7}), "https://kosis.kr/a")
+
+    merged = store.save(records({2020: -0.8, 2021: 4.3}, field="경제 성장률 (%)"), "https://www.kosis.kr/b")
+
+    assert as_series(merged) == {2019: 2.2, 2020: -0.8, 2021: 4.3}
+    assert merged[0]["field"] == "경제 성장률 (%)"
+    assert len(store.list_series()) == 1
+
+
+def test_get_fresh_filters_by_entity_and_source(store):
+    store.save(records({2019: 2.2, 2020: -0.7}), "https://kosis.kr/a")
+    store.save(records({2019: 2.0, 2020: -1.0}), "https://bok.or.kr/b")
+    store.save(records({2019: 1.5, 2020: 2.0}, name="미국"), "https://kosis.kr/a")
+
+    assert store.get_fresh("경제성장률", source="kosis.kr")["records"] == records({2019: 2.2, 2020: -0.7})
+    assert store.get_fresh("경제성장률", source="https://www.bok.or.kr/x")["url"] == "https://bok.or.kr/b"
+    assert store.get_fresh("경제성장률")["source"] == "bok.or.kr"
+    assert as_series(store.get_fresh("경제성장률", entity="미국")["records"]) == {2019: 1.5, 2020: 2.0}
+    assert store.get_fresh("경제성장률", source="example.com") is None
+    assert store.get_fresh("물가상승률") is None
+
+
+def test_get_fresh_ignores_expired_and_single_point_series(store):
+    store.save(records({2021: 4.3}), "https://kosis.kr/a")
+    store.save(records({2019: 2.2, 2020: -0.7}, field="실업률"), "https://kosis.kr/a")
+    store._db.execute("UPDATE series SET updated_at = ? WHERE field = ?", (time.time() - 7200, "실업률"))
+    store._db.commit()
+
+    assert store.get_fresh("경제성장률") is None
+    assert store.get_fresh("실업률") is None
+    assert store.stats["misses"] == 2
+
+
+def test_invalidate_removes_matching_series_and_points(store):
+    store.save(records({2019: 2.2, 2020: -0.7}), "https://kosis.kr/a")
+    store.save(records({2019: 2.0, 2020: -1.0}), "https://bok.or.kr/b")
+    store.save(records({2019: 0.4, 2020: 0.5}, field="물가상승률"), "https://kosis.kr/a")
+
+    assert store.invalidate(field="경제 성장률", source="https://www.kosis.kr/") == 1
+    assert store.get_fresh("경제성장률")["source"] == "bok.or.kr"
+    assert store.invalidate(source="kosis.kr") == 1
+    assert [series["field"] for series in store.list_series()] == ["경제성장률"]
+    assert store._db.execute("SELECT COUNT(*) FROM series_points").fetchone()[0] == 2
+    with pytest.raises(ValueError):
+        store.invalidate()
+
+
+def test_graph_generator_stores_only_verified_series():
+    pytest.importorskip("langchain_openai")
+    from utils.graph_generator import GraphGenerator
+
+    assert GraphGenerator._is_storable(records({2020: -0.7, 2021: 4.3}), ["경제성장률"])
+    # 요청 필드와 다른 필드, 연도 1개, 잘못된 날짜, 범위를 벗어난 연도, 유한하지 않은 값은 저장하지 않음
+    assert not GraphGenerator._is_storable(records({2020: -0.7, 2021: 4.3}, field="물가상승률"), ["경제성장률"])
+    assert not GraphGenerator._is_storable(records({2021: 4.3}), ["경제성장률"])
+    assert not GraphGenerator._is_storable([{"date": "2021년-01-01", "value": 4.3, "name": "대한민국", "field": "경제성장률"}] * 2, ["경제성장률"])
+    assert not GraphGenerator._is_storable(records({1850: 1.0, 2021: 4.3}), ["경제성장률"])
+    assert not GraphGenerator._is_storable(records({2020: float("nan"), 2021: 4.3}), ["경제성장률"])
+    assert not GraphGenerator._is_storable(records({2020: -0.7, 2021: 4.3}), [])
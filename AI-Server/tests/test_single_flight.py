@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from utils.deadline import DeadlineExceeded, current_deadline, deadline_scope
+from utils.metrics import stage_listener, track_stage
+from utils.single_flight import SingleFlight, make_key
+
+
+def test_make_key_normalizes_whitespace_only():
+    assert make_key("  삼성 전자\n주가 ") == make_key("삼성 전자 주가")
+    assert make_key("Apple") != make_key("apple")
+    assert make_key("search", ["a", 1]) == make_key("search", ["a", 1])
+    assert make_key("search", 10) != make_key("search", 20)
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"value": 42}
+
+    async def main():
+        return await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats == {"executed": 1, "coalesced": 4}
+    assert flight._inflight == {}
+
+
+def test_results_are_not_cached_after_completion():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def work():
+        calls.append(1)
+        return len(calls)
+
+    async def main():
+        return await flight.do("key", work), await flight.do("key", work), await flight.do("other", work)
+
+    assert asyncio.run(main()) == (1, 2, 3)
+    assert flight.stats["coalesced"] == 0
+
+
+def test_error_is_shared_by_all_callers():
+    flight = SingleFlight("test")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream failed")
+
+    async def main():
+        return await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert [type(result) for result in results] == [ValueError, ValueError]
+    assert flight._inflight == {}
+
+
+def test_caller_deadline_applies_only_to_that_caller():
+    flight = SingleFlight("test")
+    seen_deadlines = []
+
+    async def work():
+        seen_deadlines.append(current_deadline())
+        await asyncio.sleep(0.2)
+        return "done"
+
+    async def hurried():
+        with deadline_scope(0.05):
+            return await flight.do("key", work)
+
+    async def main():
+        return await asyncio.gather(hurried(), flight.do("key", work), return_exceptions=True)
+
+    hurried_result, patient_result = asyncio.run(main())
+
+    assert isinstance(hurried_result, DeadlineExceeded)
+    assert patient_result == "done"
+    # 공유 작업은 먼저 호출한 요청의 시간 예산을 물려받지 않음
+    assert seen_deadlines == [None]
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    flight = SingleFlight("test")
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_stages_inside_shared_work_reach_every_caller():
+    flight = SingleFlight("test")
+
+    async def main():
+        started = asyncio.Event()
+
+        async def work():
+            started.set()
+            with track_stage("shared_stage"):
+                await asyncio.sleep(0.02)
+            with track_stage("second_stage"):
+                await asyncio.sleep(0.02)
+            return "done"
+
+        async def caller(events, wait_for_start=False):
+            if wait_for_start:
+                # 첫 단계가 끝난 뒤에 합류해도 이미 끝난 단계를 전달받음
+                await started.wait()
+                await asyncio.sleep(0.03)
+            with stage_listener(lambda stage, seconds: events.append(stage)):
+                return await flight.do("key", work)
+
+        first, late = [], []
+        await asyncio.gather(caller(first), caller(late, wait_for_start=True))
+        return first, late
+
+    first, late = asyncio.run(main())
+
+    assert first == ["shared_stage", "second_stage"]
+    assert late == ["shared_stage", "second_stage"]
@@ -0,0 +1,140 @@
+import logging
+import re
+from typing import Any, Dict, List, Tuple
+
+import tiktoken
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+YEAR_PATTERN = re.compile(r"(?<!\d)(?:19|20)\d{2}(?!\d)")
+NUMBER_PATTERN = re.compile(r"(?<![\d.])\d+(?:[.,]\d+)?(?![\d])")
+WORD_PATTERN = re.compile(r"[0-9A-Za-z가-힣]+")
+
+
+def split_into_chunks(text: str, max_chars: int = settings.GRAPH_CHUNK_CHARS) -> List[str]:
+    """
+    텍스트를 줄 단위로 묶어 최대 길이 이하의 청크로 나눕니다.
+    한 줄이 최대 길이보다 길면 그 줄을 잘라서 나눕니다.
+    :param text: 나눌 텍스트
+    :param max_chars: 청크 최대 글자 수
+    :return: 청크 리스트 (문서 순서 유지)
+    """
+    chunks = []
+    current = []
+    current_len = 0
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        while len(line) > max_chars:
+            if current:
+                chunks.append("\n".join(current))
+                current, current_len = [], 0
+            chunks.append(line[:max_chars])
+            line = line[max_chars:]
+        if current_len + len(line) + 1 > max_chars and current:
+            chunks.append("\n".join(current))
+            current, current_len = [], 0
+        current.append(line)
+        current_len += len(line) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _bigrams(text: str) -> set:
+    # 한국어는 띄어쓰기가 불규칙하므로 공백을 제거한 글자 2-gram으로 비교
+    compact = re.sub(r"\s+", "", text.lower())
+    return {compact[i : i + 2] for i in range(len(compact) - 1)}
+
+
+class ChunkSelector:
+    """
+    페이지 텍스트에서 요청된 데이터 필드와 관련성이 높은 청크만 골라 LLM 추출 입력을 줄이는 클래스
+    필드 용어와의 어휘 일치도와 연도·숫자 밀도를 함께 점수화합니다.
+    """
+
+    def __init__(self, token_budget: int = settings.GRAPH_EXTRACTION_TOKEN_BUDGET, chunk_chars: int = settings.GRAPH_CHUNK_CHARS):
+        """
+        :param token_budget: LLM에 보낼 청크의 최대 토큰 수
+        :param chunk_chars: 청크 최대 글자 수
+        """
+        self.token_budget = token_budget
+        self.chunk_chars = chunk_chars
+        self.encoding = tiktoken.encoding_for_model(settings.OPENAI_MODEL)
+
+    def select(self, text: str, data_fields: List[str]) -> Tuple[str, Dict[str, Any]]:
+        """
+        관련도가 높은 청크를 토큰 예산 안에서 선택합니다.
+        선택된 청크는 시계열 흐름이 유지되도록 원래 문서 순서대로 합칩니다.
+
+        :param text: 페이지 본문 텍스트
+        :param data_fields: 추출할 데이터 필드 리스트
+        :return: 선택된 텍스트와 토큰 감소 통계
+        """
+        chunks = split_into_chunks(text, self.chunk_chars)
+        token_counts = [len(self.encoding.encode(chunk)) for chunk in chunks]
+        original_tokens = sum(token_counts)
+
+        if original_tokens <= self.token_budget:
+            return text, self._stats(original_tokens, original_tokens, len(chunks), len(chunks))
+
+        field_words = {word.lower() for field in data_fields for word in WORD_PATTERN.findall(field)}
+        field_bigrams = set().union(*(_bigrams(field) for field in data_fields)) if data_fields else set()
+        scores = [self._score(chunk, field_words, field_bigrams) for chunk in chunks]
+        # 제목 바로 다음에 표/수치가 나오는 경우가 많으므로, 수치가 있는 청크는 앞 청크의 점수 일부를 이어받음
+        scores = [score + (0.5 * scores[i - 1] if i > 0 and score > 0 else 0) for i, score in enumerate(scores)]
+
+        selected = []
+        used_tokens = 0
+        for index in sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True):
+            if scores[index] <= 0:
+                break
+            if used_tokens + token_counts[index] > self.token_budget:
+                continue
+            selected.append(index)
+            used_tokens += token_counts[index]
+
+        # 관련 청크가 하나도 없으면 문서 앞부분을 예산만큼 사용
+        if not selected:
+            for index, count in enumerate(token_counts):
+                if used_tokens + count > self.token_budget:
+                    break
+                selected.append(index)
+                used_tokens += count
+
+        selected_text = "\n".join(chunks[i] for i in sorted(selected))
+        return selected_text, self._stats(original_tokens, used_tokens, len(chunks), len(selected))
+
+    def _score(self, chunk: str, field_words: set, field_bigrams: set) -> float:
+        """
+        청크 점수 = 필드 어휘 일치도 + 연도·숫자 밀도
+        """
+        lowered = chunk.lower()
+        exact = sum(lowered.count(word) for word in field_words)
+        overlap = len(_bigrams(chunk) & field_bigrams) / len(field_bigrams) if field_bigrams else 0.0
+        lexical = min(exact, 5) + 3 * overlap
+
+        # 100자당 서로 다른 연도·숫자 개수 (표나 통계 문단일수록 높고, 반복되는 저작권 연도 등은 한 번만 계산)
+        length = max(len(chunk), 1)
+        years = len(set(YEAR_PATTERN.findall(chunk)))
+        numbers = len(set(NUMBER_PATTERN.findall(chunk)))
+        density = min(years * 100 / length, 3) + min(numbers * 100 / length, 5) / 2
+
+        if years == 0 and lexical == 0:
+            return 0.0
+        return lexical * (1 + density) + density
+
+    def _stats(self, original_tokens: int, selected_tokens: int, total_chunks: int, selected_chunks: int) -> Dict[str, Any]:
+        reduction = 1 - selected_tokens / original_tokens if original_tokens else 0.0
+        stats = {
+            "original_tokens": original_tokens,
+            "selected_tokens": selected_tokens,
+            "reduction": round(reduction, 4),
+            "total_chunks": total_chunks,
+            "selected_chunks": selected_chunks,
+        }
+        logger.info(f"추출 대상 청크 선택: {selected_chunks}/{total_chunks}개, 토큰 {original_tokens} -> {selected_tokens} ({reduction:.1%} 감소)")
+        return stats
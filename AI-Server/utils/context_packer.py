@@ -0,0 +1,119 @@
+import logging
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from cachetools import LRUCache
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ContextPacker:
+    """검색 결과 리스트를 관련도 순으로 정렬하여 토큰 예산 안에 채워 넣는 클래스"""
+
+    def __init__(self, encoding, max_tokens: int = settings.MAX_TOKENS, min_snippet_tokens: int = 64, cache_size: int = 2048):
+        """
+        :param encoding: tiktoken 인코딩 객체
+        :param max_tokens: 프롬프트 전체에 허용되는 최대 토큰 수
+        :param min_snippet_tokens: 잘라서라도 넣을 스니펫의 최소 토큰 수
+        :param cache_size: 토큰화 결과 캐시 크기
+        """
+        self.encoding = encoding
+        self.max_tokens = max_tokens
+        self.min_snippet_tokens = min_snippet_tokens
+        self.separator = "\n\n"
+        self._token_cache = LRUCache(maxsize=cache_size)
+        self._separator_tokens = len(self.encoding.encode(self.separator))
+
+    def encode(self, text: str) -> Tuple[int, ...]:
+        """
+        텍스트를 토큰화합니다. 같은 텍스트는 한 번만 토큰화하도록 결과를 캐시합니다.
+        :param text: 토큰화할 텍스트
+        :return: 토큰 튜플
+        """
+        tokens = self._token_cache.get(text)
+        if tokens is None:
+            tokens = tuple(self.encoding.encode(text))
+            self._token_cache[text] = tokens
+        return tokens
+
+    def count_tokens(self, text: str) -> int:
+        return len(self.encode(text))
+
+    def pack(self, items: List[Dict[str, Any]], render: Callable[[Dict[str, Any]], str], reserved_tokens: int = 0, budget: Optional[int] = None) -> Tuple[str, Dict[str, int]]:
+        """
+        검색 결과를 점수 순으로 정렬한 뒤 토큰 예산을 탐욕적으로 채웁니다.
+        예산에 다 들어가지 않는 결과는 스니펫을 잘라서 넣고, 그마저 어려우면 건너뜁니다.
+
+        :param items: 'score'(선택)와 'snippet' 키를 가진 검색 결과 리스트
+        :param render: 검색 결과 하나를 컨텍스트 문자열로 변환하는 함수
+        :param reserved_tokens: 컨텍스트 이외의 프롬프트가 차지하는 토큰 수
+        :param budget: 컨텍스트에 사용할 토큰 수 (지정하지 않으면 max_tokens - reserved_tokens)
+        :return: 패킹된 컨텍스트 문자열과 통계 딕셔너리
+        """
+        if budget is None:
+            budget = self.max_tokens - reserved_tokens
+        budget = max(budget, 0)
+
+        # 점수가 높은 순으로 정렬 (점수가 없으면 원래 순서 유지)
+        ranked = sorted(enumerate(items), key=lambda pair: (-(pair[1].get("score") or 0.0), pair[0]))
+
+        parts = []
+        used_tokens = 0
+        total_tokens = 0
+        truncated = 0
+        dropped = 0
+
+        for _, item in ranked:
+            text = render(item)
+            tokens = self.count_tokens(text)
+            total_tokens += tokens
+            separator_cost = self._separator_tokens if parts else 0
+            remaining = budget - used_tokens - separator_cost
+
+            if tokens <= remaining:
+                parts.append(text)
+                used_tokens += tokens + separator_cost
+                continue
+
+            truncated_text = self._truncate_item(item, render, remaining)
+            if truncated_text is None:
+                dropped += 1
+                continue
+
+            parts.append(truncated_text)
+            used_tokens += self.count_tokens(truncated_text) + separator_cost
+            truncated += 1
+
+        stats = {
+            "budget": budget,
+            "total_tokens": total_tokens,
+            "packed_tokens": used_tokens,
+            "tokens_saved": max(total_tokens - used_tokens, 0),
+            "included": len(parts),
+            "truncated": truncated,
+            "dropped": dropped,
+        }
+        logger.info(
+            f"컨텍스트 패킹 완료: {stats['included']}/{len(items)}개 포함 (잘림 {truncated}, 제외 {dropped}), 토큰 {used_tokens}/{budget}, 절약된 토큰 {stats['tokens_saved']}"
+        )
+        return self.separator.join(parts), stats
+
+    def _truncate_item(self, item: Dict[str, Any], render: Callable[[Dict[str, Any]], str], remaining: int) -> Optional[str]:
+        """
+        스니펫만 잘라서 남은 예산에 맞춥니다. 제목·출처 등 나머지 정보는 유지합니다.
+        :return: 잘린 컨텍스트 문자열, 최소 토큰 수를 확보할 수 없으면 None
+        """
+        overhead = self.count_tokens(render({**item, "snippet": ""}))
+        available = remaining - overhead
+        if available < self.min_snippet_tokens:
+            return None
+
+        snippet_tokens = self.encode(item.get("snippet") or "")
+        snippet = self.encoding.decode(list(snippet_tokens[: available - 1]), errors="ignore").rstrip() + "…"
+        text = render({**item, "snippet": snippet})
+
+        # 디코딩 경계에 따라 토큰 수가 늘어날 수 있으므로 한 번 더 확인
+        if self.count_tokens(text) > remaining:
+            return None
+        return text
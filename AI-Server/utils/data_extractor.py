@@ -0,0 +1,183 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from config.settings import settings
+from utils.page_fetcher import HTML_PARSER
+from utils.series_store import DEFAULT_ENTITY
+
+logger = logging.getLogger(__name__)
+
+YEAR_CELL_PATTERN = re.compile(r"^\s*((?:19|20)\d{2})\s*(?:년|年)?\s*(?:도)?\s*$")
+NUMBER_PATTERN = re.compile(r"([-+△▲▼]?)\s*(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)")
+UNIT_PATTERN = r"(%|퍼센트|%p|조\s?원|억\s?원|만\s?원|천\s?원|원|만\s?대|천\s?대|대|만\s?명|천\s?명|명|달러|톤|건|개)"
+
+# "2019년 2.2%", "2019년: 3,450억원", "2020년에는 -0.7%" 같은 연도-값 패턴
+YEAR_VALUE_PATTERN = re.compile(
+    r"((?:19|20)\d{2})\s*(?:년도|년|年)?\s*(?:[:：]|에는|에|은|는)?\s*(?:[가-힣\s]{0,12}?)\s*" r"([-+△▲▼]?)\s*(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*" + UNIT_PATTERN + r"(?!월)"
+)
+
+# 값 뒤에 오면 날짜의 일부로 보는 단위 (예: 2019년 12월)
+DATE_SUFFIXES = ("월", "일", "분기", "년")
+
+
+def parse_number(text: str) -> Optional[float]:
+    """
+    표 셀이나 문장에서 숫자를 읽습니다. 천 단위 구분 기호와 단위를 무시하고,
+    한국 통계표에서 감소를 나타내는 △/▼ 기호는 음수로 처리합니다.
+    :param text: 숫자를 포함한 문자열
+    :return: 숫자 값, 없으면 None
+    """
+    match = NUMBER_PATTERN.search(text)
+    if not match:
+        return None
+    rest = text[match.end() :].strip()
+    if rest.startswith(DATE_SUFFIXES):
+        return None
+    value = float(match.group(2).replace(",", ""))
+    return -value if match.group(1) in ("-", "△", "▼") else value
+
+
+class DataExtractor:
+    """
+    HTML 표와 "2019년 2.2%" 같은 연도-값 패턴에서 시계열 데이터를 규칙 기반으로 추출하는 클래스
+    LLM 추출보다 먼저 실행하여, 규칙으로 찾지 못한 경우에만 LLM을 호출하도록 합니다.
+    요청한 필드명과 일치하는 표의 행/열이나 필드명이 언급된 문장에서만 추출하며, 관련 없는 수치는 사용하지 않습니다.
+    """
+
+    def __init__(self, min_points: int = 2, max_points: int = settings.MAX_GRAPH_DATA_POINTS, name: str = DEFAULT_ENTITY):
+        """
+        :param min_points: 시계열로 인정할 최소 데이터 포인트 수
+        :param max_points: 최대 데이터 포인트 수
+        :param name: 레코드의 name 값
+        """
+        self.min_points = min_points
+        self.max_points = max_points
+        self.name = name
+
+    def extract(self, html: str, text: str, data_fields: List[str]) -> List[Dict[str, Any]]:
+        """
+        표를 먼저 시도하고, 찾지 못하면 본문 텍스트의 연도-값 패턴을 시도합니다.
+
+        :param html: 페이지 HTML
+        :param text: 페이지 본문 텍스트
+        :param data_fields: 추출할 데이터 필드 리스트
+        :return: {"date", "value", "name", "field"} 레코드 리스트 (연도순), 찾지 못하면 빈 리스트
+        """
+        field = data_fields[0] if data_fields else "경제성장률"
+        series = {}
+        if html and "<table" in html.lower():
+            series = self._extract_from_tables(html, data_fields)
+        if len(series) < self.min_points and text:
+            series = self._extract_from_text(text, data_fields)
+        if len(series) < self.min_points:
+            return []
+
+        years = sorted(series)[-self.max_points :]
+        records = [{"date": f"{year}-01-01", "value": series[year], "name": self.name, "field": field} for year in years]
+        logger.info(f"규칙 기반 추출 성공: {len(records)}개 데이터 포인트")
+        return records
+
+    def _extract_from_tables(self, html: str, data_fields: List[str]) -> Dict[int, float]:
+        soup = BeautifulSoup(html, HTML_PARSER)
+        best: Dict[int, float] = {}
+        for table in soup.find_all("table"):
+            grid = self._table_to_grid(table)
+            if len(grid) < 2:
+                continue
+            for series in (self._series_from_year_header(grid, data_fields), self._series_from_year_column(grid, data_fields)):
+                # 필드명이 일치하는 행/열 중 데이터가 가장 많은 것을 선택
+                if len(series) >= self.min_points and len(series) > len(best):
+                    best = series
+        return best
+
+    def _table_to_grid(self, table) -> List[List[str]]:
+        # rowspan/colspan은 무시하고 셀 텍스트만 행 단위로 추출
+        grid = []
+        for row in table.find_all("tr"):
+            cells = [cell.get_text(" ", strip=True) for cell in row.find_all(["th", "td"])]
+            if cells:
+                grid.append(cells)
+        return grid
+
+    def _series_from_year_header(self, grid: List[List[str]], data_fields: List[str]) -> Dict[int, float]:
+        """
+        연도가 머리글 행에 가로로 나열된 표 (예: | 구분 | 2019 | 2020 | 2021 |)에서 첫 셀이 필드명과 일치하는 행
+        """
+        for header_index, header in enumerate(grid[:3]):
+            year_columns = {i: int(m.group(1)) for i, cell in enumerate(header) if (m := YEAR_CELL_PATTERN.match(cell))}
+            if len(year_columns) < self.min_points:
+                continue
+
+            for row in grid[header_index + 1 :]:
+                if not row or not self._matches_field(row[0], data_fields):
+                    continue
+                # 머리글보다 셀이 적으면 (첫 열 병합 등) 오른쪽 정렬로 맞춤
+                offset = len(header) - len(row)
+                series = {}
+                for column, year in year_columns.items():
+                    index = column - offset
+                    if 0 <= index < len(row):
+                        value = parse_number(row[index])
+                        if value is not None:
+                            series[year] = value
+                if len(series) >= self.min_points:
+                    return series
+        return {}
+
+    def _series_from_year_column(self, grid: List[List[str]], data_fields: List[str]) -> Dict[int, float]:
+        """
+        연도가 첫 열에 세로로 나열된 표 (예: | 2019 | 2.2 | ...)에서 머리글이 필드명과 일치하는 열
+        """
+        year_rows = [(int(m.group(1)), row) for row in grid if row and (m := YEAR_CELL_PATTERN.match(row[0]))]
+        if len(year_rows) < self.min_points:
+            return {}
+
+        header = next((row for row in grid if row and not YEAR_CELL_PATTERN.match(row[0])), [])
+        value_column = next((i for i, cell in enumerate(header) if i > 0 and self._matches_field(cell, data_fields)), None)
+        if value_column is None:
+            return {}
+
+        series = {}
+        for year, row in year_rows:
+            if value_column < len(row):
+                value = parse_number(row[value_column])
+                if value is not None:
+                    series.setdefault(year, value)
+        return series
+
+    def _extract_from_text(self, text: str, data_fields: List[str]) -> Dict[int, float]:
+        """
+        본문에서 필드명이 언급된 줄의 연도-값 패턴을 찾습니다. 같은 단위를 가진 값만 사용합니다.
+        """
+        matches = []
+        for line in text.splitlines():
+            if not self._matches_field(line, data_fields):
+                continue
+            for match in YEAR_VALUE_PATTERN.finditer(line):
+                value = float(match.group(3).replace(",", ""))
+                if match.group(2) in ("-", "△", "▼"):
+                    value = -value
+                matches.append((int(match.group(1)), value, re.sub(r"\s", "", match.group(4))))
+        if not matches:
+            return {}
+
+        # 가장 많이 등장한 단위의 값만 사용하여 서로 다른 지표가 섞이지 않도록 함
+        units = [unit for _, _, unit in matches]
+        dominant_unit = max(set(units), key=units.count)
+        series = {}
+        for year, value, unit in matches:
+            if unit == dominant_unit:
+                series.setdefault(year, value)
+        return series
+
+    def _matches_field(self, text: str, data_fields: List[str]) -> bool:
+        # 공백을 무시하고 필드명이 포함되거나, 짧은 셀 이름(예: "물가")이 필드명(예: "물가 상승률")에 포함되면 일치로 판단
+        compact = re.sub(r"\s+", "", text)
+        for field in data_fields:
+            field = re.sub(r"\s+", "", field)
+            if field and (field in compact or (2 <= len(compact) <= 20 and compact in field)):
+                return True
+        return False
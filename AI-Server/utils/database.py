@@ -1,5 +1,6 @@
 import logging
 import os
+from typing import Optional
 from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, connections, utility
 from config.settings import settings
 
@@ -35,12 +36,7 @@ def create_collection(collection_name: str, dim: int) -> Collection:
     schema = CollectionSchema(fields, f"Collection for {collection_name}")
     collection = Collection(collection_name, schema)
 
-    index_params = {
-        "index_type": "IVF_FLAT",
-        "metric_type": "L2",
-        "params": {"nlist": 1024},
-    }
-    collection.create_index("embedding", index_params)
+    collection.create_index("embedding", settings.VECTOR_INDEX_PARAMS)
     logger.info(f"Collection {collection_name} created successfully")
     return collection
 
@@ -58,13 +54,51 @@ def get_collection(collection_name: str = settings.COLLECTION_NAME) -> Collectio
         else:
             collection = Collection(collection_name)
         collection.load()
-        logger.info(f"Collection {collection_name} loaded successfully")
+        logger.debug(f"Collection {collection_name} loaded successfully")
         return collection
     except Exception as e:
         logger.error(f"Error while getting collection {collection_name}: {str(e)}")
         raise
 
 
+def has_collection(collection_name: str = settings.COLLECTION_NAME) -> bool:
+    """
+    Milvus 서버에 지정된 컬렉션이 있는지 확인하는 함수 (준비 상태 확인용)
+    :param collection_name: 확인할 컬렉션의 이름
+    :return: 컬렉션 존재 여부
+    """
+    return utility.has_collection(collection_name)
+
+
+def get_alias_target(alias: str) -> Optional[str]:
+    """
+    별칭이 가리키는 실제 컬렉션 이름을 반환하는 함수
+    :param alias: 확인할 별칭
+    :return: 별칭이 가리키는 컬렉션 이름 (별칭이 아니면 None)
+    """
+    for collection_name in utility.list_collections():
+        if alias in utility.list_aliases(collection_name):
+            return collection_name
+    return None
+
+
+def swap_alias(alias: str, collection_name: str) -> Optional[str]:
+    """
+    별칭이 collection_name을 가리키도록 바꾸는 함수 (별칭이 없으면 생성)
+    별칭으로 컬렉션을 사용하는 요청은 교체 직후부터 새 컬렉션을 사용합니다.
+    :param alias: 교체할 별칭
+    :param collection_name: 별칭이 가리킬 컬렉션 이름
+    :return: 이전에 별칭이 가리키던 컬렉션 이름 (없으면 None)
+    """
+    previous = get_alias_target(alias)
+    if previous is None:
+        utility.create_alias(collection_name, alias)
+    else:
+        utility.alter_alias(collection_name, alias)
+    logger.info(f"Alias {alias} now points to {collection_name} (previous: {previous})")
+    return previous
+
+
 def close_milvus_connection() -> None:
     """
     Milvus 연결을 종료하는 함수
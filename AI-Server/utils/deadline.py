@@ -0,0 +1,119 @@
+import asyncio
+import contextvars
+import inspect
+import logging
+import math
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """남은 시간 예산 안에 단계를 끝내지 못했을 때 발생하는 예외"""
+
+
+class Deadline:
+    """
+    요청 하나의 시간 예산
+    각 단계는 남은 시간을 확인하여 실행 여부를 정하거나, 남은 시간 안에서만 실행하고 초과하면 대체 결과를 사용합니다.
+    건너뛰거나 축소된 단계는 skipped에 기록되어 응답에 포함됩니다.
+    """
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+        self.skipped: List[str] = []
+
+    def remaining(self) -> float:
+        """
+        남은 시간(초)을 반환합니다.
+        """
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def has(self, seconds: float) -> bool:
+        """
+        남은 시간이 seconds 이상인지 확인합니다.
+        """
+        return self.remaining() >= seconds
+
+    def cap(self, timeout: float, reserve: float = 0.0) -> float:
+        """
+        단계 자체의 제한 시간을 남은 예산(reserve 제외) 이내로 줄입니다.
+        """
+        return max(0.0, min(timeout, self.remaining() - reserve))
+
+    def skip(self, stage: str, reason: str = "시간 예산 부족"):
+        """
+        단계를 건너뛰었거나 축소했음을 기록합니다.
+        """
+        if stage not in self.skipped:
+            self.skipped.append(stage)
+        logger.warning(f"단계 생략: {stage} ({reason}, 남은 시간 {self.remaining():.2f}초)")
+
+    async def run(self, stage: str, awaitable: Awaitable[Any], reserve: float = 0.0, fallback: Any = _MISSING) -> Any:
+        """
+        남은 예산에서 reserve를 뺀 시간 안에 awaitable을 실행합니다.
+        시간이 부족하거나 초과하면 단계를 생략한 것으로 기록하고 fallback을 반환합니다. (fallback이 없으면 DeadlineExceeded)
+
+        :param stage: 단계 이름
+        :param awaitable: 실행할 코루틴 또는 태스크
+        :param reserve: 이후 단계를 위해 남겨 둘 시간(초)
+        :param fallback: 시간 초과 시 반환할 값
+        :return: awaitable의 결과 또는 fallback
+        """
+        timeout = self.remaining() - reserve
+        if math.isinf(timeout):
+            return await awaitable
+        try:
+            if timeout <= 0:
+                _discard(awaitable)
+                raise asyncio.TimeoutError
+            return await asyncio.wait_for(awaitable, timeout=timeout)
+        except asyncio.TimeoutError:
+            self.skip(stage)
+            if fallback is _MISSING:
+                raise DeadlineExceeded(stage)
+            return fallback
+
+
+def _discard(awaitable: Awaitable[Any]):
+    # 실행하지 않을 코루틴/태스크 정리 (await되지 않은 코루틴 경고 방지)
+    if inspect.iscoroutine(awaitable):
+        awaitable.close()
+    elif isinstance(awaitable, asyncio.Future):
+        awaitable.cancel()
+
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar("deadline", default=None)
+
+
+def get_deadline() -> Deadline:
+    """
+    현재 요청의 시간 예산을 반환합니다. 예산이 설정되지 않은 곳(수집 작업 등)에서는 제한 없는 예산을 반환합니다.
+    """
+    return _current.get() or Deadline(math.inf)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """
+    현재 요청의 시간 예산을 반환합니다. 설정되지 않았으면 None
+    """
+    return _current.get()
+
+
+@contextmanager
+def deadline_scope(budget: float) -> Iterator[Deadline]:
+    """
+    블록 안에서 실행되는 모든 단계(생성된 태스크 포함)가 공유하는 시간 예산을 설정합니다.
+    :param budget: 시간 예산(초)
+    """
+    deadline = Deadline(budget)
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
@@ -0,0 +1,265 @@
+"""
+노드 내 모든 프로세스가 공유하는 로컬 임베딩 서버
+
+API 워커, 수집 작업, 스크립트가 각자 모델을 로드하는 대신 이 서버 하나가 모델을 로드하고,
+여러 클라이언트의 요청을 하나의 배치 큐로 모아 추론합니다. 통신은 Unix 소켓을 사용합니다.
+
+    python -m utils.embedding_server --socket /tmp/jiwoo-embedding.sock
+
+클라이언트는 EMBEDDING_SERVER_SOCKET 설정이 있으면 utils.embedding_utils가 자동으로 사용합니다.
+
+프로토콜: 모든 메시지는 4바이트 길이(big-endian) + 본문 프레임
+- 요청: JSON {"texts": [...]}
+- 응답: JSON 헤더 {"count": n, "dim": d} 다음에 float32 임베딩 바이트 프레임, 오류 시 {"error": "..."} 헤더만 전송
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from config.settings import settings
+from utils.logging_utils import setup_logging
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+
+
+class EmbeddingServerError(RuntimeError):
+    """임베딩 서버가 오류를 반환했거나 응답이 올바르지 않을 때 발생하는 예외"""
+
+
+def _pack(payload: bytes) -> bytes:
+    return _HEADER.pack(len(payload)) + payload
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            raise ConnectionError("임베딩 서버 연결이 끊어졌습니다.")
+        buffer.extend(chunk)
+    return bytes(buffer)
+
+
+def _recv_frame(sock: socket.socket) -> bytes:
+    (size,) = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+    if size > MAX_FRAME_BYTES:
+        raise EmbeddingServerError(f"프레임이 너무 큽니다: {size} bytes")
+    return _recv_exact(sock, size)
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> bytes:
+    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if size > MAX_FRAME_BYTES:
+        raise EmbeddingServerError(f"프레임이 너무 큽니다: {size} bytes")
+    return await reader.readexactly(size)
+
+
+class EmbeddingServer:
+    """
+    Unix 소켓으로 임베딩 요청을 받아 배치로 추론하는 서버
+    요청이 들어오면 최대 batch_wait초 동안 다른 요청을 더 모아 max_batch개 단위로 한 번에 추론합니다.
+    """
+
+    def __init__(
+        self,
+        socket_path: str = settings.EMBEDDING_SERVER_SOCKET,
+        max_batch: int = settings.EMBEDDING_SERVER_MAX_BATCH,
+        batch_wait: float = settings.EMBEDDING_SERVER_BATCH_WAIT,
+    ):
+        self.socket_path = socket_path
+        self.max_batch = max_batch
+        self.batch_wait = batch_wait
+        self.model = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.stats = {"requests": 0, "texts": 0, "batches": 0, "errors": 0}
+
+    def load_model(self):
+        from sentence_transformers import SentenceTransformer
+
+        start = time.perf_counter()
+        self.model = SentenceTransformer(settings.EMBEDDING_MODEL)
+        logger.info(f"임베딩 모델 로드 완료 ({time.perf_counter() - start:.1f}초): {settings.EMBEDDING_MODEL}")
+
+    async def serve_forever(self):
+        if self.model is None:
+            await asyncio.to_thread(self.load_model)
+        self.queue = asyncio.Queue()
+        if os.path.exists(self.socket_path):
+            # 이전 실행에서 남은 소켓 파일 제거
+            os.unlink(self.socket_path)
+        directory = os.path.dirname(self.socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        server = await asyncio.start_unix_server(self._handle_client, path=self.socket_path)
+        os.chmod(self.socket_path, 0o660)
+        batcher = asyncio.create_task(self._batch_loop())
+        logger.info(f"임베딩 서버 시작: {self.socket_path} (최대 배치 {self.max_batch}, 대기 {self.batch_wait * 1000:.0f}ms)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # 한 연결에서 여러 요청을 순서대로 처리 (클라이언트는 연결을 재사용)
+        try:
+            while True:
+                try:
+                    frame = await _read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                try:
+                    texts = json.loads(frame)["texts"]
+                    vectors = await self.encode(texts)
+                    header = {"count": int(vectors.shape[0]), "dim": int(vectors.shape[1]) if vectors.ndim == 2 else 0}
+                    writer.write(_pack(json.dumps(header).encode("utf-8")) + _pack(vectors.astype(np.float32).tobytes()))
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"임베딩 요청 처리 중 오류 발생: {str(e)}")
+                    writer.write(_pack(json.dumps({"error": str(e)}, ensure_ascii=False).encode("utf-8")))
+                await writer.drain()
+        except (ConnectionError, EmbeddingServerError) as e:
+            logger.warning(f"임베딩 클라이언트 연결 종료: {str(e)}")
+        finally:
+            writer.close()
+
+    async def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        텍스트를 배치 큐에 넣고 임베딩 결과를 기다립니다.
+        """
+        self.stats["requests"] += 1
+        self.stats["texts"] += len(texts)
+        if not texts:
+            return np.zeros((0, settings.EMBEDDING_DIMENSION), dtype=np.float32)
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((texts, future))
+        return await future
+
+    async def _batch_loop(self):
+        while True:
+            pending = [await self.queue.get()]
+            size = len(pending[0][0])
+            deadline = time.monotonic() + self.batch_wait
+            # 대기 시간 안에 들어온 요청을 최대 배치 크기까지 모음
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    break
+                pending.append(item)
+                size += len(item[0])
+            await self._run_batch(pending)
+
+    async def _run_batch(self, pending: List[Tuple[List[str], asyncio.Future]]):
+        texts = [text for item_texts, _ in pending for text in item_texts]
+        self.stats["batches"] += 1
+        try:
+            vectors = await asyncio.to_thread(self.model.encode, texts, batch_size=self.max_batch, convert_to_numpy=True)
+        except Exception as e:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        offset = 0
+        for item_texts, future in pending:
+            if not future.done():
+                future.set_result(vectors[offset : offset + len(item_texts)])
+            offset += len(item_texts)
+
+
+class EmbeddingClient:
+    """
+    임베딩 서버의 동기 클라이언트
+    스레드별로 연결을 하나씩 유지하며, 연결이 끊어지면 한 번 다시 연결하여 재시도합니다.
+    """
+
+    def __init__(self, socket_path: str = settings.EMBEDDING_SERVER_SOCKET, timeout: float = settings.EMBEDDING_SERVER_TIMEOUT):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self.socket_path)
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+        self._local.sock = None
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        텍스트 리스트를 임베딩합니다.
+        :param texts: 임베딩할 텍스트 리스트
+        :return: (텍스트 수, 차원) float32 배열
+        """
+        payload = _pack(json.dumps({"texts": texts}, ensure_ascii=False).encode("utf-8"))
+        for attempt in range(2):
+            try:
+                if getattr(self._local, "sock", None) is None:
+                    self._local.sock = self._connect()
+                sock = self._local.sock
+                sock.sendall(payload)
+                header = json.loads(_recv_frame(sock))
+                if "error" in header:
+                    raise EmbeddingServerError(header["error"])
+                vectors = np.frombuffer(_recv_frame(sock), dtype=np.float32)
+                return vectors.reshape(header["count"], header["dim"]) if header["count"] else np.zeros((0, settings.EMBEDDING_DIMENSION), dtype=np.float32)
+            except OSError as e:
+                # 응답 도중 끊긴 연결은 재사용할 수 없으므로 닫고, 첫 실패면 새 연결로 재시도
+                self._close()
+                if attempt == 1:
+                    raise EmbeddingServerError(f"임베딩 서버({self.socket_path})에 연결할 수 없습니다: {str(e)}") from e
+
+
+_client: Optional[EmbeddingClient] = None
+
+
+def get_embedding_client() -> EmbeddingClient:
+    """
+    프로세스 전체에서 공유하는 임베딩 서버 클라이언트를 반환합니다.
+    """
+    global _client
+    if _client is None:
+        _client = EmbeddingClient()
+    return _client
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 임베딩 서버 (Unix 소켓)")
+    parser.add_argument("--socket", default=settings.EMBEDDING_SERVER_SOCKET or "/tmp/jiwoo-embedding.sock", help="Unix 소켓 경로")
+    parser.add_argument("--max-batch", type=int, default=settings.EMBEDDING_SERVER_MAX_BATCH, help="한 번에 추론할 최대 텍스트 수")
+    parser.add_argument("--batch-wait-ms", type=float, default=settings.EMBEDDING_SERVER_BATCH_WAIT * 1000, help="배치를 모으기 위해 기다릴 최대 시간(ms)")
+    args = parser.parse_args()
+
+    setup_logging()
+    server = EmbeddingServer(socket_path=args.socket, max_batch=args.max_batch, batch_wait=args.batch_wait_ms / 1000)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        logger.info(f"임베딩 서버 종료: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
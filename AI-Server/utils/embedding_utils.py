@@ -1,19 +1,46 @@
+import asyncio
 import logging
+import threading
 from typing import Callable, List
-from sentence_transformers import SentenceTransformer
 from config.settings import settings
 from services.models import CompanyInfo, SupportProgramInfo
+from utils.embedding_server import get_embedding_client
+from utils.metrics import timed_stage
+from utils.single_flight import get_single_flight, make_key
 
 # 로깅 설정
 logger = logging.getLogger(__name__)
 
-# 다국어 지원 문장 임베딩 모델 로드
-try:
-    model = SentenceTransformer(settings.EMBEDDING_MODEL)
-    logger.info("Successfully loaded SentenceTransformer model")
-except Exception as e:
-    logger.error(f"Failed to load SentenceTransformer model: {str(e)}")
-    raise
+# 다국어 지원 문장 임베딩 모델 (처음 사용할 때 로드, 임베딩 서버를 사용하면 로드하지 않음)
+_model = None
+_model_lock = threading.Lock()
+
+
+def get_model():
+    """
+    프로세스 내 임베딩 모델을 반환합니다. 처음 호출될 때 한 번만 로드합니다.
+    :return: SentenceTransformer 모델
+    """
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+
+                try:
+                    _model = SentenceTransformer(settings.EMBEDDING_MODEL)
+                    logger.info("Successfully loaded SentenceTransformer model")
+                except Exception as e:
+                    logger.error(f"Failed to load SentenceTransformer model: {str(e)}")
+                    raise
+    return _model
+
+
+def _encode(texts: List[str], batch_size: int = 32) -> List[List[float]]:
+    # EMBEDDING_SERVER_SOCKET이 설정되어 있으면 노드 공유 임베딩 서버에, 아니면 프로세스 내 모델로 추론
+    if settings.EMBEDDING_SERVER_SOCKET:
+        return get_embedding_client().encode(texts).tolist()
+    return get_model().encode(texts, batch_size=batch_size).tolist()
 
 
 def company_info_to_text(info: CompanyInfo) -> str:
@@ -25,6 +52,7 @@ def company_info_to_text(info: CompanyInfo) -> str:
     return f"{info.businessPlatform} {info.businessScale} {info.business_field} {info.businessStartDate} {info.investmentStatus} {info.customerType}"
 
 
+@timed_stage("embedding")
 def get_embedding(text: str) -> List[float]:
     """
     텍스트를 임베딩 벡터로 변환하는 함수
@@ -33,12 +61,39 @@ def get_embedding(text: str) -> List[float]:
     :raises: Exception 임베딩 과정에서 오류 발생 시
     """
     try:
-        return model.encode(text).tolist()
+        return _encode([text])[0]
     except Exception as e:
         logger.error(f"Error encoding text: {str(e)}")
         raise
 
 
+@timed_stage("embedding")
+def get_embeddings(texts: List[str], batch_size: int = 32) -> List[List[float]]:
+    """
+    여러 텍스트를 한 번에 임베딩 벡터로 변환하는 함수 (배치 단위로 모델 추론)
+    :param texts: 임베딩할 텍스트 리스트
+    :param batch_size: 모델 추론 배치 크기
+    :return: 임베딩 벡터 리스트 (입력 순서 유지)
+    """
+    if not texts:
+        return []
+    try:
+        return _encode(texts, batch_size=batch_size)
+    except Exception as e:
+        logger.error(f"Error encoding texts: {str(e)}")
+        raise
+
+
+async def aget_embedding(text: str) -> List[float]:
+    """
+    텍스트를 임베딩 벡터로 변환하는 비동기 함수
+    모델 추론은 스레드에서 실행하고, 동시에 들어온 동일 텍스트는 한 번만 임베딩합니다.
+    :param text: 임베딩할 텍스트
+    :return: 임베딩 벡터 (float 리스트)
+    """
+    return await get_single_flight("embedding").do(make_key(text), lambda: asyncio.to_thread(get_embedding, text))
+
+
 def get_company_embedding(info: CompanyInfo) -> List[float]:
     """
     CompanyInfo 객체를 임베딩 벡터로 변환하는 함수
@@ -49,14 +104,49 @@ def get_company_embedding(info: CompanyInfo) -> List[float]:
     return get_embedding(text)
 
 
+async def aget_company_embedding(info: CompanyInfo) -> List[float]:
+    """
+    CompanyInfo 객체를 임베딩 벡터로 변환하는 비동기 함수
+    :param info: 변환할 CompanyInfo 객체
+    :return: 임베딩 벡터 (float 리스트)
+    """
+    return await aget_embedding(company_info_to_text(info))
+
+
+async def aget_company_embeddings(infos: List[CompanyInfo]) -> List[List[float]]:
+    """
+    여러 CompanyInfo 객체를 한 번의 배치 추론으로 임베딩하는 비동기 함수
+    :param infos: 변환할 CompanyInfo 객체 리스트
+    :return: 임베딩 벡터 리스트 (입력 순서 유지)
+    """
+    return await asyncio.to_thread(get_embeddings, [company_info_to_text(info) for info in infos])
+
+
+def support_program_info_to_text(info: SupportProgramInfo) -> str:
+    """
+    SupportProgramInfo 객체를 텍스트 문자열로 변환하는 함수
+    :param info: 변환할 SupportProgramInfo 객체
+    :return: 변환된 텍스트 문자열
+    """
+    return " ".join([info.name, info.target, info.scare_of_support, info.support_content, info.support_characteristics, info.support_info])
+
+
 def get_support_program_embedding(info: SupportProgramInfo) -> List[float]:
     """
     SupportProgramInfo 객체를 임베딩 벡터로 변환하는 함수
     :param info: 변환할 SupportProgramInfo 객체
     :return: 임베딩 벡터 (float 리스트)
     """
-    text = " ".join([info.name, info.target, info.scare_of_support, info.support_content, info.support_characteristics, info.support_info])
-    return get_embedding(text)
+    return get_embedding(support_program_info_to_text(info))
+
+
+async def aget_support_program_embedding(info: SupportProgramInfo) -> List[float]:
+    """
+    SupportProgramInfo 객체를 임베딩 벡터로 변환하는 비동기 함수
+    :param info: 변환할 SupportProgramInfo 객체
+    :return: 임베딩 벡터 (float 리스트)
+    """
+    return await aget_embedding(support_program_info_to_text(info))
 
 
 def get_embedding_function() -> Callable[[str], List[float]]:
@@ -64,4 +154,4 @@ def get_embedding_function() -> Callable[[str], List[float]]:
     임베딩 함수를 반환하는 함수
     :return: 텍스트를 임베딩 벡터로 변환하는 함수
     """
-    return lambda text: model.encode(text).tolist()
+    return get_embedding
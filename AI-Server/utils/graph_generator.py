@@ -3,7 +3,8 @@ import json
 import asyncio
 import aiohttp
 import re
-from typing import Dict, Any, List, Tuple
+import math
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 from langchain.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
@@ -11,52 +12,246 @@ from datetime import datetime
 from dateutil.parser import parse
 from dateutil.relativedelta import relativedelta
 from bs4 import BeautifulSoup
+from cachetools import LRUCache
+from config.settings import settings
+from utils.chunk_selector import ChunkSelector
+from utils.data_extractor import DataExtractor
+from utils.deadline import get_deadline
+from utils.logging_utils import debug_enabled, truncate
+from utils.metrics import timed_stage
+from utils.page_fetcher import get_page_fetcher
+from utils.rate_limiter import estimate_tokens, get_rate_limiter
+from utils.series_store import DEFAULT_ENTITY, get_series_store
+from utils.single_flight import get_single_flight, make_key
+from utils.transport import wrap_chat_model
 
 logger = logging.getLogger(__name__)
 
 
 class GraphGenerator:
     def __init__(self):
-        self.llm = ChatOpenAI(temperature=0.2)
+        self.llm = wrap_chat_model(ChatOpenAI(temperature=0.2, max_retries=0))
+        self.rate_limiter = get_rate_limiter("openai")
+        self.page_fetcher = get_page_fetcher()
+        self.chunk_selector = ChunkSelector()
+        self.data_extractor = DataExtractor()
+        self.series_store = get_series_store()
+        # 같은 데이터의 Plotly 그림은 한 번만 렌더링 (키: 간결한 그래프 데이터의 해시)
+        self.figure_cache = LRUCache(maxsize=256)
+
+    async def _invoke_llm(self, prompt: str):
+        """
+        요청 제한을 적용하여 LLM을 비동기로 호출합니다.
+
+        :param prompt: LLM에 전달할 프롬프트
+        :return: LLM 응답 메시지
+        """
+        return await get_single_flight("llm").do(
+            make_key("graph", prompt), lambda: self.rate_limiter.run(lambda: self.llm.ainvoke(prompt), tokens=estimate_tokens(prompt, completion_tokens=500))
+        )
 
-    async def process_graph_request(self, query: str, search_results: Dict[str, Any]) -> Dict[str, Any]:
+    @timed_stage("graph_total")
+    async def process_graph_request(self, query: str, search_results: Dict[str, Any], analysis: Optional[Tuple[str, List[str]]] = None) -> Dict[str, Any]:
+        """
+        검색 결과로부터 그래프 데이터를 생성합니다.
+
+        :param query: 사용자 쿼리 문자열
+        :param search_results: 웹 검색 결과
+        :param analysis: 미리 분석된 (그래프 유형, 데이터 필드). 없으면 여기서 분석합니다.
+        :return: 그래프 데이터와 설명을 포함한 딕셔너리
+        """
         try:
             logger.info(f"그래프 생성 요청 처리 시작: {query}")
 
-            graph_type, data_fields = self._analyze_query(query)
-            logger.info(f"분석된 그래프 유형: {graph_type}, 데이터 필드: {data_fields}")
-
             if not search_results or not search_results.get("organic"):
                 logger.warning("검색 결과가 없습니다.")
                 return {"text_response": "요청하신 정보를 찾지 못했습니다.", "graph_data": None}
 
-            most_relevant_url = await self._select_most_relevant_url(query, search_results["organic"])
-            if not most_relevant_url:
-                raise ValueError("관련성 높은 URL을 찾지 못했습니다.")
-
-            page_content = await self._fetch_page_content(most_relevant_url)
-            if not page_content:
-                raise ValueError("웹 페이지 내용을 가져오지 못했습니다.")
+            graph_type, data_fields = analysis or await self.analyze_query(query)
+            logger.info(f"분석된 그래프 유형: {graph_type}, 데이터 필드: {data_fields}")
 
-            processed_data = await self._extract_data_from_content(page_content, data_fields)
+            processed_data, source_url = await self._extract_from_candidates(query, search_results["organic"], data_fields)
             if not processed_data:
                 raise ValueError("데이터 추출에 실패했습니다.")
 
-            logger.info(f"처리된 데이터: {json.dumps(processed_data, ensure_ascii=False, default=str)}")
+            logger.info(f"처리된 데이터: {len(processed_data)}개 데이터 포인트 ({source_url})")
+            if debug_enabled(logger):
+                # 직렬화 비용이 있으므로 DEBUG 로그가 출력될 때만
+                logger.debug(f"처리된 데이터 내용: {truncate(processed_data)}")
 
-            graph_data = self.generate_graph(processed_data, graph_type, query)
+            # 저장소에 병합한 뒤, 이전에 저장된 연도까지 포함한 전체 시계열로 그래프 생성
+            # 저장된 시계열은 TTL 동안 검색 없이 재사용되므로, 요청 필드로 확인된 정상 데이터만 저장
+            if self.series_store is not None and self._is_storable(processed_data, data_fields):
+                try:
+                    processed_data = await self.series_store.asave(processed_data, source_url)
+                except Exception as e:
+                    logger.warning(f"시계열 저장 실패: {str(e)}")
 
-            if isinstance(graph_data, go.Figure):
-                return {"graph_data": json.loads(graph_data.to_json()), "text_response": self._generate_graph_explanation(processed_data, graph_type)}
-            else:
-                logger.error(f"그래프 생성 실패: {graph_data}")
-                return {"text_response": f"그래프 생성 중 오류가 발생했습니다: {graph_data}", "graph_data": None}
+            return self.build_graph_response(processed_data, graph_type, query)
 
         except Exception as e:
             logger.error(f"그래프 요청 처리 중 예기치 않은 오류 발생: {str(e)}", exc_info=True)
             return {"text_response": f"요청을 처리하는 동안 오류가 발생했습니다: {str(e)}", "graph_data": None}
 
-    def _analyze_query(self, query: str) -> Tuple[str, List[str]]:
+    @staticmethod
+    def _is_storable(data: List[Dict[str, Any]], data_fields: List[str]) -> bool:
+        """
+        추출한 시계열을 저장소에 저장해도 되는지 확인합니다.
+        (요청 필드로 추출되었고, 서로 다른 연도가 2개 이상이며, 연도와 값이 정상 범위인 경우)
+
+        :param data: {"date", "value", "name", "field"} 레코드 리스트
+        :param data_fields: 분석된 데이터 필드 리스트
+        :return: 저장 가능 여부
+        """
+        if not data_fields:
+            return False
+        years = set()
+        for record in data:
+            if record.get("field") != data_fields[0]:
+                return False
+            try:
+                year = datetime.strptime(str(record["date"]), "%Y-%m-%d").year
+                value = float(record["value"])
+            except (KeyError, TypeError, ValueError):
+                return False
+            if not 1900 <= year <= datetime.now().year + 1 or not math.isfinite(value):
+                return False
+            years.add(year)
+        return len(years) >= 2
+
+    async def get_stored_series(self, data_fields: List[str]) -> Optional[List[Dict[str, Any]]]:
+        """
+        저장소에 신선한 시계열이 있으면 반환합니다. 있으면 검색/추출 과정을 생략할 수 있습니다.
+
+        :param data_fields: 분석된 데이터 필드 리스트
+        :return: 저장된 시계열 레코드 리스트, 없으면 None
+        """
+        if self.series_store is None or not data_fields:
+            return None
+        try:
+            stored = await self.series_store.aget_fresh(data_fields[0])
+        except Exception as e:
+            logger.warning(f"시계열 저장소 조회 실패: {str(e)}")
+            return None
+        if stored is None:
+            return None
+        logger.info(f"저장된 시계열 사용: {data_fields[0]} ({stored['source']}, {len(stored['records'])}개)")
+        return stored["records"]
+
+    def build_graph_response(self, data: List[Dict[str, Any]], graph_type: str, query: str) -> Dict[str, Any]:
+        """
+        시계열 레코드로 간결한 그래프 데이터를 만들어 응답 딕셔너리를 구성합니다.
+
+        :param data: {"date", "value", "name", "field"} 레코드 리스트
+        :param graph_type: 그래프 유형
+        :param query: 사용자 쿼리 문자열
+        :return: 그래프 데이터와 설명을 포함한 딕셔너리
+        """
+        if not data:
+            logger.error("그래프 생성 실패: 그래프를 생성할 데이터가 없습니다.")
+            return {"text_response": "그래프 생성 중 오류가 발생했습니다: 그래프를 생성할 데이터가 없습니다.", "graph_data": None}
+        return {"graph_data": self.to_compact_graph(data, graph_type), "text_response": self._generate_graph_explanation(data, graph_type)}
+
+    def to_compact_graph(self, data: List[Dict[str, Any]], graph_type: str) -> Dict[str, Any]:
+        """
+        레코드를 차트 유형, 제목, 열 단위 x/y 배열만 담은 간결한 그래프 데이터로 변환합니다.
+
+        :param data: {"date", "value", "name", "field"} 레코드 리스트
+        :param graph_type: 그래프 유형
+        :return: {"type", "title", "x", "y", "x_label", "y_label", "series_name"} 딕셔너리
+        """
+        field = data[0]["field"]
+        values = [item["value"] for item in data]
+        if graph_type == "line":
+            return {"type": "line", "title": f"{field} 추이", "x": [item["date"] for item in data], "y": values, "x_label": "날짜", "y_label": field, "series_name": field}
+        elif "점유율" in field.lower() or graph_type == "pie":
+            return {"type": "pie", "title": f"{field} 분포", "x": [item["name"] for item in data], "y": values, "x_label": "", "y_label": "", "series_name": field}
+        else:
+            return {"type": "bar", "title": f"{field} 그래프", "x": [item["name"] for item in data], "y": values, "x_label": "기업/분야", "y_label": field, "series_name": field}
+
+    def render_plotly(self, graph: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        간결한 그래프 데이터를 Plotly 그림(JSON 딕셔너리)으로 변환합니다. 같은 데이터는 캐시된 결과를 사용합니다.
+
+        :param graph: to_compact_graph가 만든 그래프 데이터
+        :return: Plotly 그림 딕셔너리
+        """
+        key = make_key("figure", graph)
+        figure = self.figure_cache.get(key)
+        if figure is None:
+            figure = json.loads(self._figure_from_compact(graph).to_json())
+            self.figure_cache[key] = figure
+        return figure
+
+    def summarize_graph(self, graph: Dict[str, Any], max_points: int = 20) -> str:
+        """
+        LLM 프롬프트에 넣을 그래프 데이터 요약을 만듭니다. 포인트가 많으면 고르게 골라서 포함합니다.
+
+        :param graph: to_compact_graph가 만든 그래프 데이터
+        :param max_points: 요약에 포함할 최대 데이터 포인트 수
+        :return: 요약 문자열
+        """
+        if not graph or not graph.get("y"):
+            return "그래프 데이터 없음"
+        x, y = graph["x"], graph["y"]
+        step = max(1, -(-len(y) // max_points))
+        indices = sorted(set(range(0, len(y), step)) | {len(y) - 1})
+        points = ", ".join(f"{x[i]}: {y[i]}" for i in indices)
+        return "\n".join([f"제목: {graph['title']} (유형: {graph['type']}, 포인트 {len(y)}개)", f"최고값: {max(y)}, 최저값: {min(y)}", f"데이터: {points}"])
+
+    async def _extract_from_candidates(self, query: str, organic: List[Dict[str, Any]], data_fields: List[str]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        상위 후보 URL을 LLM이 순위를 매기는 동안 미리 동시에 가져오고,
+        순위대로 데이터 추출을 시도하여 유효한 데이터가 나온 첫 페이지를 사용합니다.
+
+        :param query: 사용자 쿼리 문자열
+        :param organic: 웹 검색 결과 리스트
+        :param data_fields: 추출할 데이터 필드 리스트
+        :return: 추출된 데이터 리스트와 사용된 URL (실패 시 빈 리스트와 None)
+        """
+        deadline = get_deadline()
+        candidates = [item["link"] for item in organic[: settings.GRAPH_CANDIDATE_URLS] if str(item.get("link", "")).startswith("http")]
+        fetch_tasks = {url: asyncio.ensure_future(self._fetch_page_content(url)) for url in candidates}
+
+        try:
+            selected_url = None
+            if not deadline.has(settings.DEADLINE_ANSWER_RESERVE + settings.DEADLINE_MIN_GRAPH):
+                # 시간이 부족하면 LLM 순위 선정 없이 검색 순위대로 시도
+                deadline.skip("graph_url_ranking")
+            else:
+                try:
+                    selected_url = await self._select_most_relevant_url(query, organic)
+                except Exception as e:
+                    logger.warning(f"URL 순위 선정 실패, 검색 순위를 사용합니다: {str(e)}")
+
+            ranked_urls = candidates
+            if selected_url:
+                ranked_urls = [selected_url] + [url for url in candidates if url != selected_url]
+                if selected_url not in fetch_tasks:
+                    fetch_tasks[selected_url] = asyncio.ensure_future(self._fetch_page_content(selected_url))
+
+            for url in ranked_urls:
+                if not deadline.has(settings.DEADLINE_ANSWER_RESERVE):
+                    deadline.skip("graph_candidates")
+                    break
+                page = await fetch_tasks[url]
+                if not page or not page["text"]:
+                    logger.info(f"웹 페이지 내용을 가져오지 못해 다음 후보로 넘어갑니다: {url}")
+                    continue
+                processed_data = await self._extract_data_from_page(page, data_fields)
+                if processed_data:
+                    logger.info(f"데이터 추출에 사용된 URL: {url}")
+                    return processed_data, url
+                logger.info(f"유효한 데이터가 없어 다음 후보로 넘어갑니다: {url}")
+            return [], None
+        finally:
+            # 사용하지 않은 페이지 요청 정리
+            for task in fetch_tasks.values():
+                if not task.done():
+                    task.cancel()
+
+    @timed_stage("graph_analysis")
+    async def analyze_query(self, query: str) -> Tuple[str, List[str]]:
         """
         쿼리를 분석하여 그래프 유형과 데이터 필드를 결정합니다.
 
@@ -67,7 +262,7 @@ class GraphGenerator:
             input_variables=["query"],
             template="당신은 쿼리를 분석하여 그래프 유형과 필드를 결정해주는 AI 어시스턴트입니다. 다음 쿼리에서 요청된 그래프 유형(line, bar 또는 pie)과 데이터 필드를 추출하세요. 시계열 데이터인 경우 line을 선택하세요. 형식: 그래프 유형: [TYPE], 데이터 필드: [FIELD]\n\n쿼리: {query}",
         )
-        response = self.llm(prompt.format(query=query))
+        response = await self._invoke_llm(prompt.format(query=query))
         response_lines = response.content.split("\n")
         graph_type = "line"  # 기본값으로 line 설정 (시계열 데이터 가정)
         data_fields = ["경제성장률"]  # 기본 데이터 필드 설정
@@ -85,31 +280,48 @@ class GraphGenerator:
         logger.info(f"분석된 쿼리 - 그래프 유형: {graph_type}, 데이터 필드: {data_fields}")
         return graph_type, data_fields
 
-    async def _select_most_relevant_url(self, query: str, search_results: List[Dict[str, Any]]) -> str:
+    async def _select_most_relevant_url(self, query: str, search_results: List[Dict[str, Any]]) -> Optional[str]:
         logger.info(f"URL 선택 시작: {query}")
         prompt = PromptTemplate(
             input_variables=["query", "results"], template="다음 검색 결과 중에서 '{query}'와 가장 관련성 높은 URL을 선택하세요:\n\n{results}\n\n가장 관련성 높은 URL:"
         )
 
         results_text = "\n".join([f"제목: {result.get('title', '')}\nURL: {result.get('link', '')}\n" for result in search_results])
-        response = self.llm(prompt.format(query=query, results=results_text))
+        response = await self._invoke_llm(prompt.format(query=query, results=results_text))
 
         selected_url = response.content.strip()
         logger.info(f"선택된 URL: {selected_url}")
         return selected_url if selected_url.startswith("http") else None
 
-    async def _fetch_page_content(self, url: str) -> str:
-        logger.info(f"웹 페이지 내용 가져오기 시작: {url}")
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                html = await response.text()
-                soup = BeautifulSoup(html, "html.parser")
-                content = soup.get_text()
-                logger.info(f"웹 페이지 내용 가져오기 완료: {url}")
-                return content
+    async def _fetch_page_content(self, url: str) -> Optional[Dict[str, Any]]:
+        # 시간/크기 제한과 캐시가 적용된 페이지 가져오기
+        return await self.page_fetcher.fetch(url)
+
+    @timed_stage("graph_extraction")
+    async def _extract_data_from_page(self, page: Dict[str, Any], data_fields: List[str]) -> List[Dict[str, Any]]:
+        """
+        표와 연도-값 패턴을 규칙 기반으로 먼저 추출하고, 찾지 못한 경우에만 LLM으로 추출합니다.
+
+        :param page: PageFetcher가 반환한 페이지 딕셔너리
+        :param data_fields: 추출할 데이터 필드 리스트
+        :return: 추출된 데이터 리스트
+        """
+        # HTML 파싱은 CPU 작업이므로 스레드에서 실행
+        extracted_data = await asyncio.to_thread(self.data_extractor.extract, page["html"], page["text"], data_fields)
+        if extracted_data:
+            return extracted_data
+        deadline = get_deadline()
+        if not deadline.has(settings.DEADLINE_ANSWER_RESERVE + settings.DEADLINE_MIN_LLM_EXTRACTION):
+            # LLM 추출을 할 시간이 부족하면 이 페이지는 건너뜀
+            deadline.skip("graph_llm_extraction")
+            return []
+        logger.info("규칙 기반 추출 결과가 없어 LLM으로 추출합니다.")
+        return await self._extract_data_from_content(page["text"], data_fields)
 
     async def _extract_data_from_content(self, content: str, data_fields: List[str]) -> List[Dict[str, Any]]:
         logger.info("데이터 추출 시작")
+        # 페이지 전체 대신 요청 필드와 관련된 청크만 LLM에 전달 (토큰화/점수 계산은 CPU 작업이므로 스레드에서 실행)
+        content, _ = await asyncio.to_thread(self.chunk_selector.select, content, data_fields)
         prompt = PromptTemplate(
             input_variables=["content", "fields"],
             template="""다음 텍스트에서 {fields}에 관한 데이터를 추출하세요. 
@@ -122,7 +334,7 @@ class GraphGenerator:
             추출된 데이터:
             """,
         )
-        response = self.llm(prompt.format(content=content, fields=", ".join(data_fields)))
+        response = await self._invoke_llm(prompt.format(content=content, fields=", ".join(data_fields)))
 
         extracted_data = []
         for line in response.content.split("\n"):
@@ -132,36 +344,26 @@ class GraphGenerator:
                     year = parts[0].split(": ")[1]
                     value = parts[1].split(": ")[1]
                     try:
-                        extracted_data.append({"date": f"{year}-01-01", "value": float(value), "name": "대한민국", "field": data_fields[0] if data_fields else "경제성장률"})
+                        extracted_data.append({"date": f"{year}-01-01", "value": float(value), "name": DEFAULT_ENTITY, "field": data_fields[0] if data_fields else "경제성장률"})
                     except ValueError:
                         logger.warning(f"Invalid data point: {line}")
 
-        logger.info(f"추출된 데이터: {extracted_data}")
+        logger.info(f"LLM으로 추출된 데이터: {len(extracted_data)}개 데이터 포인트")
+        if debug_enabled(logger):
+            logger.debug(f"추출된 데이터 내용: {truncate(extracted_data)}")
         return extracted_data
 
-    def generate_graph(self, data: List[Dict[str, Any]], graph_type: str, query: str) -> go.Figure:
-        try:
-            if not data:
-                raise ValueError("그래프를 생성할 데이터가 없습니다.")
-
-            field = data[0]["field"]
-            logger.info(f"그래프 생성 시작 - 유형: {graph_type}, 필드: {field}")
-
-            if graph_type == "line":
-                fig = go.Figure(go.Scatter(x=[item["date"] for item in data], y=[item["value"] for item in data], mode="lines+markers", name=field))
-                fig.update_layout(title=f"{field} 추이", xaxis_title="날짜", yaxis_title=field)
-            elif "점유율" in field.lower() or graph_type == "pie":
-                fig = go.Figure(go.Pie(labels=[item["name"] for item in data], values=[item["value"] for item in data], textinfo="label+percent"))
-                fig.update_layout(title=f"{field} 분포")
-            else:
-                fig = go.Figure(go.Bar(x=[item["name"] for item in data], y=[item["value"] for item in data], text=[item["value"] for item in data], textposition="auto"))
-                fig.update_layout(title=f"{field} 그래프", xaxis_title="기업/분야", yaxis_title=field)
-
-            logger.info("그래프 생성 완료")
-            return fig
-        except Exception as e:
-            logger.error(f"그래프 생성 중 오류 발생: {str(e)}", exc_info=True)
-            return str(e)
+    def _figure_from_compact(self, graph: Dict[str, Any]) -> go.Figure:
+        if graph["type"] == "line":
+            fig = go.Figure(go.Scatter(x=graph["x"], y=graph["y"], mode="lines+markers", name=graph["series_name"]))
+            fig.update_layout(title=graph["title"], xaxis_title=graph["x_label"], yaxis_title=graph["y_label"])
+        elif graph["type"] == "pie":
+            fig = go.Figure(go.Pie(labels=graph["x"], values=graph["y"], textinfo="label+percent"))
+            fig.update_layout(title=graph["title"])
+        else:
+            fig = go.Figure(go.Bar(x=graph["x"], y=graph["y"], text=graph["y"], textposition="auto"))
+            fig.update_layout(title=graph["title"], xaxis_title=graph["x_label"], yaxis_title=graph["y_label"])
+        return fig
 
     def _create_error_graph(self, error_message: str) -> go.Figure:
         """
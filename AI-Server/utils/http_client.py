@@ -0,0 +1,42 @@
+import logging
+from typing import Optional
+
+import aiohttp
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 애플리케이션 전체에서 공유하는 HTTP 세션 (커넥션 풀 재사용)
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    공유 HTTP 세션을 반환합니다. 세션이 없거나 닫혀 있으면 새로 생성합니다.
+    이벤트 루프 안에서 호출해야 합니다.
+    :return: 공유 aiohttp.ClientSession
+    """
+    global _session
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=settings.HTTP_POOL_LIMIT,
+            limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300,
+            enable_cleanup_closed=True,
+        )
+        _session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=settings.HTTP_TOTAL_TIMEOUT))
+        logger.info(f"공유 HTTP 세션 생성 (풀 크기: {settings.HTTP_POOL_LIMIT}, 호스트당: {settings.HTTP_POOL_LIMIT_PER_HOST})")
+    return _session
+
+
+async def close_http_session() -> None:
+    """
+    공유 HTTP 세션을 닫습니다. 애플리케이션 종료 시 호출합니다.
+    """
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+        logger.info("공유 HTTP 세션 종료")
+    _session = None
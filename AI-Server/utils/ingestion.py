@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from config.settings import settings
+from utils.chunk_selector import split_into_chunks
+from utils.embedding_utils import get_embeddings
+from utils.logging_utils import setup_logging
+from utils.page_fetcher import get_page_fetcher
+from utils.vector_store import VectorStore
+from utils.web_search import WebSearch
+
+logger = logging.getLogger(__name__)
+
+
+class IngestRegistry:
+    """
+    수집한 URL별 본문 해시를 기록하는 SQLite 저장소
+    재수집 시 본문이 바뀌지 않은 페이지는 임베딩/저장을 생략합니다.
+    """
+
+    def __init__(self, path: str = settings.INGEST_REGISTRY_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS ingested_pages (url TEXT PRIMARY KEY, content_hash TEXT NOT NULL, chunks INTEGER NOT NULL, ingested_at REAL NOT NULL)")
+        self._db.commit()
+
+    def get_hash(self, url: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute("SELECT content_hash FROM ingested_pages WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def record(self, url: str, content_hash: str, chunks: int):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO ingested_pages (url, content_hash, chunks, ingested_at) VALUES (?, ?, ?, ?)", (url, content_hash, chunks, time.time()))
+            self._db.commit()
+
+
+class IngestionPipeline:
+    """
+    시드 쿼리/URL의 웹 페이지를 가져와 청크로 나누고, 배치 임베딩하여 벡터 저장소에 미리 저장하는 파이프라인
+    채팅 요청에서 벡터 검색으로 답할 수 있는 질문을 늘려 실시간 웹 검색 경로를 줄입니다.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        seed_queries: List[str] = None,
+        seed_urls: List[str] = None,
+        concurrency: int = settings.INGEST_CONCURRENCY,
+        registry: Optional[IngestRegistry] = None,
+    ):
+        """
+        :param vector_store: 수집한 텍스트를 저장할 벡터 저장소
+        :param seed_queries: 웹 검색으로 수집 대상 URL을 찾을 쿼리 리스트
+        :param seed_urls: 직접 수집할 URL 리스트
+        :param concurrency: 동시에 처리할 페이지 수
+        :param registry: URL별 본문 해시 저장소
+        """
+        self.vector_store = vector_store
+        self.seed_queries = settings.INGEST_SEED_QUERIES if seed_queries is None else seed_queries
+        self.seed_urls = settings.INGEST_SEED_URLS if seed_urls is None else seed_urls
+        self.concurrency = concurrency
+        self.registry = registry or IngestRegistry()
+        self.page_fetcher = get_page_fetcher()
+        self.web_search = WebSearch()
+
+    async def run_once(self) -> Dict[str, Any]:
+        """
+        시드 목록을 한 번 수집합니다.
+        :return: 처리 결과 통계 (pages, ingested, unchanged, failed, chunks)
+        """
+        start = time.perf_counter()
+        urls = await self._resolve_urls()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        stats = {"pages": len(urls), "ingested": 0, "unchanged": 0, "failed": 0, "chunks": 0}
+
+        async def ingest(url: str):
+            async with semaphore:
+                try:
+                    status, chunks = await self._ingest_url(url)
+                except Exception as e:
+                    logger.warning(f"페이지 수집 실패: {url} ({str(e)})")
+                    status, chunks = "failed", 0
+            stats[status] += 1
+            stats["chunks"] += chunks
+
+        await asyncio.gather(*(ingest(url) for url in urls))
+        logger.info(f"수집 완료 ({time.perf_counter() - start:.1f}초): {stats}")
+        return stats
+
+    async def run_forever(self, interval: float = settings.INGEST_INTERVAL):
+        """
+        주기적으로 수집을 반복합니다. (애플리케이션 백그라운드 작업용)
+        :param interval: 수집 간격(초)
+        """
+        while True:
+            try:
+                await self.run_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"주기적 수집 중 오류 발생: {str(e)}", exc_info=True)
+            await asyncio.sleep(interval)
+
+    async def _resolve_urls(self) -> List[str]:
+        # 시드 URL과 시드 쿼리의 검색 결과 URL을 순서를 유지하며 중복 제거
+        urls = list(self.seed_urls)
+        if self.seed_queries:
+            search_results = await self.web_search.search(self.seed_queries, num_results=settings.INGEST_RESULTS_PER_QUERY)
+            urls.extend(item.get("link", "") for item in search_results.get("organic", []))
+        return list(dict.fromkeys(url for url in urls if url.startswith("http")))
+
+    async def _ingest_url(self, url: str):
+        page = await self.page_fetcher.fetch(url)
+        if not page or not page["text"]:
+            return "failed", 0
+
+        content_hash = hashlib.sha256(page["text"].encode("utf-8")).hexdigest()
+        previous_hash = await asyncio.to_thread(self.registry.get_hash, url)
+        if previous_hash == content_hash:
+            return "unchanged", 0
+
+        chunks = [chunk for chunk in split_into_chunks(page["text"], settings.INGEST_CHUNK_CHARS) if len(chunk) >= settings.INGEST_MIN_CHUNK_CHARS]
+        chunks = chunks[: settings.INGEST_MAX_CHUNKS_PER_PAGE]
+        if not chunks:
+            return "failed", 0
+
+        embeddings = await asyncio.to_thread(get_embeddings, chunks, settings.INGEST_EMBED_BATCH_SIZE)
+        await asyncio.to_thread(self._replace_chunks, url, chunks, embeddings)
+        await asyncio.to_thread(self.registry.record, url, content_hash, len(chunks))
+        logger.info(f"페이지 수집: {url} ({len(chunks)}개 청크)")
+        return "ingested", len(chunks)
+
+    def _replace_chunks(self, url: str, chunks: List[str], embeddings: List[List[float]]):
+        # 이전 청크를 지우고 새 청크로 교체
+        # 해시 기록 전에 중단되었거나 레지스트리를 잃은 경우에도 중복이 쌓이지 않도록, 처음 수집하는 URL도 항상 먼저 삭제 (없으면 아무 일도 하지 않음)
+        self.vector_store.delete_by_url(url)
+        self.vector_store.add_embeddings(chunks, embeddings, urls=[url] * len(chunks))
+
+
+async def _main():
+    from utils.database import close_milvus_connection
+    from utils.http_client import close_http_session
+
+    setup_logging()
+    try:
+        pipeline = IngestionPipeline(VectorStore())
+        await pipeline.run_once()
+    finally:
+        await close_http_session()
+        close_milvus_connection()
+
+
+if __name__ == "__main__":
+    # 수동 실행: python -m utils.ingestion
+    asyncio.run(_main())
@@ -1,16 +1,24 @@
 import logging
-from openai import OpenAI
+from typing import Any, Dict, List
+from openai import AsyncOpenAI
 from config.settings import settings
+from utils.metrics import timed_stage
+from utils.rate_limiter import estimate_tokens, get_rate_limiter
+from utils.single_flight import get_single_flight, make_key
+from utils.transport import get_transport
 
 logger = logging.getLogger(__name__)
 
 
 class IntentAnalyzer:
     def __init__(self):
-        # OpenAI 클라이언트 초기화
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        # OpenAI 클라이언트 초기화 (재시도는 RateLimiter가 담당)
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+        self.rate_limiter = get_rate_limiter("openai")
+        self.transport = get_transport()
 
-    def analyze_intent(self, user_input: str) -> dict:
+    @timed_stage("intent")
+    async def analyze_intent(self, user_input: str) -> dict:
         """
         사용자 입력의 의도를 분석합니다.
         :param user_input: 사용자 입력 문자열
@@ -18,21 +26,29 @@ class IntentAnalyzer:
         """
         try:
             # OpenAI API를 사용하여 의도 분석 수행
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "당신은 사용자 의도를 분석하는 AI 어시스턴트입니다. 사용자의 의도를 분류하고 관련 키워드를 제공하세요."},
-                    {"role": "user", "content": f"다음 사용자 입력의 의도를 분석하세요: {user_input}"},
-                ],
-                max_tokens=100,
-                temperature=0.3,
-            )
-            intent_analysis = response.choices[0].message.content
+            messages = [
+                {"role": "system", "content": "당신은 사용자 의도를 분석하는 AI 어시스턴트입니다. 사용자의 의도를 분류하고 관련 키워드를 제공하세요."},
+                {"role": "user", "content": f"다음 사용자 입력의 의도를 분석하세요: {user_input}"},
+            ]
+            intent_analysis = await get_single_flight("llm").do(make_key("intent", user_input), lambda: self._complete(messages))
             return self._parse_intent_analysis(intent_analysis)
         except Exception as e:
             logger.error(f"의도 분석 중 오류 발생: {str(e)}")
             return {"category": "unknown", "keywords": []}
 
+    async def _complete(self, messages: List[Dict[str, str]]) -> str:
+        # 요청 제한을 적용하여 의도 분석 완성 요청 수행
+        request = {"model": settings.OPENAI_MODEL, "messages": messages, "max_tokens": 100, "temperature": 0.3}
+        return await self.rate_limiter.run(
+            lambda: self.transport.call("openai", request, lambda: self._create(request)),
+            tokens=estimate_tokens(*(m["content"] for m in messages), completion_tokens=100),
+        )
+
+    async def _create(self, request: Dict[str, Any]) -> str:
+        # 실제 OpenAI 완성 요청 (녹화/재생 시 전송 계층이 대신 응답할 수 있음)
+        response = await self.client.chat.completions.create(**request)
+        return response.choices[0].message.content
+
     def _parse_intent_analysis(self, analysis: str) -> dict:
         """
         OpenAI의 응답을 파싱하여 의도 카테고리와 키워드를 추출합니다.
@@ -0,0 +1,209 @@
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.settings import settings
+
+# 요청별 로그 문맥 (요청 ID, 디버그 로그 샘플링 여부)
+_request_id: contextvars.ContextVar[str] = contextvars.ContextVar("log_request_id", default="-")
+_debug_sampled: contextvars.ContextVar[bool] = contextvars.ContextVar("log_debug_sampled", default=False)
+
+# 샘플링된 요청에서 디버그 로그를 남길 애플리케이션 로거 (외부 라이브러리의 디버그 로그는 제외)
+APP_LOGGERS = ("app", "services", "utils", "main", "__main__")
+
+# 표준 LogRecord 속성 (extra로 전달된 필드를 구분하기 위함)
+_RECORD_ATTRS = set(logging.makeLogRecord({}).__dict__) | {"message", "asctime", "request_id"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_output_level = logging.DEBUG  # 샘플링 없이 출력되는 최소 레벨 (setup_logging에서 설정)
+
+
+def truncate(value: Any, limit: int = settings.LOG_MAX_PAYLOAD_CHARS) -> str:
+    """
+    로그에 남길 값을 문자열로 바꾸고 limit자로 자릅니다.
+    :param value: 로그에 남길 값 (문자열이 아니면 JSON 또는 str로 변환)
+    :param limit: 최대 길이
+    :return: 잘린 문자열 (잘렸으면 원래 길이를 덧붙임)
+    """
+    if not isinstance(value, str):
+        try:
+            value = json.dumps(value, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            value = str(value)
+    if len(value) <= limit:
+        return value
+    return f"{value[:limit]}...(+{len(value) - limit}자)"
+
+
+def debug_enabled(logger: logging.Logger) -> bool:
+    """
+    현재 요청에서 logger의 DEBUG 로그가 실제로 출력되는지 확인합니다.
+    디버그 로그 샘플링이 켜져 있으면 로거 레벨은 항상 DEBUG이므로, 로그 내용을 만드는 비용이 큰 경우 이 함수로 먼저 확인합니다.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    return _output_level <= logging.DEBUG or (_debug_sampled.get() and logger.name.startswith(APP_LOGGERS))
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    로그를 남기는 스레드에서 요청 ID를 기록에 추가하고,
+    설정한 로그 레벨 미만의 기록은 샘플링된 요청의 애플리케이션 로그만 통과시킵니다.
+    """
+
+    def __init__(self, level: int):
+        super().__init__()
+        self.level = level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = _request_id.get()
+        if record.levelno >= self.level:
+            return True
+        return _debug_sampled.get() and record.name.startswith(APP_LOGGERS)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    로그 기록을 큐에 넣기만 하는 핸들러 (출력은 백그라운드 스레드에서 수행)
+    큐가 가득 차면 요청 처리를 막지 않도록 기록을 버리고 개수만 셉니다.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 메시지와 예외는 호출 스레드에서 문자열로 만들어 두고, 잘라내기/직렬화는 출력 스레드에서 수행
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg, record.args, record.exc_info = record.message, None, None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    로그 기록을 JSON 한 줄(json) 또는 사람이 읽기 쉬운 한 줄(text)로 만듭니다. 메시지는 max_chars자로 자릅니다.
+    """
+
+    def __init__(self, fmt: str = settings.LOG_FORMAT, max_chars: int = settings.LOG_MAX_MESSAGE_CHARS):
+        super().__init__()
+        self.fmt = fmt
+        self.max_chars = max_chars
+
+    def format(self, record: logging.LogRecord) -> str:
+        message = truncate(record.getMessage(), self.max_chars)
+        extra = {key: value for key, value in record.__dict__.items() if key not in _RECORD_ATTRS}
+        if self.fmt == "json":
+            entry = {
+                "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+                "level": record.levelname,
+                "logger": record.name,
+                "request_id": getattr(record, "request_id", "-"),
+                "message": message,
+                **{key: truncate(value, self.max_chars) if isinstance(value, str) else value for key, value in extra.items()},
+            }
+            if record.exc_text:
+                entry["exc_info"] = record.exc_text
+            return json.dumps(entry, ensure_ascii=False, default=str)
+
+        line = f"{self.formatTime(record)} - {record.levelname} - [{getattr(record, 'request_id', '-')}] {record.name} - {message}"
+        if extra:
+            line += " " + " ".join(f"{key}={truncate(value, self.max_chars)}" for key, value in extra.items())
+        if record.exc_text:
+            line += "\n" + record.exc_text
+        return line
+
+
+def setup_logging(level: str = settings.LOG_LEVEL, fmt: str = settings.LOG_FORMAT):
+    """
+    루트 로거가 큐 핸들러를 거쳐 백그라운드 스레드에서 출력하도록 설정합니다. (프로세스당 한 번)
+    디버그 로그 샘플링이 켜져 있으면 루트 로거 레벨을 DEBUG로 낮추고 필터에서 요청별로 거릅니다.
+    :param level: 로그 레벨
+    :param fmt: 출력 형식 ("json" 또는 "text")
+    """
+    global _listener, _output_level
+    if _listener is not None:
+        return
+
+    level_no = logging.getLevelName(level.upper()) if isinstance(level, str) else level
+    if not isinstance(level_no, int):
+        level_no = logging.INFO
+    _output_level = level_no
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(RequestContextFilter(level_no))
+
+    output_handler = logging.StreamHandler(sys.stderr)
+    output_handler.setFormatter(StructuredFormatter(fmt))
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    root.setLevel(min(level_no, logging.DEBUG) if settings.LOG_DEBUG_SAMPLE_RATE > 0 else level_no)
+
+    _listener = logging.handlers.QueueListener(log_queue, output_handler, respect_handler_level=False)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """
+    큐에 남은 로그를 모두 출력하고 백그라운드 출력 스레드를 종료합니다.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestLogContextMiddleware:
+    """
+    요청마다 요청 ID(X-Request-ID 헤더 또는 새로 생성)와 디버그 로그 샘플링 여부를 정하는 ASGI 미들웨어
+    응답에도 X-Request-ID 헤더를 추가하여 클라이언트 로그와 서버 로그를 연결할 수 있게 합니다.
+    """
+
+    def __init__(self, app: ASGIApp, sample_rate: float = settings.LOG_DEBUG_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = Headers(scope=scope).get("x-request-id") or uuid.uuid4().hex[:16]
+        id_token = _request_id.set(request_id[:64])
+        sampled_token = _debug_sampled.set(self.sample_rate > 0 and random.random() < self.sample_rate)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = _request_id.get()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_id.reset(id_token)
+            _debug_sampled.reset(sampled_token)
@@ -0,0 +1,405 @@
+import asyncio
+import contextvars
+import functools
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, suppress
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 지연 시간 히스토그램 버킷(초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# 현재 요청에서 기록된 단계별 소요 시간 [(단계, 초), ...] (요청 밖에서는 None)
+_request_stages: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar("request_stages", default=None)
+
+# 단계가 끝날 때마다 호출할 콜백 (백그라운드 작업의 진행 상황 알림용)
+_stage_listener: contextvars.ContextVar[Optional[Callable[[str, float], None]]] = contextvars.ContextVar("stage_listener", default=None)
+
+# 여러 요청이 공유하는 작업(single flight) 안에서 기록된 단계를 기다리는 요청들에 전달하는 대상
+_stage_fanout: contextvars.ContextVar[Optional["StageFanout"]] = contextvars.ContextVar("stage_fanout", default=None)
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    # 지표는 워커 프로세스별로 집계되므로 모든 샘플에 worker 레이블을 붙임
+    # (fork 이전에 임포트되어도 워커마다 달라지도록 렌더링 시점의 프로세스 ID 사용)
+    pairs = [("worker", str(os.getpid()))] + list(key) + ([extra] if extra else [])
+    escaped = (f'{name}="{value.replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34)).replace(chr(10), " ")}"' for name, value in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+class Counter:
+    """레이블별 누적 카운터"""
+
+    def __init__(self, name: str, help: str):
+        self.name = name
+        self.help = help
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1.0, **labels: str):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            lines.extend(f"{self.name}{_format_labels(key)} {value}" for key, value in sorted(self._values.items()))
+        return lines
+
+
+class Histogram:
+    """레이블별 누적 버킷 히스토그램"""
+
+    def __init__(self, name: str, help: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(sorted(buckets))
+        self._values: Dict[LabelKey, List[float]] = {}  # [버킷별 개수..., +Inf 개수, 합계]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = _label_key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            values = self._values.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            values[index] += 1
+            values[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, list(values)) for key, values in self._values.items())
+        for key, values in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', repr(bound)))} {cumulative}")
+            cumulative += values[len(self.buckets)]
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {values[-1]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {cumulative}")
+        return lines
+
+
+STAGE_DURATION = Histogram("jiwoo_stage_duration_seconds", "파이프라인 단계별 소요 시간")
+STAGE_ERRORS = Counter("jiwoo_stage_errors_total", "파이프라인 단계별 오류 수")
+HTTP_DURATION = Histogram("jiwoo_http_request_duration_seconds", "HTTP 요청 처리 시간")
+HTTP_REQUESTS = Counter("jiwoo_http_requests_total", "HTTP 요청 수")
+
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[None]:
+    """
+    코드 블록의 소요 시간을 단계 이름으로 기록합니다. 예외가 발생하면 단계 오류 수도 증가시킵니다.
+    :param stage: 단계 이름 (예: "intent", "vector_search")
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except asyncio.CancelledError:
+        raise
+    except Exception:
+        STAGE_ERRORS.inc(stage=stage)
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def record_stage(stage: str, seconds: float):
+    """
+    단계 소요 시간을 히스토그램과 (요청 안이면) 요청별 단계 기록에 추가합니다.
+    """
+    STAGE_DURATION.observe(seconds, stage=stage)
+    fanout = _stage_fanout.get()
+    if fanout is not None:
+        fanout.record(stage, seconds)
+        return
+    _deliver_stage((_request_stages.get(), _stage_listener.get()), stage, seconds)
+
+
+def _deliver_stage(target: Tuple[Optional[List[Tuple[str, float]]], Optional[Callable[[str, float], None]]], stage: str, seconds: float):
+    stages, listener = target
+    if stages is not None:
+        stages.append((stage, seconds))
+    if listener is not None:
+        listener(stage, seconds)
+
+
+class StageFanout:
+    """
+    여러 요청이 함께 기다리는 공유 작업의 단계 기록
+    공유 작업은 특정 요청의 컨텍스트 밖에서 실행되므로, 작업 안에서 끝난 단계를 결과를 기다리는 모든 요청의
+    단계 기록과 단계 리스너에 전달합니다. 나중에 합류한 요청에는 이미 끝난 단계도 전달합니다. (히스토그램에는 한 번만 기록)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._recorded: List[Tuple[str, float]] = []
+        self._targets: List[Tuple[Optional[List[Tuple[str, float]]], Optional[Callable[[str, float], None]]]] = []
+
+    def bind(self):
+        """
+        현재 컨텍스트에서 기록되는 단계를 이 객체로 보냅니다. (공유 작업을 실행할 컨텍스트 안에서 호출)
+        """
+        _stage_fanout.set(self)
+
+    def attach(self) -> Any:
+        """
+        현재 요청을 단계 전달 대상으로 추가합니다. (결과를 기다리는 호출자의 컨텍스트에서 호출)
+        :return: detach에 전달할 대상
+        """
+        target = (_request_stages.get(), _stage_listener.get())
+        with self._lock:
+            recorded = list(self._recorded)
+            self._targets.append(target)
+        for stage, seconds in recorded:
+            _deliver_stage(target, stage, seconds)
+        return target
+
+    def detach(self, target: Any):
+        with self._lock:
+            if target in self._targets:
+                self._targets.remove(target)
+
+    def record(self, stage: str, seconds: float):
+        with self._lock:
+            self._recorded.append((stage, seconds))
+            targets = list(self._targets)
+        for target in targets:
+            _deliver_stage(target, stage, seconds)
+
+
+def timed_stage(stage: str) -> Callable:
+    """
+    함수(동기/비동기) 호출의 소요 시간을 단계 이름으로 기록하는 데코레이터
+    :param stage: 단계 이름
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with track_stage(stage):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with track_stage(stage):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def stage_listener(callback: Callable[[str, float], None]) -> Iterator[None]:
+    """
+    블록 안에서 (생성된 태스크 포함) 단계가 끝날 때마다 callback(단계, 초)을 호출합니다.
+    """
+    token = _stage_listener.set(callback)
+    try:
+        yield
+    finally:
+        _stage_listener.reset(token)
+
+
+def get_request_stages() -> List[Tuple[str, float]]:
+    """
+    현재 요청에서 지금까지 기록된 단계별 소요 시간을 반환합니다.
+    """
+    return list(_request_stages.get() or [])
+
+
+class MetricsMiddleware:
+    """
+    HTTP 요청 처리 시간을 기록하고, 요청별 단계 기록을 시작하는 ASGI 미들웨어
+    디버그 모드에서는 단계별 소요 시간을 Server-Timing 헤더로 응답에 추가합니다.
+    """
+
+    def __init__(self, app: ASGIApp, debug: bool = settings.DEBUG):
+        self.app = app
+        self.debug = debug
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        stages: List[Tuple[str, float]] = []
+        token = _request_stages.set(stages)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.debug and stages:
+                    MutableHeaders(scope=message)["Server-Timing"] = format_server_timing(stages, time.perf_counter() - start)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stages.reset(token)
+            # 경로 레이블은 라우트 템플릿을 사용하여 레이블 수가 늘어나지 않도록 함
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            elapsed = time.perf_counter() - start
+            HTTP_DURATION.observe(elapsed, method=scope["method"], path=path)
+            HTTP_REQUESTS.inc(method=scope["method"], path=path, status=str(status))
+            if self.debug and stages:
+                logger.debug(f"{scope['method']} {path} {elapsed * 1000:.1f}ms 단계: {format_server_timing(stages, elapsed)}")
+
+
+def format_server_timing(stages: List[Tuple[str, float]], total: float) -> str:
+    """
+    단계별 소요 시간을 Server-Timing 헤더 형식으로 만듭니다. 같은 단계가 여러 번 실행되면 합산합니다.
+    """
+    totals: Dict[str, Tuple[float, int]] = {}
+    for stage, seconds in stages:
+        previous, count = totals.get(stage, (0.0, 0))
+        totals[stage] = (previous + seconds, count + 1)
+    parts = [f'{stage};dur={seconds * 1000:.1f};desc="x{count}"' if count > 1 else f"{stage};dur={seconds * 1000:.1f}" for stage, (seconds, count) in totals.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+# 누적값이 아닌 현재값 통계 (게이지로 노출하고, 나머지는 카운터로 노출)
+_GAUGE_STATS = frozenset({"active", "max_connections", "size", "hit_rate", "queue_wait_max"})
+
+
+def _render_stats(name: str, help: str, label: str, stats: Dict[str, Dict[str, Any]]) -> List[List[str]]:
+    # 기존 모듈의 통계 딕셔너리를 {label, stat} 레이블의 카운터(누적값, {name}_total)와 게이지(현재값, {name})로 변환
+    counters = [f"# HELP {name}_total {help}", f"# TYPE {name}_total counter"]
+    gauges = [f"# HELP {name} {help} (현재값)", f"# TYPE {name} gauge"]
+    for owner, values in sorted(stats.items()):
+        for stat, value in sorted(values.items()):
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                labels = _format_labels(_label_key({label: owner, "stat": stat}))
+                if stat in _GAUGE_STATS:
+                    gauges.append(f"{name}{labels} {value}")
+                else:
+                    counters.append(f"{name}_total{labels} {value}")
+    return [family for family in (counters, gauges) if len(family) > 2]
+
+
+def _collect_families() -> List[List[str]]:
+    # 현재 워커의 지표를 [HELP 줄, TYPE 줄, 샘플...] 단위로 수집
+    from services.chat_socket import get_chat_socket_stats
+    from utils.page_fetcher import get_page_fetcher
+    from utils.rate_limiter import get_rate_limiter_stats
+    from utils.search_cache import get_search_cache
+    from utils.series_store import get_series_store
+    from utils.single_flight import get_single_flight_stats
+    from utils.transport import get_transport
+
+    caches = {"search": get_search_cache().get_stats(), "page": get_page_fetcher().stats}
+    series_store = get_series_store()
+    if series_store is not None:
+        caches["series"] = series_store.stats
+
+    families = [metric.render() for metric in (HTTP_REQUESTS, HTTP_DURATION, STAGE_DURATION, STAGE_ERRORS)]
+    families.extend(_render_stats("jiwoo_cache", "캐시 적중/실패 통계", "cache", caches))
+    families.extend(_render_stats("jiwoo_upstream", "업스트림 요청 수, 예상 토큰 수, 재시도, 오류, 대기 시간 통계", "upstream", get_rate_limiter_stats()))
+    families.extend(_render_stats("jiwoo_single_flight", "동일 요청 병합 통계", "flight", get_single_flight_stats()))
+    families.extend(_render_stats("jiwoo_transport", "외부 호출 전송 계층 통계", "transport", {get_transport().mode: get_transport().stats}))
+    families.extend(_render_stats("jiwoo_websocket", "WebSocket 채팅 연결 수, 전송 대기열 초과, 전송 지연 통계", "socket", get_chat_socket_stats()))
+    return families
+
+
+def _snapshot_path(pid: int) -> str:
+    return os.path.join(settings.METRICS_MULTIPROC_DIR, f"metrics-{pid}.json")
+
+
+def _write_snapshot(families: List[List[str]]):
+    # 읽는 쪽이 쓰다 만 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+    os.makedirs(settings.METRICS_MULTIPROC_DIR, exist_ok=True)
+    path = _snapshot_path(os.getpid())
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(families, f, ensure_ascii=False)
+    os.replace(f"{path}.tmp", path)
+
+
+def remove_metrics_snapshot(pid: Optional[int] = None):
+    """
+    워커가 종료될 때 공유 디렉터리에서 워커의 지표 스냅샷을 삭제합니다.
+    :param pid: 워커 프로세스 ID (없으면 현재 프로세스)
+    """
+    with suppress(FileNotFoundError):
+        os.remove(_snapshot_path(pid or os.getpid()))
+
+
+async def run_metrics_snapshots(interval: float = settings.METRICS_SNAPSHOT_INTERVAL):
+    """
+    현재 워커의 지표를 주기적으로 METRICS_MULTIPROC_DIR에 기록합니다. (애플리케이션 백그라운드 작업용)
+    다른 워커가 /metrics 요청을 받으면 이 스냅샷을 합쳐서 반환합니다.
+    :param interval: 기록 간격(초)
+    """
+    try:
+        while True:
+            try:
+                await asyncio.to_thread(_write_snapshot, _collect_families())
+            except OSError as e:
+                logger.warning(f"지표 스냅샷 기록 실패: {str(e)}")
+            await asyncio.sleep(interval)
+    finally:
+        remove_metrics_snapshot()
+
+
+def _merge_snapshots(families: List[List[str]]) -> List[List[str]]:
+    # 같은 지표의 HELP/TYPE 줄은 한 번만 쓰고 워커별 샘플을 이어 붙임 (샘플은 worker 레이블로 구분)
+    merged: Dict[str, List[str]] = {}
+    own_path = _snapshot_path(os.getpid())
+    # 종료되었거나 비정상 종료된 워커의 오래된 스냅샷은 제외
+    cutoff = time.time() - settings.METRICS_SNAPSHOT_INTERVAL * 4
+    snapshots = [families]
+    for path in sorted(glob.glob(os.path.join(settings.METRICS_MULTIPROC_DIR, "metrics-*.json"))):
+        if path == own_path:
+            continue
+        try:
+            if os.path.getmtime(path) < cutoff:
+                continue
+            with open(path, encoding="utf-8") as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"지표 스냅샷 읽기 실패: {path} ({str(e)})")
+    for snapshot in snapshots:
+        for family in snapshot:
+            merged.setdefault(family[0], family[:2]).extend(family[2:])
+    return list(merged.values())
+
+
+def render_prometheus() -> str:
+    """
+    모든 지표를 Prometheus 텍스트 형식으로 반환합니다.
+    캐시 적중, 요청 병합, 업스트림 요청/토큰/오류, WebSocket 연결 통계는 각 모듈의 통계를 그대로 노출합니다.
+    모든 샘플에는 worker 레이블이 붙고, METRICS_MULTIPROC_DIR이 설정되어 있으면 다른 워커의 최근 스냅샷도 함께 반환합니다.
+    """
+    families = _collect_families()
+    if settings.METRICS_MULTIPROC_DIR:
+        families = _merge_snapshots(families)
+    return "\n".join(line for family in families for line in family) + "\n"
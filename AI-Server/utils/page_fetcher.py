@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import re
+from typing import Any, Dict, Optional
+
+import aiohttp
+from bs4 import BeautifulSoup
+from cachetools import TTLCache
+
+from config.settings import settings
+from utils.http_client import get_http_session
+from utils.metrics import timed_stage
+from utils.single_flight import get_single_flight, make_key
+from utils.transport import get_transport
+
+logger = logging.getLogger(__name__)
+
+# lxml이 설치되어 있으면 C 기반 파서를 사용하고, 없으면 내장 파서로 대체
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# 본문과 무관한 태그 (텍스트 추출 전에 제거)
+BOILERPLATE_TAGS = ["script", "style", "noscript", "nav", "header", "footer", "aside", "form", "iframe", "svg", "button"]
+
+ALLOWED_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+_META_CHARSET_PATTERN = re.compile(rb"""<meta[^>]+charset=["']?([\w-]+)""", re.IGNORECASE)
+
+
+def extract_text(html: str) -> str:
+    """
+    HTML에서 본문 텍스트를 추출합니다. 스크립트/스타일/내비게이션 등 불필요한 영역은 제거합니다.
+    :param html: HTML 문자열
+    :return: 줄 단위로 정리된 본문 텍스트
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    for tag in soup(BOILERPLATE_TAGS):
+        tag.decompose()
+    lines = (re.sub(r"[ \t\xa0]+", " ", line).strip() for line in soup.get_text(separator="\n").splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+class PageFetcher:
+    """
+    웹 페이지를 제한된 시간과 크기 안에서 스트리밍으로 가져오는 클래스
+    가져온 페이지는 URL별로 짧은 TTL 동안 캐시합니다.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = settings.PAGE_FETCH_MAX_BYTES,
+        connect_timeout: float = settings.PAGE_FETCH_CONNECT_TIMEOUT,
+        read_timeout: float = settings.PAGE_FETCH_READ_TIMEOUT,
+        total_timeout: float = settings.PAGE_FETCH_TOTAL_TIMEOUT,
+        cache_ttl: float = settings.PAGE_CACHE_TTL,
+        cache_max_chars: int = settings.PAGE_CACHE_MAX_CHARS,
+    ):
+        self.max_bytes = max_bytes
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, sock_connect=connect_timeout, sock_read=read_timeout)
+        # 캐시 크기는 항목 수가 아니라 저장된 HTML과 텍스트의 글자 수로 제한
+        self.cache = TTLCache(maxsize=cache_max_chars, ttl=cache_ttl, getsizeof=lambda page: len(page["html"]) + len(page["text"]))
+        self.headers = {"User-Agent": "Mozilla/5.0 (compatible; JiwooBot/1.0)", "Accept": "text/html,application/xhtml+xml,text/plain;q=0.9"}
+        self.stats = {"hits": 0, "misses": 0, "failures": 0, "truncated": 0}
+        self.transport = get_transport()
+
+    @timed_stage("page_fetch")
+    async def fetch(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        웹 페이지를 가져옵니다.
+        :param url: 가져올 URL
+        :return: {"url", "content_type", "html", "text", "truncated"} 딕셔너리, 실패 시 None
+        """
+        page = self.cache.get(url)
+        if page is not None:
+            self.stats["hits"] += 1
+            return page
+
+        self.stats["misses"] += 1
+        # 동시에 들어온 같은 URL 요청은 한 번만 가져옴
+        page = await get_single_flight("page_fetch").do(make_key(url), lambda: self.transport.call("page", url, lambda: self._download(url)))
+        if page is None:
+            self.stats["failures"] += 1
+            return None
+
+        try:
+            self.cache[url] = page
+        except ValueError:
+            # 단일 페이지가 캐시 전체 크기보다 크면 캐시하지 않음
+            pass
+        return page
+
+    async def _download(self, url: str) -> Optional[Dict[str, Any]]:
+        logger.debug(f"웹 페이지 내용 가져오기 시작: {url}")
+        try:
+            async with get_http_session().get(url, timeout=self.timeout, headers=self.headers, allow_redirects=True) as response:
+                if response.status != 200:
+                    logger.warning(f"웹 페이지 응답 오류 {response.status}: {url}")
+                    return None
+
+                content_type = response.headers.get("Content-Type", "").lower()
+                if content_type and not any(allowed in content_type for allowed in ALLOWED_CONTENT_TYPES):
+                    logger.warning(f"지원하지 않는 콘텐츠 유형 {content_type}: {url}")
+                    return None
+
+                body, truncated = await self._read_capped(response)
+                charset = response.charset or self._sniff_charset(body) or "utf-8"
+        except asyncio.TimeoutError:
+            logger.warning(f"웹 페이지 가져오기 시간 초과: {url}")
+            return None
+        except aiohttp.ClientError as e:
+            logger.warning(f"웹 페이지 가져오기 실패: {url} ({str(e)})")
+            return None
+
+        try:
+            html = body.decode(charset, errors="replace")
+        except LookupError:
+            html = body.decode("utf-8", errors="replace")
+
+        if "text/plain" in content_type:
+            text = html
+        else:
+            # 파싱은 CPU 작업이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+            text = await asyncio.to_thread(extract_text, html)
+
+        if truncated:
+            self.stats["truncated"] += 1
+        logger.info(f"웹 페이지 내용 가져오기 완료: {url} ({len(body)} bytes{', 잘림' if truncated else ''})")
+        return {"url": url, "content_type": content_type, "html": html, "text": text, "truncated": truncated}
+
+    async def _read_capped(self, response: aiohttp.ClientResponse):
+        # 최대 크기까지만 스트리밍으로 읽음
+        chunks = []
+        size = 0
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= self.max_bytes:
+                return b"".join(chunks)[: self.max_bytes], True
+        return b"".join(chunks), False
+
+    def _sniff_charset(self, body: bytes) -> Optional[str]:
+        # Content-Type 헤더에 charset이 없으면 meta 태그에서 찾음 (국내 사이트의 EUC-KR 대응)
+        match = _META_CHARSET_PATTERN.search(body[:4096])
+        return match.group(1).decode("ascii", errors="ignore") if match else None
+
+
+_page_fetcher: Optional[PageFetcher] = None
+
+
+def get_page_fetcher() -> PageFetcher:
+    """
+    프로세스에서 공유하는 PageFetcher를 반환합니다.
+    """
+    global _page_fetcher
+    if _page_fetcher is None:
+        _page_fetcher = PageFetcher()
+    return _page_fetcher
@@ -1,6 +1,10 @@
 import logging
-from openai import OpenAI
+from openai import AsyncOpenAI
 from config.settings import settings
+from utils.metrics import timed_stage
+from utils.rate_limiter import estimate_tokens, get_rate_limiter
+from utils.single_flight import get_single_flight, make_key
+from utils.transport import get_transport
 from typing import List, Dict, Any
 
 logger = logging.getLogger(__name__)
@@ -8,9 +12,12 @@ logger = logging.getLogger(__name__)
 
 class QueryGenerator:
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        self.client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+        self.rate_limiter = get_rate_limiter("openai")
+        self.transport = get_transport()
 
-    def generate_queries(self, user_input: str, intent: Dict[str, Any]) -> List[str]:
+    @timed_stage("query_generation")
+    async def generate_queries(self, user_input: str, intent: Dict[str, Any]) -> List[str]:
         """
         사용자 입력과 의도 분석을 바탕으로 여러 개의 검색 쿼리를 생성합니다.
         :param user_input: 사용자 입력 문자열
@@ -22,17 +29,26 @@ class QueryGenerator:
             keywords = intent.get("keywords", [])
             keyword_str = ", ".join(keywords) if keywords else user_input
 
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": "당신은 사용자 입력과 키워드를 바탕으로 다양한 검색 쿼리를 생성하는 AI 어시스턴트입니다."},
-                    {"role": "user", "content": f"다음 키워드를 바탕으로 5개의 다양한 검색 쿼리를 생성하세요. 각 쿼리는 새로운 줄에 작성하세요: {keyword_str}"},
-                ],
-                max_tokens=200,
-                temperature=0.7,
-            )
-            queries = response.choices[0].message.content.split("\n")
+            messages = [
+                {"role": "system", "content": "당신은 사용자 입력과 키워드를 바탕으로 다양한 검색 쿼리를 생성하는 AI 어시스턴트입니다."},
+                {"role": "user", "content": f"다음 키워드를 바탕으로 5개의 다양한 검색 쿼리를 생성하세요. 각 쿼리는 새로운 줄에 작성하세요: {keyword_str}"},
+            ]
+            content = await get_single_flight("llm").do(make_key("queries", keyword_str), lambda: self._complete(messages))
+            queries = content.split("\n")
             return [query.strip() for query in queries if query.strip()][:5]  # 최대 5개의 쿼리만 반환
         except Exception as e:
             logger.error(f"쿼리 생성 중 오류 발생: {str(e)}")
             return [user_input]  # 오류 발생 시 원래 사용자 입력을 그대로 반환
+
+    async def _complete(self, messages: List[Dict[str, str]]) -> str:
+        # 요청 제한을 적용하여 쿼리 생성 완성 요청 수행
+        request = {"model": settings.OPENAI_MODEL, "messages": messages, "max_tokens": 200, "temperature": 0.7}
+        return await self.rate_limiter.run(
+            lambda: self.transport.call("openai", request, lambda: self._create(request)),
+            tokens=estimate_tokens(*(m["content"] for m in messages), completion_tokens=200),
+        )
+
+    async def _create(self, request: Dict[str, Any]) -> str:
+        # 실제 OpenAI 완성 요청 (녹화/재생 시 전송 계층이 대신 응답할 수 있음)
+        response = await self.client.chat.completions.create(**request)
+        return response.choices[0].message.content
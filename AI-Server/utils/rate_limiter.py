@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config.settings import settings
+from utils.deadline import get_deadline
+
+logger = logging.getLogger(__name__)
+
+# 재시도 대상 HTTP 상태 코드
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RateLimitTimeout(Exception):
+    """대기열에서 마감 시간 안에 실행 슬롯을 얻지 못했을 때 발생하는 예외"""
+
+
+class TokenBucket:
+    """분당 허용량을 기준으로 채워지는 토큰 버킷"""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_consume(self, amount: float) -> float:
+        """
+        토큰을 소비합니다.
+        :param amount: 소비할 토큰 수 (버킷 용량을 넘으면 용량으로 제한)
+        :return: 0이면 소비 성공, 양수면 필요한 대기 시간(초)
+        """
+        amount = min(amount, self.capacity)
+        self._refill()
+        if self.tokens >= amount:
+            self.tokens -= amount
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """
+    업스트림 API별 요청 제한기
+    분당 요청 수(RPM)와 분당 토큰 수(TPM) 토큰 버킷, 동시 실행 세마포어를 함께 적용하고
+    429/5xx 응답은 지터가 적용된 지수 백오프로 재시도합니다.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        requests_per_minute: int,
+        tokens_per_minute: int = 0,
+        max_concurrency: int = 8,
+        queue_timeout: float = settings.RATE_LIMIT_QUEUE_TIMEOUT,
+        max_retries: int = settings.RATE_LIMIT_MAX_RETRIES,
+        backoff_base: float = settings.RATE_LIMIT_BACKOFF_BASE,
+        backoff_max: float = settings.RATE_LIMIT_BACKOFF_MAX,
+    ):
+        self.name = name
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.queue_lock = asyncio.Lock()  # 대기 순서를 FIFO로 보장
+        self.queue_timeout = queue_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = {"requests": 0, "tokens": 0, "retries": 0, "rejected": 0, "failures": 0, "queue_wait_total": 0.0, "queue_wait_max": 0.0}
+
+    async def run(self, func: Callable[[], Awaitable[Any]], tokens: int = 0, timeout: Optional[float] = None) -> Any:
+        """
+        제한을 적용하여 비동기 호출을 실행합니다.
+        :param func: 호출할 코루틴을 반환하는 함수 (재시도 시 다시 호출됨)
+        :param tokens: 호출이 사용할 것으로 예상되는 토큰 수 (TPM 제한용)
+        :param timeout: 대기열에서 기다릴 최대 시간(초)
+        :return: func의 결과
+        """
+        # 요청의 남은 시간 예산보다 오래 대기열에서 기다리지 않음
+        timeout = get_deadline().cap(self.queue_timeout if timeout is None else timeout)
+        attempt = 0
+        while True:
+            deadline = time.monotonic() + timeout
+            await self._acquire(tokens, deadline)
+            try:
+                self.stats["requests"] += 1
+                self.stats["tokens"] += tokens
+                return await func()
+            except Exception as e:
+                status = _status_code(e)
+                if status not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    self.stats["failures"] += 1
+                    raise
+                attempt += 1
+                self.stats["retries"] += 1
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+                logger.warning(f"[{self.name}] 업스트림 응답 {status}, {delay:.2f}초 후 재시도 ({attempt}/{self.max_retries})")
+            finally:
+                self.semaphore.release()
+            await asyncio.sleep(delay)
+
+    async def _acquire(self, tokens: int, deadline: float):
+        # 버킷과 세마포어를 마감 시간 안에 획득
+        started_at = time.monotonic()
+        try:
+            async with self.queue_lock:
+                while True:
+                    wait = self._try_consume(tokens)
+                    if wait <= 0:
+                        break
+                    if time.monotonic() + wait > deadline:
+                        raise RateLimitTimeout(f"[{self.name}] 요청 한도 대기 시간 초과")
+                    await asyncio.sleep(wait)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RateLimitTimeout(f"[{self.name}] 동시 실행 슬롯 대기 시간 초과")
+            try:
+                await asyncio.wait_for(self.semaphore.acquire(), timeout=remaining)
+            except asyncio.TimeoutError:
+                raise RateLimitTimeout(f"[{self.name}] 동시 실행 슬롯 대기 시간 초과")
+        except RateLimitTimeout:
+            self.stats["rejected"] += 1
+            raise
+
+        waited = time.monotonic() - started_at
+        self.stats["queue_wait_total"] += waited
+        self.stats["queue_wait_max"] = max(self.stats["queue_wait_max"], waited)
+        if waited > 0.1:
+            logger.info(f"[{self.name}] 대기열 대기 시간: {waited:.2f}초")
+
+    def _try_consume(self, tokens: int) -> float:
+        # 두 버킷 모두에서 소비 가능할 때만 소비 (한쪽만 소비되는 것을 방지)
+        waits = []
+        if self.request_bucket:
+            self.request_bucket._refill()
+            if self.request_bucket.tokens < 1:
+                waits.append((1 - self.request_bucket.tokens) / self.request_bucket.rate)
+        if self.token_bucket and tokens > 0:
+            self.token_bucket._refill()
+            amount = min(tokens, self.token_bucket.capacity)
+            if self.token_bucket.tokens < amount:
+                waits.append((amount - self.token_bucket.tokens) / self.token_bucket.rate)
+        if waits:
+            return max(waits)
+
+        if self.request_bucket:
+            self.request_bucket.try_consume(1)
+        if self.token_bucket and tokens > 0:
+            self.token_bucket.try_consume(tokens)
+        return 0.0
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """
+    예외에서 HTTP 상태 코드를 추출합니다.
+    openai.APIStatusError는 status_code, aiohttp.ClientResponseError는 status 속성을 가집니다.
+    """
+    for attr in ("status_code", "status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def estimate_tokens(*texts: str, completion_tokens: int = 0) -> int:
+    """
+    TPM 제한에 사용할 대략적인 토큰 수를 추정합니다. (한국어는 대략 글자당 1토큰 이하)
+    """
+    return sum(len(text) for text in texts if text) + completion_tokens
+
+
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(name: str) -> RateLimiter:
+    """
+    업스트림별로 공유되는 RateLimiter 인스턴스를 반환합니다.
+    :param name: 업스트림 이름 ("openai" 또는 "serper")
+    """
+    if name not in _limiters:
+        if name == "openai":
+            _limiters[name] = RateLimiter(name, settings.OPENAI_RPM, settings.OPENAI_TPM, settings.OPENAI_MAX_CONCURRENCY)
+        elif name == "serper":
+            _limiters[name] = RateLimiter(name, settings.SERPER_RPM, 0, settings.SERPER_MAX_CONCURRENCY)
+        else:
+            raise ValueError(f"알 수 없는 업스트림: {name}")
+    return _limiters[name]
+
+
+def get_rate_limiter_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    업스트림별 요청 제한 통계를 반환합니다.
+    """
+    return {name: dict(limiter.stats) for name, limiter in _limiters.items()}
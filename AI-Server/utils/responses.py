@@ -0,0 +1,149 @@
+import gzip
+import json
+import logging
+from typing import Any, List, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# orjson이 설치되어 있으면 빠른 직렬화를 사용하고, 없으면 기본 JSON 응답으로 대체
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    orjson으로 직렬화하는 JSON 응답 (numpy 값과 문자열이 아닌 키도 직렬화)
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+FastJSONResponse = ORJSONResponse if orjson is not None else JSONResponse
+
+
+def dumps_json(content: Any) -> str:
+    """
+    응답 본문과 같은 방식으로 직렬화한 JSON 문자열을 반환합니다. (WebSocket 메시지용)
+    """
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+    return json.dumps(content, ensure_ascii=False, default=str)
+
+
+# brotli가 설치되어 있으면 br 인코딩도 지원
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/", "application/javascript")
+
+
+def _parse_accept_encoding(value: str) -> List[str]:
+    # "gzip;q=0.8, br" -> q값이 0이 아닌 인코딩 목록
+    encodings = []
+    for part in value.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        if name:
+            encodings.append(name.strip().lower())
+    return encodings
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    클라이언트의 Accept-Encoding에서 사용할 압축 방식을 고릅니다. (br 우선, 그다음 gzip)
+    :param accept_encoding: Accept-Encoding 헤더 값
+    :return: "br", "gzip" 또는 None
+    """
+    encodings = _parse_accept_encoding(accept_encoding)
+    if brotli is not None and "br" in encodings:
+        return "br"
+    if "gzip" in encodings or "*" in encodings:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    응답 본문을 지정한 방식으로 압축합니다.
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    응답 크기가 기준 이상일 때만 gzip/brotli로 압축하는 ASGI 미들웨어
+    작은 응답은 압축 비용이 이득보다 크므로 그대로 보내고,
+    스트리밍 응답(NDJSON 등)은 줄 단위 전달이 지연되지 않도록 압축하지 않습니다.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = settings.COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_wrapper(message: Message):
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                # 본문을 확인할 때까지 헤더 전송을 보류
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            if message.get("more_body", False) or not self._should_compress(headers, body):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start_message)
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _should_compress(self, headers: MutableHeaders, body: bytes) -> bool:
+        if len(body) < self.minimum_size or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def encoded_sizes(body: bytes) -> Tuple[int, int, Optional[int]]:
+    """
+    원본, gzip, brotli 압축 후 크기를 반환합니다. (벤치마크용)
+    """
+    gzip_size = len(compress(body, "gzip"))
+    br_size = len(compress(body, "br")) if brotli is not None else None
+    return len(body), gzip_size, br_size
@@ -0,0 +1,165 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from cachetools import TTLCache
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SearchCache:
+    """
+    검색 결과 2단계 캐시
+    1단계: 프로세스 메모리의 TTL/LRU 캐시
+    2단계: (선택) 재시작 후에도 유지되고 여러 워커가 공유하는 SQLite 파일 캐시
+    TTL이 지난 항목은 stale 구간 동안 즉시 반환하고 백그라운드에서 갱신합니다. (stale-while-revalidate)
+    """
+
+    def __init__(
+        self,
+        ttl: float = settings.SEARCH_CACHE_TTL,
+        stale_ttl: float = settings.SEARCH_CACHE_STALE_TTL,
+        maxsize: int = settings.SEARCH_CACHE_MAXSIZE,
+        path: str = settings.SEARCH_CACHE_PATH,
+    ):
+        """
+        :param ttl: 항목이 신선한 것으로 간주되는 시간(초)
+        :param stale_ttl: TTL 이후 오래된 항목을 반환하며 갱신할 수 있는 추가 시간(초)
+        :param maxsize: 메모리 캐시 최대 항목 수
+        :param path: 디스크 캐시 파일 경로 (빈 문자열이면 디스크 캐시 사용 안 함)
+        """
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.memory = TTLCache(maxsize=maxsize, ttl=ttl + stale_ttl)
+        self.path = path
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._refreshing = set()
+        self._background_tasks = set()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "disk_hits": 0, "refreshes": 0}
+        if path:
+            self._open_disk_cache(path)
+
+    def _open_disk_cache(self, path: str):
+        # 여러 워커가 동시에 읽고 쓸 수 있도록 WAL 모드로 연결
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS search_cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, fetched_at REAL NOT NULL)")
+        self._db.commit()
+        logger.info(f"검색 결과 디스크 캐시 사용: {path}")
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        """
+        캐시에서 결과를 찾고, 없으면 fetch를 호출하여 결과를 저장합니다.
+        :param key: 캐시 키 (정규화된 쿼리, 결과 수, gl/hl로 생성)
+        :param fetch: 캐시에 없을 때 결과를 가져오는 함수 (실패 시 None 반환 또는 예외)
+        :return: 검색 결과
+        """
+        entry = await self._lookup(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.time() - fetched_at
+            if age <= self.ttl:
+                self.stats["hits"] += 1
+                return value
+            if age <= self.ttl + self.stale_ttl:
+                self.stats["stale_hits"] += 1
+                self._schedule_refresh(key, fetch)
+                return value
+
+        self.stats["misses"] += 1
+        value = await fetch()
+        if value:
+            await self._store(key, value)
+        return value
+
+    def _schedule_refresh(self, key: str, fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]):
+        # 같은 키에 대한 갱신은 동시에 하나만 수행
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.ensure_future(self._refresh(key, fetch))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _refresh(self, key: str, fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]):
+        try:
+            value = await fetch()
+            if value:
+                await self._store(key, value)
+                self.stats["refreshes"] += 1
+        except Exception as e:
+            logger.warning(f"검색 캐시 백그라운드 갱신 실패: {str(e)}")
+        finally:
+            self._refreshing.discard(key)
+
+    async def _lookup(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        entry = self.memory.get(key)
+        if entry is not None:
+            return entry
+        if self._db is None:
+            return None
+        entry = await asyncio.to_thread(self._disk_get, key)
+        if entry is not None:
+            self.stats["disk_hits"] += 1
+            self.memory[key] = entry
+        return entry
+
+    async def _store(self, key: str, value: Dict[str, Any]):
+        entry = (value, time.time())
+        self.memory[key] = entry
+        if self._db is not None:
+            await asyncio.to_thread(self._disk_set, key, entry)
+
+    def _disk_get(self, key: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        try:
+            with self._db_lock:
+                row = self._db.execute("SELECT value, fetched_at FROM search_cache WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"검색 캐시 디스크 조회 실패: {str(e)}")
+            return None
+        if row is None or time.time() - row[1] > self.ttl + self.stale_ttl:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def _disk_set(self, key: str, entry: Tuple[Dict[str, Any], float]):
+        value, fetched_at = entry
+        try:
+            with self._db_lock:
+                self._db.execute("INSERT OR REPLACE INTO search_cache (key, value, fetched_at) VALUES (?, ?, ?)", (key, json.dumps(value, ensure_ascii=False), fetched_at))
+                # 만료된 항목 정리
+                self._db.execute("DELETE FROM search_cache WHERE fetched_at < ?", (time.time() - self.ttl - self.stale_ttl,))
+                self._db.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"검색 캐시 디스크 저장 실패: {str(e)}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        캐시 적중/실패 통계를 반환합니다.
+        """
+        lookups = self.stats["hits"] + self.stats["stale_hits"] + self.stats["misses"]
+        hit_rate = (self.stats["hits"] + self.stats["stale_hits"]) / lookups if lookups else 0.0
+        return {**self.stats, "size": len(self.memory), "hit_rate": round(hit_rate, 4)}
+
+
+_search_cache: Optional[SearchCache] = None
+
+
+def get_search_cache() -> SearchCache:
+    """
+    프로세스에서 공유하는 검색 결과 캐시를 반환합니다.
+    """
+    global _search_cache
+    if _search_cache is None:
+        _search_cache = SearchCache()
+    return _search_cache
@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# 추출한 레코드의 기본 대상 이름 (질의에서 대상을 따로 분석하지 않으므로 국가 통계로 간주)
+DEFAULT_ENTITY = "대한민국"
+
+
+def normalize_key_part(text: str) -> str:
+    """
+    저장소 키에 사용할 문자열을 정규화합니다. ("경제 성장률 (%)" -> "경제성장률")
+    :param text: 필드명, 대상 이름 등
+    :return: 소문자로 바꾸고 공백·기호를 제거한 문자열
+    """
+    text = re.sub(r"\(.*?\)", "", text or "")
+    return re.sub(r"[^0-9a-z가-힣]", "", text.lower())
+
+
+def normalize_source(url: str) -> str:
+    """
+    출처 URL을 도메인 단위로 정규화합니다. (같은 사이트의 다른 페이지는 같은 출처로 취급)
+    :param url: 출처 URL 또는 도메인 ("kosis.kr"처럼 스킴이 없어도 됨)
+    :return: "www."를 제거한 도메인, URL이 아니면 정규화된 문자열
+    """
+    url = (url or "").strip()
+    netloc = urlparse(url if "//" in url else f"//{url}").netloc.lower()
+    return netloc[4:] if netloc.startswith("www.") else netloc or normalize_key_part(url)
+
+
+class SeriesStore:
+    """
+    GraphGenerator가 추출한 시계열 데이터를 (필드, 대상, 출처) 단위로 저장하는 로컬 SQLite 저장소
+    같은 시계열이 다시 추출되면 연도별로 병합하고, 갱신 시각으로 신선도를 판단합니다.
+    저장된 시계열은 TTL 동안 검색 없이 그대로 응답에 사용되므로, 필드가 확인된 데이터만 저장해야 합니다.
+    잘못 저장된 시계열은 invalidate로 지웁니다. (python -m utils.series_store invalidate --field 경제성장률)
+    """
+
+    def __init__(self, path: str = settings.SERIES_STORE_PATH, ttl: float = settings.SERIES_STORE_TTL):
+        """
+        :param path: SQLite 파일 경로
+        :param ttl: 저장된 시계열을 그대로 사용할 수 있는 시간(초)
+        """
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "saves": 0}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS series ("
+            "id INTEGER PRIMARY KEY, field TEXT NOT NULL, entity TEXT NOT NULL, source TEXT NOT NULL, "
+            "field_label TEXT NOT NULL, entity_label TEXT NOT NULL, url TEXT, updated_at REAL NOT NULL, "
+            "UNIQUE (field, entity, source))"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS series_points (series_id INTEGER NOT NULL, year INTEGER NOT NULL, value REAL NOT NULL, PRIMARY KEY (series_id, year))")
+        self._db.commit()
+        logger.info(f"시계열 저장소 사용: {path}")
+
+    def save(self, records: List[Dict[str, Any]], source_url: str) -> List[Dict[str, Any]]:
+        """
+        추출된 레코드를 저장합니다. 기존 시계열이 있으면 새 연도는 추가하고 같은 연도는 새 값으로 갱신합니다.
+
+        :param records: {"date", "value", "name", "field"} 레코드 리스트
+        :param source_url: 데이터를 추출한 페이지 URL
+        :return: 병합된 전체 시계열 레코드 (연도순)
+        """
+        if not records:
+            return []
+        field_label, entity_label = records[0]["field"], records[0]["name"]
+        key = (normalize_key_part(field_label), normalize_key_part(entity_label), normalize_source(source_url))
+        points = [(int(str(record["date"])[:4]), float(record["value"])) for record in records]
+
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO series (field, entity, source, field_label, entity_label, url, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (field, entity, source) DO UPDATE SET field_label = excluded.field_label, url = excluded.url, updated_at = excluded.updated_at",
+                (*key, field_label, entity_label, source_url, time.time()),
+            )
+            series_id = self._db.execute("SELECT id FROM series WHERE field = ? AND entity = ? AND source = ?", key).fetchone()[0]
+            self._db.executemany("INSERT OR REPLACE INTO series_points (series_id, year, value) VALUES (?, ?, ?)", [(series_id, year, value) for year, value in points])
+            self._db.commit()
+            merged = self._load_points(series_id)
+
+        self.stats["saves"] += 1
+        logger.info(f"시계열 저장: {field_label} ({key[2]}), 추출 {len(points)}개 -> 전체 {len(merged)}개")
+        return self._to_records(merged, field_label, entity_label)
+
+    def get_fresh(self, field: str, entity: str = DEFAULT_ENTITY, source: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        TTL 안에 갱신된 시계열 중 가장 최근 것을 찾습니다.
+
+        :param field: 데이터 필드명
+        :param entity: 대상 이름
+        :param source: 출처 URL 또는 도메인 (없으면 모든 출처 중 가장 최근 것)
+        :return: {"records", "source", "url", "updated_at"} 딕셔너리, 없으면 None
+        """
+        query = "SELECT id, source, url, updated_at, field_label, entity_label FROM series WHERE field = ? AND entity = ? AND updated_at >= ?"
+        params: List[Any] = [normalize_key_part(field), normalize_key_part(entity), time.time() - self.ttl]
+        if source:
+            query += " AND source = ?"
+            params.append(normalize_source(source))
+        with self._lock:
+            row = self._db.execute(query + " ORDER BY updated_at DESC LIMIT 1", params).fetchone()
+            points = self._load_points(row[0]) if row else []
+
+        if len(points) < 2:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        series_id, source, url, updated_at, field_label, entity_label = row
+        return {"records": self._to_records(points, field_label, entity_label), "source": source, "url": url, "updated_at": updated_at}
+
+    def invalidate(self, field: Optional[str] = None, entity: Optional[str] = None, source: Optional[str] = None) -> int:
+        """
+        조건에 맞는 시계열을 삭제합니다. 다음 요청은 다시 검색/추출합니다.
+
+        :param field: 데이터 필드명
+        :param entity: 대상 이름
+        :param source: 출처 URL 또는 도메인
+        :return: 삭제한 시계열 수
+        """
+        conditions = [
+            (column, value)
+            for column, value in (
+                ("field", field and normalize_key_part(field)),
+                ("entity", entity and normalize_key_part(entity)),
+                ("source", source and normalize_source(source)),
+            )
+            if value
+        ]
+        if not conditions:
+            raise ValueError("삭제할 시계열의 필드, 대상, 출처 중 하나 이상을 지정해야 합니다.")
+        where = " AND ".join(f"{column} = ?" for column, _ in conditions)
+        params = [value for _, value in conditions]
+        with self._lock:
+            self._db.execute(f"DELETE FROM series_points WHERE series_id IN (SELECT id FROM series WHERE {where})", params)
+            deleted = self._db.execute(f"DELETE FROM series WHERE {where}", params).rowcount
+            self._db.commit()
+        logger.info(f"시계열 삭제: {dict(conditions)} ({deleted}개)")
+        return deleted
+
+    def list_series(self) -> List[Dict[str, Any]]:
+        """
+        저장된 시계열 목록을 반환합니다.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT s.field_label, s.entity_label, s.source, s.url, s.updated_at, COUNT(p.year) FROM series s LEFT JOIN series_points p ON p.series_id = s.id GROUP BY s.id ORDER BY s.updated_at DESC"
+            ).fetchall()
+        return [
+            {"field": field, "entity": entity, "source": source, "url": url, "updated_at": updated_at, "points": points} for field, entity, source, url, updated_at, points in rows
+        ]
+
+    async def asave(self, records: List[Dict[str, Any]], source_url: str) -> List[Dict[str, Any]]:
+        """
+        save의 비동기 버전 (SQLite 쓰기는 스레드에서 실행)
+        """
+        return await asyncio.to_thread(self.save, records, source_url)
+
+    async def aget_fresh(self, field: str, entity: str = DEFAULT_ENTITY, source: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        get_fresh의 비동기 버전 (SQLite 조회는 스레드에서 실행)
+        """
+        return await asyncio.to_thread(self.get_fresh, field, entity, source)
+
+    def _load_points(self, series_id: int) -> List[tuple]:
+        return self._db.execute("SELECT year, value FROM series_points WHERE series_id = ? ORDER BY year", (series_id,)).fetchall()
+
+    def _to_records(self, points: List[tuple], field: str, entity: str) -> List[Dict[str, Any]]:
+        points = points[-settings.MAX_GRAPH_DATA_POINTS :]
+        return [{"date": f"{year}-01-01", "value": value, "name": entity, "field": field} for year, value in points]
+
+
+_series_store: Optional[SeriesStore] = None
+
+
+def get_series_store() -> Optional[SeriesStore]:
+    """
+    프로세스에서 공유하는 시계열 저장소를 반환합니다. SERIES_STORE_PATH가 비어 있으면 None을 반환합니다.
+    """
+    global _series_store
+    if _series_store is None and settings.SERIES_STORE_PATH:
+        try:
+            _series_store = SeriesStore()
+        except sqlite3.Error as e:
+            logger.warning(f"시계열 저장소를 열지 못했습니다: {str(e)}")
+            return None
+    return _series_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="그래프 시계열 저장소 관리")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="저장된 시계열 목록 출력")
+    invalidate = subparsers.add_parser("invalidate", help="조건에 맞는 시계열 삭제")
+    invalidate.add_argument("--field", default=None, help="데이터 필드명 (예: 경제성장률)")
+    invalidate.add_argument("--entity", default=None, help="대상 이름 (예: 대한민국)")
+    invalidate.add_argument("--source", default=None, help="출처 URL 또는 도메인")
+    args = parser.parse_args()
+
+    store = get_series_store()
+    if store is None:
+        parser.error("SERIES_STORE_PATH가 설정되지 않았습니다.")
+    if args.command == "list":
+        for series in store.list_series():
+            updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(series["updated_at"]))
+            print(f"{series['field']}\t{series['entity']}\t{series['source']}\t{series['points']}개\t{updated}\t{series['url']}")
+    else:
+        print(f"{store.invalidate(args.field, args.entity, args.source)}개 시계열을 삭제했습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import asyncio
+import contextvars
+import hashlib
+import json
+import logging
+import math
+import re
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from utils.deadline import DeadlineExceeded, current_deadline
+from utils.metrics import StageFanout
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    동일한 키로 동시에 실행 중인 작업을 하나로 합치는 클래스
+    같은 키의 요청이 진행 중이면 새로 실행하지 않고 진행 중인 작업의 결과를 함께 기다립니다.
+    결과는 작업이 끝나는 즉시 버려지므로 캐시 수명에는 영향을 주지 않습니다.
+    공유 작업은 특정 호출자의 요청 상태(시간 예산, 단계 리스너, 대화 세션 등)를 물려받지 않도록 빈 컨텍스트에서 실행하고,
+    각 호출자의 시간 예산은 그 호출자의 대기에만 적용합니다. 공유 작업 안에서 끝난 단계는 기다리는 모든 호출자의 단계 기록에 전달합니다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, Tuple[asyncio.Future, StageFanout]] = {}
+        self.stats = {"executed": 0, "coalesced": 0}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        키에 해당하는 작업을 한 번만 실행하고 결과를 공유합니다.
+        공유된 결과 객체는 여러 호출자가 함께 사용하므로 수정하지 않아야 합니다.
+
+        :param key: 정규화된 요청 키 (make_key로 생성)
+        :param func: 실행할 코루틴을 반환하는 함수
+        :return: 작업 결과
+        """
+        entry = self._inflight.get(key)
+        if entry is None:
+            self.stats["executed"] += 1
+            fanout = StageFanout()
+            context = contextvars.Context()
+            context.run(fanout.bind)
+            future = context.run(lambda: asyncio.ensure_future(func()))
+            self._inflight[key] = (future, fanout)
+            future.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            future, fanout = entry
+            self.stats["coalesced"] += 1
+            logger.debug(f"[{self.name}] 진행 중인 동일 요청에 합류: {key[:12]}")
+
+        target = fanout.attach()
+        try:
+            # 한 호출자가 취소되거나 시간 예산을 넘겨도 다른 호출자가 기다리는 작업은 계속 실행되도록 보호
+            deadline = current_deadline()
+            if deadline is None or math.isinf(deadline.remaining()):
+                return await asyncio.shield(future)
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout=deadline.remaining())
+            except asyncio.TimeoutError:
+                if future.done():
+                    raise
+                raise DeadlineExceeded(self.name)
+        finally:
+            fanout.detach(target)
+
+    def _forget(self, key: str, future: asyncio.Future):
+        entry = self._inflight.get(key)
+        if entry is not None and entry[0] is future:
+            del self._inflight[key]
+        # 기다리는 호출자가 없을 때 예외가 로그에 남지 않도록 소비
+        if not future.cancelled():
+            future.exception()
+
+
+def normalize_text(text: str) -> str:
+    """
+    키 생성을 위해 텍스트를 정규화합니다. (앞뒤 공백 제거, 연속 공백 축약)
+    대소문자는 구분합니다. (임베딩, URL 경로, LLM 응답은 대소문자에 따라 달라질 수 있음)
+    """
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def make_key(*parts: Any) -> str:
+    """
+    요청 구성 요소로부터 정규화된 키를 생성합니다.
+    """
+    normalized = [normalize_text(part) if isinstance(part, str) else part for part in parts]
+    return hashlib.sha1(json.dumps(normalized, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+_flights: Dict[str, SingleFlight] = {}
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """
+    단계별로 공유되는 SingleFlight 인스턴스를 반환합니다.
+    :param name: 단계 이름 (예: "embedding", "vector_search", "web_search", "page_fetch", "llm")
+    """
+    if name not in _flights:
+        _flights[name] = SingleFlight(name)
+    return _flights[name]
+
+
+def get_single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """
+    단계별 요청 병합 통계를 반환합니다.
+    """
+    return {name: dict(flight.stats) for name, flight in _flights.items()}
@@ -0,0 +1,181 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from config.settings import settings
+from utils.single_flight import make_key
+
+logger = logging.getLogger(__name__)
+
+TRANSPORT_MODES = ("live", "record", "replay")
+
+
+class ReplayMissError(LookupError):
+    """replay 모드에서 녹화된 응답을 찾지 못한 경우 발생하는 예외"""
+
+
+class Transport:
+    """
+    외부 서비스(OpenAI, Serper, 웹 페이지) 호출을 감싸는 전송 계층
+    - live: 실제 서비스를 호출합니다.
+    - record: 실제 서비스를 호출하고 응답과 소요 시간을 카세트 디렉토리에 저장합니다.
+    - replay: 저장된 응답을 (설정된 인위적 지연 후) 반환하여 쿼터 없이 재현 가능한 부하 테스트를 할 수 있게 합니다.
+    """
+
+    def __init__(
+        self,
+        mode: str = settings.TRANSPORT_MODE,
+        cassette_dir: str = settings.TRANSPORT_CASSETTE_DIR,
+        latency_scale: float = settings.TRANSPORT_REPLAY_LATENCY_SCALE,
+        extra_latency: float = settings.TRANSPORT_REPLAY_EXTRA_LATENCY,
+        jitter: float = settings.TRANSPORT_REPLAY_JITTER,
+    ):
+        """
+        :param mode: live, record, replay 중 하나
+        :param cassette_dir: 녹화된 응답을 저장할 디렉토리
+        :param latency_scale: replay 시 녹화된 소요 시간에 곱할 배율 (0이면 녹화된 지연 없음)
+        :param extra_latency: replay 시 추가할 고정 지연(초)
+        :param jitter: replay 지연에 적용할 무작위 변동 비율 (예: 0.2이면 ±20%)
+        """
+        if mode not in TRANSPORT_MODES:
+            raise ValueError(f"지원하지 않는 전송 모드입니다: {mode} (가능한 값: {', '.join(TRANSPORT_MODES)})")
+        self.mode = mode
+        self.cassette_dir = cassette_dir
+        self.latency_scale = latency_scale
+        self.extra_latency = extra_latency
+        self.jitter = jitter
+        self._replay_cache: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"live": 0, "recorded": 0, "replayed": 0, "misses": 0}
+        if mode != "live":
+            logger.info(f"전송 계층 {mode} 모드 사용 (카세트: {cassette_dir})")
+
+    async def call(self, service: str, request: Any, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        외부 서비스 호출을 모드에 따라 실행, 녹화 또는 재생합니다.
+
+        :param service: 서비스 이름 (openai, serper, page 등, 카세트 하위 디렉토리로 사용)
+        :param request: 요청을 식별하는 JSON 직렬화 가능한 값 (카세트 키 생성에 사용)
+        :param func: 실제 서비스를 호출하는 함수. 반환값은 JSON 직렬화 가능해야 합니다.
+        :return: 서비스 응답
+        """
+        if self.mode == "live":
+            self.stats["live"] += 1
+            return await func()
+
+        key = make_key(service, request)
+        if self.mode == "replay":
+            return await self._replay(service, key)
+
+        start = time.perf_counter()
+        response = await func()
+        elapsed = time.perf_counter() - start
+        record = {"service": service, "request": request, "response": response, "elapsed": elapsed, "recorded_at": time.time()}
+        await asyncio.to_thread(self._write, service, key, record)
+        self.stats["recorded"] += 1
+        return response
+
+    async def _replay(self, service: str, key: str) -> Any:
+        record = self._replay_cache.get(key)
+        if record is None:
+            record = await asyncio.to_thread(self._read, service, key)
+            if record is None:
+                self.stats["misses"] += 1
+                raise ReplayMissError(f"녹화된 {service} 응답이 없습니다: {key}")
+            self._replay_cache[key] = record
+
+        delay = record.get("elapsed", 0.0) * self.latency_scale + self.extra_latency
+        if self.jitter:
+            delay *= 1 + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        self.stats["replayed"] += 1
+        return record["response"]
+
+    def _path(self, service: str, key: str) -> str:
+        return os.path.join(self.cassette_dir, service, f"{key}.json")
+
+    def _write(self, service: str, key: str, record: Dict[str, Any]):
+        path = self._path(service, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 동시에 같은 키를 녹화해도 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = f"{path}.{os.getpid()}.{id(record)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _read(self, service: str, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(service, key), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+
+class TransportChatModel(BaseChatModel):
+    """
+    LangChain 채팅 모델을 Transport로 감싸는 래퍼
+    Chatbot/GraphGenerator의 ChatOpenAI 호출도 녹화/재생할 수 있게 합니다.
+    """
+
+    inner: BaseChatModel
+    transport: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return f"transport-{self.inner._llm_type}"
+
+    def _request(self, messages: List[BaseMessage], stop: Optional[List[str]]) -> Dict[str, Any]:
+        return {
+            "model": getattr(self.inner, "model_name", ""),
+            "temperature": getattr(self.inner, "temperature", None),
+            "messages": [[message.type, message.content] for message in messages],
+            "stop": stop,
+        }
+
+    async def _agenerate(
+        self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[AsyncCallbackManagerForLLMRun] = None, **kwargs: Any
+    ) -> ChatResult:
+        async def invoke():
+            response = await self.inner.ainvoke(messages, stop=stop, **kwargs)
+            return response.content
+
+        content = await self.transport.call("openai", self._request(messages, stop), invoke)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        # 동기 호출은 전송 계층을 거치지 않고 그대로 실행 (서버 코드는 비동기 호출만 사용)
+        return self.inner._generate(messages, stop=stop, **kwargs)
+
+
+_transport: Optional[Transport] = None
+
+
+def get_transport() -> Transport:
+    """
+    프로세스에서 공유하는 Transport를 반환합니다.
+    """
+    global _transport
+    if _transport is None:
+        _transport = Transport()
+    return _transport
+
+
+def wrap_chat_model(llm: BaseChatModel) -> BaseChatModel:
+    """
+    live 모드가 아니면 LangChain 채팅 모델을 TransportChatModel로 감쌉니다.
+    :param llm: 감쌀 채팅 모델
+    :return: live 모드이면 원래 모델, 아니면 TransportChatModel
+    """
+    transport = get_transport()
+    if transport.mode == "live":
+        return llm
+    return TransportChatModel(inner=llm, transport=transport)
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import json
 from typing import List, Dict, Any
@@ -6,7 +7,9 @@ from pymilvus import Collection, CollectionSchema, DataType, FieldSchema, utilit
 
 from config.settings import settings
 from utils.database import connect_to_milvus, get_collection
-from utils.embedding_utils import get_embedding_function
+from utils.embedding_utils import get_embedding_function, get_embeddings
+from utils.metrics import timed_stage, track_stage
+from utils.single_flight import get_single_flight, make_key
 from services.models import CompanyInfo, SupportProgramInfo
 
 logger = logging.getLogger(__name__)
@@ -51,32 +54,42 @@ class VectorStore:
             logger.info(f"기존 컬렉션에 인덱스 생성 완료: {self.collection_name}")
         else:
             logger.info(f"컬렉션 및 인덱스가 이미 존재함: {self.collection_name}")
+        dim = next((field.params.get("dim") for field in collection.schema.fields if field.dtype == DataType.FLOAT_VECTOR), None)
+        if dim != settings.EMBEDDING_DIMENSION:
+            # 다른 임베딩 모델로 만든 컬렉션 (마이그레이션 후 설정을 바꾸지 않은 경우 등)
+            logger.error(f"컬렉션 {self.collection_name}의 벡터 차원({dim})이 EMBEDDING_DIMENSION({settings.EMBEDDING_DIMENSION})과 다릅니다.")
 
     def _create_index(self, collection):
         # 인덱스 생성
-        index_params = {
-            "index_type": "IVF_FLAT",
-            "metric_type": "L2",
-            "params": {"nlist": 1024},
-        }
-        collection.create_index("embedding", index_params)
+        collection.create_index("embedding", settings.VECTOR_INDEX_PARAMS)
 
     def add_texts(self, texts: List[str], urls: List[str] = None):
-        # 텍스트를 벡터 저장소에 추가
+        # 텍스트를 벡터 저장소에 추가 (임베딩은 배치로 계산)
+        self.add_embeddings(texts, get_embeddings(texts), urls)
+
+    def add_embeddings(self, texts: List[str], embeddings: List[List[float]], urls: List[str] = None, created_at: int = None, flush: bool = True):
+        # 미리 계산된 임베딩과 함께 텍스트를 벡터 저장소에 추가
         collection = get_collection(self.collection_name)
-        embeddings = [self.embedding_function(text) for text in texts]
 
         if urls is None or len(urls) == 0:
             urls = [""] * len(texts)
         elif len(urls) < len(texts):
             urls = urls + [""] * (len(texts) - len(urls))
 
-        created_at = int(datetime.now().timestamp())
+        created_at = created_at or int(datetime.now().timestamp())
         entities = [texts, urls, embeddings, [created_at] * len(texts)]
         collection.insert(entities)
-        collection.flush()
+        if flush:
+            collection.flush()
         logger.info(f"{len(texts)}개의 텍스트를 컬렉션에 추가함")
 
+    def delete_by_url(self, url: str) -> int:
+        # 같은 출처 URL로 저장된 텍스트를 모두 삭제 (재수집 시 이전 청크 교체용)
+        collection = get_collection(self.collection_name)
+        result = collection.delete(expr=f"url == {json.dumps(url)}")
+        logger.info(f"출처 URL의 기존 텍스트 삭제: {url} ({result.delete_count}개)")
+        return result.delete_count
+
     def add_company_info(self, company_name: str, info: CompanyInfo):
         # 회사 정보를 벡터 저장소에 추가
         text = f"Company: {company_name}\n{info.json()}"
@@ -91,15 +104,17 @@ class VectorStore:
     def search_with_similarity_threshold(self, query: str, k: int = 5, threshold: float = 0.7) -> List[Dict[str, Any]]:
         # 유사도 임계값을 적용한 검색 수행
         collection = get_collection(self.collection_name)
-        search_params = {"metric_type": "L2", "params": {"nprobe": 10}}
-
-        results = collection.search(
-            data=[self.embedding_function(query)],
-            anns_field="embedding",
-            param=search_params,
-            limit=k,
-            output_fields=["content", "url", "created_at"],
-        )
+        search_params = settings.VECTOR_SEARCH_PARAMS
+
+        query_embedding = self.embedding_function(query)
+        with track_stage("milvus_search"):
+            results = collection.search(
+                data=[query_embedding],
+                anns_field="embedding",
+                param=search_params,
+                limit=k,
+                output_fields=["content", "url", "created_at"],
+            )
 
         if not results or len(results[0]) == 0:
             logger.info("벡터 저장소에서 결과를 찾지 못함")
@@ -119,10 +134,16 @@ class VectorStore:
 
         return hits
 
+    @timed_stage("vector_search")
+    async def asearch_with_similarity_threshold(self, query: str, k: int = 5, threshold: float = 0.7) -> List[Dict[str, Any]]:
+        # 유사도 임계값 검색을 스레드에서 실행하고, 동시에 들어온 동일 검색은 한 번만 수행
+        key = make_key(self.collection_name, query, k, threshold)
+        return await get_single_flight("vector_search").do(key, lambda: asyncio.to_thread(self.search_with_similarity_threshold, query, k, threshold))
+
     def search_by_date_range(self, query: str, start_date: datetime, end_date: datetime, k: int = 5) -> List[Dict[str, Any]]:
         # 날짜 범위를 지정하여 검색 수행
         collection = get_collection(self.collection_name)
-        search_params = {"metric_type": "L2", "params": {"nprobe": 10}}
+        search_params = settings.VECTOR_SEARCH_PARAMS
 
         results = collection.search(
             data=[self.embedding_function(query)],
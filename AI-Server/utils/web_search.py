@@ -3,10 +3,15 @@ import aiohttp
 from bs4 import BeautifulSoup
 from typing import List, Dict, Optional, Any
 from config.settings import settings
-from cachetools import TTLCache
 import asyncio
+from utils.deadline import get_deadline
+from utils.http_client import get_http_session
+from utils.metrics import timed_stage
+from utils.rate_limiter import get_rate_limiter
+from utils.search_cache import get_search_cache
+from utils.single_flight import get_single_flight, make_key
+from utils.transport import get_transport
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
@@ -14,31 +19,79 @@ class WebSearch:
     def __init__(self):
         self.api_key = settings.SERPER_API_KEY
         self.endpoint = "https://google.serper.dev/search"
+        self.rate_limiter = get_rate_limiter("serper")
+        self.cache = get_search_cache()
+        self.transport = get_transport()
 
-    async def search(self, queries: List[str], num_results: int = 10) -> Dict[str, Any]:
+    @timed_stage("web_search")
+    async def search(self, queries: List[str], num_results: int = 10, gl: Optional[str] = None, hl: Optional[str] = None) -> Dict[str, Any]:
         """
         여러 쿼리에 대해 Serper API를 사용하여 검색을 수행합니다.
+        쿼리는 공유 세션 위에서 동시에 실행되며, 시간 초과나 오류가 난 쿼리는 제외하고 병합합니다.
         :param queries: 검색할 쿼리 리스트
         :param num_results: 각 쿼리당 반환할 결과 수
+        :param gl: 검색 국가 코드 (예: "kr")
+        :param hl: 검색 언어 코드 (예: "ko")
         :return: 검색 결과를 포함하는 딕셔너리
         """
+        semaphore = asyncio.Semaphore(settings.SERPER_CALL_CONCURRENCY)
+        tasks = [asyncio.ensure_future(self._search_one(query, num_results, gl, hl, semaphore)) for query in queries]
+
+        # 완료되는 순서대로 수집하되, 병합은 쿼리 순서를 유지
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+        index_of = {task: i for i, task in enumerate(tasks)}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results[index_of[task]] = task.result()
+        finally:
+            # 호출자가 취소한 경우(시간 예산 초과 등) 남은 쿼리도 중단
+            for task in pending:
+                task.cancel()
+
+        return self._merge_results([result for result in results if result])
+
+    async def _search_one(self, query: str, num_results: int, gl: Optional[str], hl: Optional[str], semaphore: asyncio.Semaphore) -> Optional[Dict[str, Any]]:
+        """
+        단일 쿼리를 쿼리별 시간 제한 안에서 검색합니다. 캐시에 있으면 API를 호출하지 않습니다.
+        :return: 검색 결과, 실패 시 None
+        """
+        payload = {"q": query, "num": num_results}
+        if gl:
+            payload["gl"] = gl
+        if hl:
+            payload["hl"] = hl
+        key = make_key(query, num_results, gl, hl)
+        # 쿼리별 제한 시간은 요청의 남은 시간 예산을 넘지 않음
+        timeout = get_deadline().cap(settings.SERPER_QUERY_TIMEOUT)
+        try:
+            async with semaphore:
+                # 동시에 들어온 같은 쿼리는 한 번만 요청
+                return await asyncio.wait_for(
+                    self.cache.get_or_fetch(key, lambda: get_single_flight("web_search").do(key, lambda: self.rate_limiter.run(lambda: self._post(payload)))),
+                    timeout=timeout,
+                )
+        except asyncio.TimeoutError:
+            logger.warning(f"검색 시간 초과 ({timeout:.1f}초): {query}")
+        except aiohttp.ClientResponseError as e:
+            logger.error(f"API 요청 실패: {e.status}")
+        except Exception as e:
+            logger.error(f"검색 중 오류 발생: {str(e)}")
+        return None
+
+    async def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Serper API에 단일 쿼리를 요청합니다. 200이 아닌 응답은 예외로 처리하여 재시도 대상이 되도록 합니다.
+        """
+        return await self.transport.call("serper", payload, lambda: self._post_live(payload))
+
+    async def _post_live(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         headers = {"X-API-KEY": self.api_key, "Content-Type": "application/json"}
-        all_results = []
-
-        async with aiohttp.ClientSession() as session:
-            for query in queries:
-                payload = {"q": query, "num": num_results}
-                try:
-                    async with session.post(self.endpoint, json=payload, headers=headers) as response:
-                        if response.status == 200:
-                            result = await response.json()
-                            all_results.append(result)
-                        else:
-                            logger.error(f"API 요청 실패: {response.status}")
-                except Exception as e:
-                    logger.error(f"검색 중 오류 발생: {str(e)}")
-
-        return self._merge_results(all_results)
+        async with get_http_session().post(self.endpoint, json=payload, headers=headers) as response:
+            response.raise_for_status()
+            return await response.json()
 
     def _process_results(self, search_results: Dict[str, Any]) -> Dict[str, Any]:
         processed = {